@@ -0,0 +1,70 @@
+"""
+Checks the cold import time of the rendering package, e.g.
+
+    python -m benchmarks.bench_import --max-ms 400
+
+Every module is imported in a fresh interpreter. The check fails (exit status 1) if an import is slower than the budget
+or loads one of the optional heavy dependencies, which should only be imported when the feature using them is asked for
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must be importable without loading the heavy dependencies
+MODULES = ['rendering', 'rendering.render', 'rendering.shade', 'transformations.projection']
+
+# Dependencies only some features need: the jit backend, parallel rendering and plotting
+HEAVY = ['numba', 'llvmlite', 'concurrent.futures', 'multiprocessing.shared_memory', 'matplotlib', 'cv2']
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(seconds, ' '.join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def cold_import(module, repeat=5):
+    """
+    Imports a module in fresh interpreters
+
+    Args:
+        module: the name of the module
+        repeat: the number of interpreters, the fastest import is kept
+
+    Returns:
+        The best import time in seconds, and the heavy dependencies the import loaded
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.environ.get('PYTHONPATH', '')]))
+    best, loaded = float('inf'), []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY)], env=env, check=True,
+                                capture_output=True, text=True).stdout.split()
+        best = min(best, float(output[0]))
+        loaded = output[1:]
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--max-ms', type=float, default=500, help='the import time budget of every module')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results, failed = [], False
+    for module in MODULES:
+        seconds, loaded = cold_import(module, args.repeat)
+        ok = 1000 * seconds <= args.max_ms and not loaded
+        failed |= not ok
+        results.append(dict(module=module, milliseconds=1000 * seconds, heavy_modules=loaded, ok=ok))
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Times the renderers on synthetic meshes and writes the results as JSON, e.g.
+
+    python -m benchmarks.bench_render --meshes sphere terrain --triangles 1000 10000 --out results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from rendering.render import render_object, render_object_base, render_object_camera
+from rendering.helpers import rasterize
+from transformations.projection import project_cam_lookat
+from benchmarks.meshes import MESHES, camera_for
+
+# Camera and material of every benchmark scene, in the units of the sample materials
+F = 70
+CAM_H = CAM_W = 15
+MATERIAL = dict(ka=0.2, kd=0.6, ks=0.4, n=8, Ia=np.array([1.0, 1.0, 1.0]))
+
+
+def _measure(function, repeat):
+    # A first run under tracemalloc gives the peak memory and warms up caches (and numba), the best of the next
+    # repeat runs gives the time
+    tracemalloc.start()
+    img = function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    seconds = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+    if isinstance(img, tuple):
+        img = img[0]
+    return seconds, peak, img
+
+
+def _cases(verts, faces, vcolors, eye, lookat, up, size, backends):
+    # Every (name, parameters, function) to time on one mesh
+    verts2d, depth = project_cam_lookat(eye, lookat, up, verts, F)
+    verts2d = rasterize(verts2d, size, size, CAM_H, CAM_W).astype(int)
+
+    for backend in backends:
+        for shade_t in ['Flat', 'Gouraud']:
+            yield ('render_object_base', dict(shade_t=shade_t, backend=backend),
+                   lambda shade_t=shade_t, backend=backend: render_object_base(verts2d, faces, vcolors, depth, shade_t,
+                                                                               backend, M=size, N=size))
+        yield ('render_object_camera', dict(backend=backend),
+               lambda backend=backend: render_object_camera(verts, faces, vcolors, size, size, CAM_H, CAM_W, F, eye,
+                                                            lookat, up, backend))
+
+    light_positions = np.array([eye + np.array([0, np.linalg.norm(eye), 0])])
+    light_intensities = np.array([[1.0, 1.0, 1.0]])
+    for backend in [backend for backend in backends if backend in ['scanline', 'jit']]:
+        for shader in ['Gouraud', 'Phong']:
+            for lighting in ['Ambient', 'Diffuse', 'Specular', 'All']:
+                yield ('render_object', dict(shader=shader, lighting=lighting, backend=backend),
+                       lambda shader=shader, lighting=lighting, backend=backend: render_object(
+                           lighting, shader, F, eye, lookat, up, np.ones(3), size, size, CAM_H, CAM_W, verts, vcolors,
+                           faces, light_positions=light_positions, light_intensities=light_intensities,
+                           backend=backend, **MATERIAL))
+
+
+def run(meshes, triangle_counts, coverage=0.5, size=512, repeat=3, backends=('scanline',), functions=None):
+    """
+    Times render_object_base, render_object_camera and render_object on synthetic meshes, for every shading mode,
+    lighting mode and backend
+
+    Args:
+        meshes: the names of the meshes to generate, keys of benchmarks.meshes.MESHES
+        triangle_counts: the approximate numbers of triangles of the generated meshes
+        coverage: the fraction of the width of the image the meshes span
+        size: the height and width of the rendered images in pixels
+        repeat: the number of timed runs, the fastest is kept
+        backends: the backends to time, among 'scanline', 'vectorized' and 'jit'
+        functions: the names of the functions to time, all three if None
+
+    Returns:
+        A list of result dicts with the mesh, its size, the parameters of the run, the best time in seconds,
+        triangles/sec, pixels/sec (counting the pixels the object covers) and the peak traced memory in bytes
+    """
+    results = []
+    for mesh in meshes:
+        for triangle_count in triangle_counts:
+            verts, faces, vcolors = MESHES[mesh](triangle_count)
+            eye, lookat, up = camera_for(verts, coverage, F, CAM_W)
+            for function, params, render in _cases(verts, faces, vcolors, eye, lookat, up, size, backends):
+                if functions is not None and function not in functions:
+                    continue
+                seconds, peak, img = _measure(render, repeat)
+                pixels = int(np.count_nonzero(np.any(img != 1, axis=2)))
+                result = dict(function=function, mesh=mesh, triangles=len(faces), vertices=len(verts), size=size,
+                              coverage=coverage, **params, seconds=seconds, triangles_per_sec=len(faces) / seconds,
+                              pixels=pixels, pixels_per_sec=pixels / seconds, peak_memory_bytes=peak)
+                results.append(result)
+                print(json.dumps(result), file=sys.stderr)
+    return results
+
+
+def _jit_available(backends):
+    # numba is slow to import and may not be installed, so rendering.jit is only loaded when the jit backend is timed.
+    # None means it was not checked
+    if 'jit' not in backends:
+        return None
+    from rendering.jit import JIT_AVAILABLE
+    return JIT_AVAILABLE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--meshes', nargs='+', default=list(MESHES), choices=list(MESHES))
+    parser.add_argument('--triangles', nargs='+', type=int, default=[1000, 4000])
+    parser.add_argument('--coverage', type=float, default=0.5)
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', default=['scanline'], choices=['scanline', 'vectorized', 'jit'])
+    parser.add_argument('--functions', nargs='+', default=None,
+                        choices=['render_object_base', 'render_object_camera', 'render_object'])
+    parser.add_argument('--out', default=None, help='the JSON file to write, standard output if not given')
+    args = parser.parse_args(argv)
+
+    results = run(args.meshes, args.triangles, args.coverage, args.size, args.repeat, args.backends, args.functions)
+    report = dict(python=platform.python_version(), numpy=np.__version__, jit_available=_jit_available(args.backends),
+                  results=results)
+    if args.out is None:
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+
+
+def _grid_faces(rows, cols):
+    # Two triangles (a, b, c) and (a, c, d) for every cell abcd of a rows x cols grid of vertices
+    index = np.arange(rows * cols).reshape(rows, cols)
+    a = index[:-1, :-1].ravel()
+    b = index[:-1, 1:].ravel()
+    c = index[1:, 1:].ravel()
+    d = index[1:, :-1].ravel()
+    return np.concatenate([np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)])
+
+
+def _grid_shape(triangles):
+    # The number of vertices along each side of a square grid with about that many triangles
+    side = max(int(round(np.sqrt(triangles / 2))), 1) + 1
+    return side, side
+
+
+def _colors_from(points):
+    # Smoothly varying colours in [0, 1], so that Flat and Gouraud shading give different images
+    span = np.ptp(points, axis=0)
+    span[span == 0] = 1
+    return (points - points.min(axis=0)) / span
+
+
+def sphere(triangles, radius=1.0):
+    """
+    Generates a UV sphere centred at the origin
+
+    Args:
+        triangles: the approximate number of triangles
+        radius: the radius of the sphere
+
+    Returns:
+        verts: a N x 3 matrix with the coordinates of the vertices
+        faces: a K x 3 matrix describing the triangles, counter-clockwise as seen from outside
+        vcolors: a N x 3 matrix with the colour of every vertex
+    """
+    rings, segments = _grid_shape(triangles)
+    theta = np.linspace(0, np.pi, rings)
+    phi = np.linspace(0, 2 * np.pi, segments)
+    theta, phi = np.meshgrid(theta, phi, indexing='ij')
+    verts = radius * np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=2)
+    verts = verts.reshape(-1, 3)
+    # Going down the rings and around the segments winds the grid clockwise as seen from outside
+    faces = _grid_faces(rings, segments)[:, [0, 2, 1]]
+    # Triangles on the poles collapse to a line
+    a, b, c = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+    faces = faces[np.linalg.norm(np.cross(b - a, c - a), axis=1) > 1e-12]
+    return verts, faces, _colors_from(verts)
+
+
+def grid(triangles, size=2.0):
+    """
+    Generates a flat square grid on the z = 0 plane, centred at the origin
+
+    Args:
+        triangles: the approximate number of triangles
+        size: the side of the square
+
+    Returns:
+        verts: a N x 3 matrix with the coordinates of the vertices
+        faces: a K x 3 matrix describing the triangles, counter-clockwise as seen from +z
+        vcolors: a N x 3 matrix with the colour of every vertex
+    """
+    return terrain(triangles, size, height=0)
+
+
+def terrain(triangles, size=2.0, height=0.2, seed=0):
+    """
+    Generates a square grid displaced along z by smooth random noise, centred at the origin
+
+    Args:
+        triangles: the approximate number of triangles
+        size: the side of the square
+        height: the amplitude of the noise
+        seed: the seed of the noise
+
+    Returns:
+        verts: a N x 3 matrix with the coordinates of the vertices
+        faces: a K x 3 matrix describing the triangles, counter-clockwise as seen from +z
+        vcolors: a N x 3 matrix with the colour of every vertex
+    """
+    rows, cols = _grid_shape(triangles)
+    x, y = np.meshgrid(np.linspace(-size / 2, size / 2, cols), np.linspace(size / 2, -size / 2, rows))
+    # A sum of a few random waves is smooth at any resolution
+    rng = np.random.default_rng(seed)
+    z = np.zeros_like(x)
+    for frequency in [1, 2, 4, 8]:
+        kx, ky = rng.normal(size=2) * frequency * np.pi / size
+        z += np.sin(kx * x + ky * y + rng.uniform(0, 2 * np.pi)) / frequency
+    verts = np.stack([x, y, height * z], axis=2).reshape(-1, 3)
+    # Going down the rows and along the columns winds the grid clockwise as seen from +z
+    faces = _grid_faces(rows, cols)[:, [0, 2, 1]]
+    return verts, faces, _colors_from(verts)
+
+
+MESHES = {'sphere': sphere, 'grid': grid, 'terrain': terrain}
+
+
+def camera_for(verts, coverage, f=70, cam_w=15):
+    """
+    Places a camera on the +z axis looking at the origin, far enough for a mesh to span a fraction of the image
+
+    Args:
+        verts: a N x 3 matrix with the coordinates of the vertices of the mesh
+        coverage: the fraction of the width of the image the mesh spans
+        f: the distance between the camera lens and the inside camera shutter
+        cam_w: the width of the camera, measured in world units
+
+    Returns:
+        The position, target point and up vector of the camera
+    """
+    radius = np.max(np.abs(verts[:, 0:2]))
+    distance = 2 * f * radius / (coverage * cam_w) + np.max(verts[:, 2])
+    return np.array([0, 0, distance]), np.array([0, 0, 0]), np.array([0, 1, 0])
@@ -1,10 +1,10 @@
 import numpy as np
 from rendering.render import render_object_base
-import matplotlib.pyplot as plt
+from rendering.scene import load_scene
+from rendering.output import write_image
 
 
-data = np.load("../materials/hw1.npy", allow_pickle=True).tolist()
-data = dict(data)
+data = load_scene("../materials/hw1.json")
 
 verts2d = np.array(data['verts2d'])
 vcolors = np.array(data['vcolors'])
@@ -15,6 +15,4 @@ verts2d = verts2d.astype(int)
 
 img = render_object_base(verts2d, faces, vcolors, depth, 'Gouraud')
 
-plt.savefig('../results/Assignment 1 - Triangle Filling/Image_Fish_Gouraud.jpeg')
-plt.imshow(img)
-plt.show()
+write_image('../results/Assignment 1 - Triangle Filling/Image_Fish_Gouraud.png', img)
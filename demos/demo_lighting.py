@@ -1,9 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from rendering.render import render_object
-import cv2
+from rendering.scene import load_scene
+from rendering.output import write_image
 
-data = np.load("../materials/hw3.npy", allow_pickle=True).tolist()
+data = load_scene("../materials/hw3.json")
 verts = np.array(data['verts'])
 vertex_colors = np.array(data['vertex_colors'])
 face_indices = np.array(data['face_indices'])
@@ -28,59 +28,35 @@ focal = 70
 img = render_object('Ambient', 'Gouraud', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts,
                     vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Gouraud_Ambient.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Gouraud_Ambient.png', img)
 
 img = render_object('Diffuse', 'Gouraud', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts,
                     vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Gouraud_Diffuse.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Gouraud_Diffuse.png', img)
 
 img = render_object('Specular', 'Gouraud', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts,
                     vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Gouraud_Specular.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Gouraud_Specular.png', img)
 
 img = render_object('All', 'Gouraud', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts, vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Gouraud_All.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Gouraud_All.png', img)
 
 img = render_object('Ambient', 'Phong', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts, vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Phong_Ambient.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Phong_Ambient.png', img)
 
 img = render_object('Diffuse', 'Phong', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts, vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Phong_Diffuse.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Phong_Diffuse.png', img)
 
 img = render_object('Specular', 'Phong', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts, vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Phong_Specular.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Phong_Specular.png', img)
 
 img = render_object('All', 'Phong', focal, cam_eye, cam_lookat, cam_up, bg_color, M, N, H, W, verts, vertex_colors,
                     face_indices, ka, kd, ks, n, light_positions, light_intensities, Ia)
-plt.imshow(img)
-plt.axis('off')
-plt.savefig('../results/Assignment 3 - View/Dog_Phong_All.jpeg')
-plt.show()
+write_image('../results/Assignment 3 - View/Dog_Phong_All.png', img)
 
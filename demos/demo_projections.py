@@ -1,9 +1,10 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from rendering.render import render_object_camera
-from transformations.transform import affine_transform
+from rendering.render import render_sequence
+from rendering.scene import load_scene
+from rendering.output import FrameWriter
+from transformations.transform import affine_matrix
 
-data = np.load("../materials/hw2.npy", allow_pickle=True).tolist()
+data = load_scene("../materials/hw2.json")
 
 verts_3d = np.array(data['verts3d'])
 vcolors = np.array(data['vcolors'])
@@ -19,25 +20,16 @@ img_h = img_w = 512
 cam_h = cam_w = 15
 f = 70
 
-img = render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f, c_org, c_lookat, c_up)
-plt.imshow(img)
-plt.show()
-plt.savefig('../results/Assignment 2 - Projections & Transformations/Image_Fish_Normal.jpeg')
+# Every pose is the previous one with one more transformation applied to the object
+transforms = [np.eye(4)]
+transforms.append(np.dot(affine_matrix(u, 0, t_1), transforms[-1]))
+transforms.append(np.dot(affine_matrix(u, phi), transforms[-1]))
+transforms.append(np.dot(affine_matrix(u, 0, t_2), transforms[-1]))
+cameras = len(transforms) * [(c_org, c_lookat, c_up)]
+names = ['Normal', 'Offset_1', 'Rotated', 'Offset_2']
 
-verts_3d = affine_transform(verts_3d, u, 0, t_1)
-img = render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f, c_org, c_lookat, c_up)
-plt.imshow(img)
-plt.show()
-plt.savefig('../results/Assignment 2 - Projections & Transformations/Image_Fish_Offset_1.jpeg')
-
-verts_3d = affine_transform(verts_3d, u, phi)
-img = render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f, c_org, c_lookat, c_up)
-plt.imshow(img)
-plt.show()
-plt.savefig('../results/Assignment 2 - Projections & Transformations/Image_Fish_Rotated.jpeg')
-
-verts_3d = affine_transform(verts_3d, u, 0, t_2)
-img = render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f, c_org, c_lookat, c_up)
-plt.imshow(img)
-plt.show()
-plt.savefig('../results/Assignment 2 - Projections & Transformations/Image_Fish_Offset_2.jpeg')
+frames = render_sequence((verts_3d, faces, vcolors), cameras, transforms, img_h, img_w, cam_h, cam_w, f)
+# Frames are written from a background thread while the next ones are rendered
+with FrameWriter('../results/Assignment 2 - Projections & Transformations/Image_Fish_{}.png') as writer:
+    for name, img in zip(names, frames):
+        writer.write(img, writer.pattern.format(name))
@@ -1,2 +1,17 @@
 # __init__.py
-from rendering import light, helpers, render
+# Submodules are imported on first access (rendering.render, rendering.light, ...), so that importing the package
+# stays cheap for short-lived worker processes and optional dependencies such as numba are only loaded when used
+import importlib
+
+__all__ = ['bvh', 'cache', 'culling', 'deferred', 'framebuffer', 'helpers', 'jit', 'light', 'lod', 'mesh', 'output',
+           'parallel', 'profiling', 'rasterizer', 'render', 'retained', 'scene', 'shade']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
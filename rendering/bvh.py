@@ -0,0 +1,167 @@
+import numpy as np
+from transformations.projection import camera_axes
+
+
+class BVH:
+    """
+    A bounding volume hierarchy over the triangles of a mesh, built once by median splits along the longest axis of the
+    triangle centroids. Nodes are stored in flat arrays: the bounding box of node i is lower[i], upper[i], its children
+    are left[i] and right[i] (-1 for a leaf), and it holds the triangles faces[start[i]:start[i] + count[i]]
+    """
+    __slots__ = ('lower', 'upper', 'left', 'right', 'start', 'count', 'faces', 'triangles')
+
+    def __init__(self, verts, face_indices, leaf_size=8):
+        """
+        Args:
+            verts: a N x 3 matrix with the coordinates of the vertices of the object
+            face_indices: a K x 3 matrix describing the triangles
+            leaf_size: the largest number of triangles in a leaf
+        """
+        triangles = np.asarray(verts, dtype=float)[np.asarray(face_indices)]
+        lower, upper = triangles.min(axis=1), triangles.max(axis=1)
+        centroids = triangles.mean(axis=1)
+        order = np.arange(len(triangles))
+        nodes = []
+
+        def build(start, end):
+            node = len(nodes)
+            ids = order[start:end]
+            nodes.append([lower[ids].min(axis=0), upper[ids].max(axis=0), -1, -1, start, end - start])
+            if end - start <= leaf_size:
+                return node
+            axis = int(np.argmax(np.ptp(centroids[ids], axis=0)))
+            middle = (end - start) // 2
+            order[start:end] = ids[np.argpartition(centroids[ids, axis], middle)]
+            nodes[node][2] = build(start, start + middle)
+            nodes[node][3] = build(start + middle, end)
+            return node
+
+        if len(triangles):
+            build(0, len(triangles))
+        self.lower = np.array([node[0] for node in nodes]).reshape(-1, 3)
+        self.upper = np.array([node[1] for node in nodes]).reshape(-1, 3)
+        self.left, self.right, self.start, self.count = np.array([node[2:6] for node in nodes],
+                                                                 dtype=np.int64).reshape(-1, 4).T
+        self.faces = order
+        self.triangles = triangles[order]
+
+    def frustum_faces(self, eye, lookat, up, focal, H, W, near=0.0):
+        """
+        Finds the triangles whose bounding box is at least partly inside the view frustum of a camera, without
+        projecting anything. Subtrees completely outside one of the planes of the frustum are skipped, and subtrees
+        completely inside are taken whole
+
+        Args:
+            eye: the 3 × 1 vector containing the coordinates of the centre of the camera.
+            lookat: the 3 × 1 vector containing the coordinates of the camera target point.
+            up: the 3 × 1 unit "up" vector of the camera.
+            focal: the distance of the projection from the centre of the camera
+            H: the physical height of the camera lens
+            W: the physical width of the camera lens
+            near: the smallest depth in front of the camera that is kept
+
+        Returns:
+            The sorted indices of the triangles that may be visible
+        """
+        c_x, c_y, c_z = camera_axes(eye, lookat, up)
+        # Inside the frustum, n . p + d >= 0 for every plane. The image spans |y| <= H / 2 f z, |x| <= W / 2 f z
+        normals = np.array([c_z, H / (2 * focal) * c_z - c_y, H / (2 * focal) * c_z + c_y,
+                            W / (2 * focal) * c_z - c_x, W / (2 * focal) * c_z + c_x])
+        offsets = -normals @ np.asarray(eye, dtype=float)
+        offsets[0] -= near
+        positive = normals > 0
+
+        ranges = []
+        stack = [0] if len(self.faces) else []
+        while stack:
+            node = stack.pop()
+            farthest = np.where(positive, self.upper[node], self.lower[node])
+            if np.any(np.sum(normals * farthest, axis=1) + offsets < 0):
+                continue
+            nearest = np.where(positive, self.lower[node], self.upper[node])
+            if self.left[node] < 0 or np.all(np.sum(normals * nearest, axis=1) + offsets >= 0):
+                ranges.append(self.faces[self.start[node]:self.start[node] + self.count[node]])
+                continue
+            stack.append(self.right[node])
+            stack.append(self.left[node])
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(ranges))
+
+    def intersect(self, origin, direction):
+        """
+        Finds the closest triangle hit by a ray (Möller–Trumbore test on the leaves the ray reaches)
+
+        Args:
+            origin: the 3 × 1 start of the ray
+            direction: the 3 × 1 direction of the ray
+
+        Returns:
+            The index of the triangle hit and the ray parameter t of the hit (origin + t * direction), or -1 and
+            infinity if the ray hits nothing
+        """
+        origin = np.asarray(origin, dtype=float)
+        direction = np.asarray(direction, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = 1 / direction
+        best_face, best_t = -1, np.inf
+
+        stack = [0] if len(self.faces) else []
+        while stack:
+            node = stack.pop()
+            with np.errstate(invalid='ignore'):
+                t0 = (self.lower[node] - origin) * inverse
+                t1 = (self.upper[node] - origin) * inverse
+            t_near = np.max(np.minimum(t0, t1))
+            t_far = np.min(np.maximum(t0, t1))
+            if t_far < max(t_near, 0) or t_near > best_t:
+                continue
+            if self.left[node] >= 0:
+                stack.append(self.right[node])
+                stack.append(self.left[node])
+                continue
+
+            start = self.start[node]
+            t, hit = _ray_triangles(origin, direction, self.triangles[start:start + self.count[node]])
+            if np.any(hit):
+                closest = int(np.argmin(np.where(hit, t, np.inf)))
+                if t[closest] < best_t:
+                    best_face, best_t = int(self.faces[start + closest]), float(t[closest])
+        return best_face, best_t
+
+    def pick(self, x, y, eye, lookat, up, focal, M, N, H, W):
+        """
+        Finds the triangle seen through a pixel
+
+        Args:
+            x: the first (vertical) pixel coordinate
+            y: the second (horizontal) pixel coordinate
+            eye, lookat, up, focal, M, N, H, W: the camera and image, as in render_object
+
+        Returns:
+            The index of the closest triangle under the centre of the pixel and its depth, or -1 and infinity
+        """
+        c_x, c_y, c_z = camera_axes(eye, lookat, up)
+        # Inverse of project_cam and rasterize for the centre of the pixel, at depth 1
+        x_projected = (x + 0.5) * H / M - H / 2
+        y_projected = W / 2 - (y + 0.5) * W / N
+        direction = c_z - (x_projected / focal) * c_y - (y_projected / focal) * c_x
+        # The direction is one unit deep, so the ray parameter of the hit is its depth
+        return self.intersect(eye, direction)
+
+
+def _ray_triangles(origin, direction, triangles):
+    # Möller–Trumbore intersection of one ray with K triangles, returns the ray parameter and whether each is hit
+    edge1 = triangles[:, 1] - triangles[:, 0]
+    edge2 = triangles[:, 2] - triangles[:, 0]
+    p = np.cross(direction, edge2)
+    determinant = np.sum(edge1 * p, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1 / determinant
+        s = origin - triangles[:, 0]
+        u = np.sum(s * p, axis=1) * inverse
+        q = np.cross(s, edge1)
+        v = (q @ direction) * inverse
+        t = np.sum(edge2 * q, axis=1) * inverse
+    hit = (np.abs(determinant) > 1e-12) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > 0)
+    return t, hit
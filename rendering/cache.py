@@ -0,0 +1,132 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from .light import ambient_light, diffuse_light_batch, specular_light_batch
+from .profiling import count
+
+
+def state_key(*values):
+    """
+    Hashes the state a lighting term depends on
+
+    Args:
+        values: arrays and numbers, e.g. the points, normal vectors and light sources
+
+    Returns:
+        A short hex digest that changes whenever the shape, type or any value of one of the arguments changes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        value = np.ascontiguousarray(value)
+        digest.update(str((value.dtype.str, value.shape)).encode())
+        digest.update(value.data)
+    return digest.hexdigest()
+
+
+class LightingCache:
+    """
+    A least recently used cache of lighting terms, bounded by the number of bytes it holds. The diffuse and specular
+    light of K points (vertices or pixels of a geometry buffer) are kept separately, for a white surface and unit kd and
+    ks, under a hash of the points, normal vectors, light sources and (for the specular term) the camera and n. As the
+    lighting model is linear in the colour, kd and ks, renders that only change the lighting mode, the colours or these
+    coefficients reuse the stored terms, and 'All' is assembled from the terms 'Diffuse' and 'Specular' computed. The
+    ambient term is the constant ka Ia and is never stored
+    """
+    __slots__ = ('max_bytes', 'nbytes', 'hits', 'misses', '_entries')
+
+    def __init__(self, max_bytes=2 ** 27):
+        """
+        Args:
+            max_bytes: the largest total size of the stored terms. The least recently used ones are dropped beyond it
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drops every stored term"""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def cached(self, key, compute):
+        """
+        Returns a stored array, computing and storing it if it is not in the cache
+
+        Args:
+            key: the hash of the state the array depends on, e.g. from state_key
+            compute: a function without arguments that computes the array
+
+        Returns:
+            The array, read-only
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = compute()
+        value.flags.writeable = False
+        if value.nbytes <= self.max_bytes:
+            self._entries[key] = value
+            self.nbytes += value.nbytes
+            while self.nbytes > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self.nbytes -= dropped.nbytes
+        return value
+
+    def diffuse(self, P, normal_vectors, light_positions, light_intensities):
+        """
+        Returns:
+            A K × 3 matrix with the diffuse light of every point for a white surface and kd = 1
+        """
+        key = state_key('diffuse', P, normal_vectors, light_positions, light_intensities)
+        return self.cached(key, lambda: _unit_term(diffuse_light_batch, P, normal_vectors, 1.0, light_positions,
+                                                   light_intensities))
+
+    def specular(self, P, normal_vectors, cam_pos, n, light_positions, light_intensities):
+        """
+        Returns:
+            A K × 3 matrix with the specular light of every point for a white surface and ks = 1
+        """
+        key = state_key('specular', P, normal_vectors, cam_pos, n, light_positions, light_intensities)
+        return self.cached(key, lambda: _unit_term(specular_light_batch, P, normal_vectors, cam_pos, 1.0, n,
+                                                   light_positions, light_intensities))
+
+    def get_colors(self, lighting, P, normal_vectors, colors, cam_pos, ka, kd, ks, n, light_positions,
+                   light_intensities, Ia):
+        """
+        Calculates the color of K points like helpers.get_colors, with the diffuse and specular terms taken from the
+        cache when the points, normal vectors, camera and light sources were already lit
+
+        Args:
+            lighting, P, normal_vectors, colors, cam_pos, ka, kd, ks, n, light_positions, light_intensities, Ia:
+                as in helpers.get_colors
+
+        Returns:
+            A K × 3 matrix with the final color of every point
+        """
+        P = np.broadcast_to(P, np.shape(normal_vectors))
+        if lighting == 'Ambient':
+            return np.broadcast_to(ambient_light(ka, Ia), np.shape(colors)).copy()
+
+        result = ambient_light(ka, Ia) if lighting == 'All' else 0
+        if lighting in ['Diffuse', 'All']:
+            result = result + np.multiply(colors, kd * self.diffuse(P, normal_vectors, light_positions,
+                                                                    light_intensities))
+        if lighting in ['Specular', 'All']:
+            result = result + np.multiply(colors, ks * self.specular(P, normal_vectors, cam_pos, n, light_positions,
+                                                                     light_intensities))
+        return result
+
+
+def _unit_term(light_batch, P, normal_vectors, *args):
+    # One lighting term of a white surface, counted like a call of get_colors
+    count('lighting_calls')
+    count('lit_points', len(normal_vectors))
+    return light_batch(P, normal_vectors, np.ones(np.shape(normal_vectors)), *args)
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def cull_triangles(verts, verts2d, depth, face_indices, eye, M, N, backface=True):
+    """
+    Finds the triangles of an object that cannot appear in the image, so that they are removed before shading.
+    Triangles with a vertex behind the camera, triangles projected completely outside the image and (optionally)
+    triangles facing away from the camera are culled, in that order
+
+    Args:
+        verts: a N x 3 matrix with the coordinates of the vertices of the object
+        verts2d: a N x 2 matrix with the pixel coordinates of every projected vertex
+        depth: the depth of every vertex
+        face_indices: a K x 3 matrix describing the triangles. A triangle faces the camera when its vertices are in
+            counter-clockwise order, as seen from the camera
+        eye: the 3 × 1 vector containing the coordinates of the centre of the camera.
+        M: the height of the image in pixels
+        N: the width of the image in pixels
+        backface: whether triangles facing away from the camera are culled
+
+    Returns:
+        visible: the indices of the triangles that were kept
+        culled: a dict with the number of triangles removed for being 'behind' the camera, 'offscreen' and 'backface'
+    """
+    behind = np.any(depth[face_indices] <= 0, axis=1)
+
+    corners = verts2d[face_indices]
+    offscreen = (np.max(corners[:, :, 0], axis=1) < 0) | (np.min(corners[:, :, 0], axis=1) > M - 1) | \
+                (np.max(corners[:, :, 1], axis=1) < 0) | (np.min(corners[:, :, 1], axis=1) > N - 1)
+    offscreen &= ~behind
+
+    back = np.zeros(len(face_indices), dtype=bool)
+    if backface:
+        triangles = verts[face_indices]
+        face_normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        back = np.sum(face_normals * (np.reshape(eye, (1, 3)) - triangles[:, 0]), axis=1) <= 0
+        back &= ~(behind | offscreen)
+
+    visible = np.flatnonzero(~(behind | offscreen | back))
+    culled = {'behind': int(np.count_nonzero(behind)), 'offscreen': int(np.count_nonzero(offscreen)),
+              'backface': int(np.count_nonzero(back))}
+    return visible, culled
@@ -0,0 +1,81 @@
+import numpy as np
+from .rasterizer import depth_tested_fragments
+from .helpers import get_colors
+from .profiling import count
+
+
+def rasterize_gbuffer(verts2d, depth, verts, normals, vert_colors, face_indices, M, N):
+    """
+    Rasterizes the visible surface of an object into a geometry buffer. Nothing is lit at this stage, every visible pixel
+    only stores the interpolated position, normal vector and colour of the closest triangle covering it
+
+    Args:
+        verts2d: a N x 2 matrix with the pixel coordinates of every projected vertex
+        depth: the depth of every vertex
+        verts: a N x 3 matrix with the coordinates of the vertices of the object
+        normals: a N x 3 matrix with the normal vector of every vertex
+        vert_colors: a N x 3 matrix with the colour components of each vertex of the object
+        face_indices: a K x 3 matrix describing the triangles
+        M: the height of the generated image in pixels
+        N: the width of the generated image in pixels
+
+    Returns:
+        position: an M x N x 3 buffer with the coordinates of the surface point seen through every pixel
+        normal: an M x N x 3 buffer with the unit normal vector of the surface at every pixel
+        albedo: an M x N x 3 buffer with the colour of the surface at every pixel
+        zbuf: an M x N float32 depth buffer, set to infinity where no triangle was drawn
+    """
+    position = np.zeros((M, N, 3))
+    normal = np.zeros((M, N, 3))
+    albedo = np.zeros((M, N, 3))
+    zbuf = np.full((M, N), np.inf, dtype=np.float32)
+
+    depth_order = np.array(np.mean(depth[face_indices], axis=1))
+    for triangle in np.argsort(depth_order):
+        triangle_vertices_indeces = face_indices[triangle]
+        xs, ys, weights = depth_tested_fragments(zbuf, verts2d[triangle_vertices_indeces],
+                                                 depth[triangle_vertices_indeces])
+        if len(xs) == 0:
+            continue
+        position[xs, ys] = np.dot(weights, verts[triangle_vertices_indeces])
+        normal[xs, ys] = np.dot(weights, normals[triangle_vertices_indeces])
+        albedo[xs, ys] = np.dot(weights, vert_colors[triangle_vertices_indeces])
+
+    lengths = np.linalg.norm(normal, axis=2, keepdims=True)
+    np.divide(normal, lengths, out=normal, where=lengths > 0)
+    return position, normal, albedo, zbuf
+
+
+def shade_gbuffer(lighting, position, normal, albedo, zbuf, cam_pos, ka, kd, ks, n, light_positions,
+                  light_intensities, Ia, img, lighting_cache=None):
+    """
+    Lights every visible pixel of a geometry buffer in a single pass, using the same Ambient, Diffuse, Specular and All
+    models as get_color
+
+    Args:
+        lighting: a variable that controls whether all the light sources in the scene will be used, or just one and which one.
+        position: an M x N x 3 buffer with the coordinates of the surface point seen through every pixel
+        normal: an M x N x 3 buffer with the unit normal vector of the surface at every pixel
+        albedo: an M x N x 3 buffer with the colour of the surface at every pixel
+        zbuf: an M x N depth buffer, set to infinity where no triangle was drawn
+        cam_pos: a 3 × 1 column vector with the coordinates of the observer (i.e. the camera).
+        ka: the factor of diffused light from the environment
+        kd: the diffuse reflection coefficient of the Phong model
+        ks: the specular reflection coefficient of the Phong model
+        n: the Phong coefficient
+        light_positions: a list of 3 × N vectors containing the components of the position of the light sources.
+        light_intensities: a list of 3 × N vectors containing the intensities of the bright sources (corresponding to light_positions).
+        Ia: the 3 × 1 vector with the components of the diffuse irradiance of the ambient radiation intensity. Each component belongs to the interval [0, 1].
+        img: an image (M × N × 3 matrix) the lit pixels are written to
+        lighting_cache: an optional rendering.cache.LightingCache the diffuse and specular light of the pixels are
+            taken from, or stored in
+
+    Returns:
+        The image with every visible pixel lit
+    """
+    visible = np.isfinite(zbuf)
+    count('pixels_written', np.count_nonzero(visible))
+    shade = get_colors if lighting_cache is None else lighting_cache.get_colors
+    img[visible] = shade(lighting, position[visible], normal[visible], albedo[visible], cam_pos, ka, kd, ks, n,
+                         light_positions, light_intensities, Ia)
+    return img
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class Framebuffer:
+    """
+    A colour image and an optional depth buffer that are allocated once and cleared in place for every frame, so that
+    rendering a sequence of frames does not allocate a new image every time
+    """
+    __slots__ = ('color', 'depth', 'bg_color')
+
+    def __init__(self, M, N, dtype=np.float32, depth=False, bg_color=(1, 1, 1)):
+        """
+        Args:
+            M: the height of the image in pixels
+            N: the width of the image in pixels
+            dtype: the floating point type of the colour image
+            depth: whether an M × N float32 depth buffer is allocated as well
+            bg_color: the 3 × 1 vector with the colour components the image is cleared to
+        """
+        self.color = np.empty((M, N, 3), dtype=dtype)
+        self.depth = np.empty((M, N), dtype=np.float32) if depth else None
+        self.bg_color = np.asarray(bg_color)
+        self.clear()
+
+    @property
+    def shape(self):
+        """The height and width of the image in pixels"""
+        return self.color.shape[0:2]
+
+    def clear(self, bg_color=None):
+        """
+        Fills the colour image with the background colour and the depth buffer (if any) with infinity, in place
+
+        Args:
+            bg_color: the background colour, the one given to the constructor if None. It is kept for the next clears
+
+        Returns:
+            The framebuffer
+        """
+        if bg_color is not None:
+            self.bg_color = np.asarray(bg_color)
+        self.color[:] = self.bg_color
+        if self.depth is not None:
+            self.depth.fill(np.inf)
+        return self
+
+    def matches(self, M, N, depth=False, dtype=None):
+        """
+        Returns:
+            Whether the framebuffer is M × N pixels, has a depth buffer if one is needed and a colour image of the
+            floating point type dtype (of any type if dtype is None)
+        """
+        return (self.shape == (M, N) and (not depth or self.depth is not None) and
+                (dtype is None or self.color.dtype == dtype))
+
+
+def get_framebuffer(framebuffer, M, N, dtype, depth, bg_color):
+    """
+    Returns a cleared framebuffer for a frame, reusing the given one if it fits
+
+    Args:
+        framebuffer: a Framebuffer to reuse, or None
+        M: the height of the image in pixels
+        N: the width of the image in pixels
+        dtype: the floating point type of the colour image. A given framebuffer must have it too
+        depth: whether the frame needs a depth buffer
+        bg_color: the background colour, or None to keep the one of the framebuffer (white for a new one)
+
+    Returns:
+        The given framebuffer cleared, or a new one if None was given
+    """
+    if framebuffer is None:
+        return Framebuffer(M, N, dtype, depth, (1, 1, 1) if bg_color is None else bg_color)
+    assert framebuffer.matches(M, N, depth, dtype), 'the framebuffer does not fit the frame'
+    return framebuffer.clear(bg_color)
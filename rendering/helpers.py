@@ -1,6 +1,7 @@
 import numpy as np
 from numpy import linalg as la
-from .light import ambient_light, diffuse_light, specular_light
+from .light import ambient_light, diffuse_light_batch, specular_light_batch
+from .profiling import count
 
 
 class Edge:
@@ -85,6 +86,78 @@ def interpolate_vector(x1, x2, x, vector1, vector2):
     return vector
 
 
+def interpolate_color_span(x1, x2, x_start, x_end, C1, C2, out=None):
+    """
+    Interpolates color C1, C2 of points x1 and x2 for every point of a span x_start, x_start + 1, ..., x_end at once.
+    Gives the same colors as calling interpolate_color for every point of the span
+
+    Args:
+        x1: A coordinate of vertice 1 (horizontal or vertical) of a triangle
+        x2: A coordinate of vertice 2 (horizontal or vertical) of a triangle
+        x_start: The coordinate of the first point of the span
+        x_end: The coordinate of the last point of the span (included)
+        C1: The color at x1
+        C2: The color at x2
+        out: an optional K x 3 matrix (K the length of the span) the colors are written to, e.g. a slice of the image
+
+    Returns:
+        A K x 3 matrix with the color of every point of the span
+    """
+
+    if out is None:
+        out = np.empty((max(x_end - x_start + 1, 0), 3))
+    if abs(x1 - x2) < 1e-3:
+        out[:] = C1
+        return out
+    t = (np.arange(x_start, x_end + 1) - x1) / (x2 - x1)  # slope of linear interpolation
+    np.multiply(t[:, np.newaxis], C2 - C1, out=out)
+    out += C1
+    return np.abs(out, out=out)
+
+
+def interpolate_vector_span(x1, x2, x_start, x_end, vector1, vector2, out=None):
+    """
+    Interpolates vectors horizontally or vertically between points A and B for every point of a span x_start,
+    x_start + 1, ..., x_end at once. Gives the same vectors as calling interpolate_vector for every point of the span
+    Args:
+        x1: A coordinate value (horizontal or vertical) of point A
+        x2: A coordinate value (horizontal or vertical) of point B
+        x_start: The coordinate of the first point of the span
+        x_end: The coordinate of the last point of the span (included)
+        vector1: The normal vector at point A
+        vector2: The normal Vector at point B
+        out: an optional K x 3 matrix (K the length of the span) the normal vectors are written to
+
+    Returns:
+        A K x 3 matrix with the normal vector at every point of the span
+    """
+    if out is None:
+        out = np.empty((max(x_end - x_start + 1, 0), 3))
+    if abs(x1 - x2) < 1e-3:
+        out[:] = vector1
+        return out
+    t = (x2 - np.arange(x_start, x_end + 1)) / (x2 - x1)  # slope of linear interpolation
+    np.multiply(t[:, np.newaxis], vector1, out=out)
+    out += (1 - t)[:, np.newaxis] * vector2
+    out /= la.norm(out, axis=1, keepdims=True)
+    return out
+
+
+def clip_span(x_start, x_end, size, first=0):
+    """
+    Clips a span x_start, x_start + 1, ..., x_end to the pixels first, ..., size - 1 of an image line
+    Args:
+        x_start: The coordinate of the first point of the span
+        x_end: The coordinate of the last point of the span (included)
+        size: The number of pixels of the line
+        first: The first pixel of the line that may be drawn, e.g. the edge of a screen tile
+
+    Returns:
+        The first and last pixel of the clipped span. The span is empty if the first is greater than the last
+    """
+    return max(int(x_start), first), min(int(x_end), size - 1)
+
+
 def find_initial_elements(edges, active_edges):
     """
     Calculates initial active points and colors
@@ -152,7 +225,7 @@ def swap(object_a, object_b):
     return object_a, object_b
 
 
-def rasterize(verts_2d, img_h, img_w, cam_h, cam_w):
+def rasterize(verts_2d, img_h, img_w, cam_h, cam_w, out=None, subpixel=False):
     """
     Takes every projected point from the camera's shutter and places them in a digital photo.
     Args:
@@ -161,46 +234,94 @@ def rasterize(verts_2d, img_h, img_w, cam_h, cam_w):
         img_w: The width of the image, measured in pixels
         cam_h: The height of the camera, measured in world units
         cam_w: The width of the camera, measured in world units
+        out: an optional preallocated Nx2 float matrix the result is written to
+        subpixel: if True, the points are not rounded to whole pixels
 
     Returns:
         verts_rast: projected points placed in a canvas
     """
 
-    verts_rast = np.zeros((len(verts_2d), 2))
+    if out is None:
+        out = np.empty((len(verts_2d), 2))
     width = img_w / cam_w
     height = img_h / cam_h
-    for i in range(len(verts_2d)):
-        verts_rast[i, 0] = np.around((verts_2d[i, 0] + cam_h / 2) * height - 0.5)
-        verts_rast[i, 1] = np.around((-verts_2d[i, 1] + cam_w / 2) * width - 0.5)
-    return verts_rast
+    out[:, 0] = verts_2d[:, 0] + cam_h / 2
+    out[:, 0] *= height
+    out[:, 1] = cam_w / 2 - verts_2d[:, 1]
+    out[:, 1] *= width
+    out -= 0.5
+    if subpixel:
+        return out
+    return np.around(out, out=out)
 
 
-def calculate_normals(vertices, face_indices):
+def calculate_normals(vertices, face_indices, weighting=None):
     """
     Calculates the normal surface vectors
 
     Args:
         vertices: a 3 × N matrix with the coordinates of the vertices of the obje
         face_indices: A 3 × N matrix with the coordinates of the vertical vectors in each point (vertex) of the surface defining the object
+        weighting: how much every face contributes to the normal vector of its vertices. None weights every face by the
+            sine of its angle at the first vertex, 'area' weights it by its area and 'angle' by the angle of the face at
+            each vertex. Faces with zero area never contribute
 
     Returns:
         Normal vectors in each triangle vertice
     """
+    assert weighting in [None, 'area', 'angle']
+
+    N_vectors = accumulate_normals(np.zeros(vertices.shape), vertices, face_indices, weighting)
+    return _normalize_rows(N_vectors)
+
+
+def _normal_contributions(triangles, weighting):
+    # The vector every triangle adds to the normal vector of each of its 3 vertices (K x 3 x 3)
+    triangle_sides_AB = triangles[:, 0] - triangles[:, 1]
+    triangle_sides_AC = triangles[:, 0] - triangles[:, 2]
+
+    if weighting == 'area':
+        contributions = np.cross(triangle_sides_AC, triangle_sides_AB) / 2
+        contributions = np.repeat(contributions[:, np.newaxis, :], 3, axis=1)
+    elif weighting == 'angle':
+        face_normals = _normalize_rows(np.cross(triangle_sides_AC, triangle_sides_AB))
+        # Unit vectors from every corner of a triangle towards the next and the previous corner
+        to_next = _normalize_rows(np.roll(triangles, -1, axis=1) - triangles)
+        to_prev = _normalize_rows(np.roll(triangles, 1, axis=1) - triangles)
+        angles = np.arccos(np.clip(np.sum(to_next * to_prev, axis=2), -1, 1))
+        contributions = angles[:, :, np.newaxis] * face_normals[:, np.newaxis, :]
+    else:
+        contributions = np.cross(_normalize_rows(triangle_sides_AC), _normalize_rows(triangle_sides_AB))
+        contributions = np.repeat(contributions[:, np.newaxis, :], 3, axis=1)
 
-    N_vectors = np.zeros(vertices.shape)
+    return contributions
 
-    for face_index in face_indices:
-        triangle = vertices[face_index]
-        triangle_side_AB = (triangle[0] - triangle[1]) / la.norm((triangle[0] - triangle[1]))
-        triangle_side_AC = (triangle[0] - triangle[2]) / la.norm((triangle[0] - triangle[2]))
-        triangle_normal_vector = np.cross(triangle_side_AC, triangle_side_AB)
-        N_vectors[face_index] += triangle_normal_vector
 
-    for i in range(len(N_vectors)):
-        N_vectors[i] /= la.norm(N_vectors[i])
+def accumulate_normals(N_vectors, vertices, face_indices, weighting=None):
+    """
+    Adds the contributions of some triangles to unnormalized vertex normal vectors, so that the normal vectors of a
+    mesh too large for memory can be summed one chunk of triangles at a time. Normalizing the sum over all the
+    triangles gives the same vectors as calculate_normals
+
+    Args:
+        N_vectors: a N x 3 float matrix the contributions are added to, in place
+        vertices: a N x 3 matrix with the coordinates of all the vertices of the object
+        face_indices: a K x 3 matrix with some of the triangles, pointing into vertices
+        weighting: as in calculate_normals
+
+    Returns:
+        N_vectors
+    """
+    np.add.at(N_vectors, face_indices, _normal_contributions(vertices[face_indices], weighting))
     return N_vectors
 
 
+def _normalize_rows(vectors):
+    # Scales the vectors along the last axis to unit length, leaving zero vectors untouched
+    lengths = la.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, lengths, out=np.zeros(np.shape(vectors)), where=lengths > 0)
+
+
 def get_color(lighting, P, normal_vector, color, cam_pos, ka, kd, ks, n, light_positions, light_intensities, Ia):
     """
     Calculates the color of a pixel depending on lighting
@@ -223,18 +344,48 @@ def get_color(lighting, P, normal_vector, color, cam_pos, ka, kd, ks, n, light_p
         The final color of a pixel
     """
 
+    return get_colors(lighting, np.reshape(P, (1, 3)), np.reshape(normal_vector, (1, 3)), np.reshape(color, (1, 3)),
+                      cam_pos, ka, kd, ks, n, light_positions, light_intensities, Ia)[0]
+
+
+def get_colors(lighting, P, normal_vectors, colors, cam_pos, ka, kd, ks, n, light_positions, light_intensities, Ia):
+    """
+    Calculates the color of K points at once depending on lighting
+
+    Args:
+         lighting: a variable that controls whether all the light sources in the scene will be used, or just one and which one.
+         P: a K × 3 matrix with the coordinates of the points (or a single 3 × 1 vector shared by all of them).
+         normal_vectors: a K × 3 matrix with the unit normal vector at every point
+         colors: a K × 3 matrix with the colour of every point
+         cam_pos: a 3 × 1 column vector with the coordinates of the observer (i.e. the camera).
+         ka: the factor of diffused light from the environment
+         kd: the diffuse reflection coefficient of the Phong model
+         ks: the specular reflection coefficient of the Phong model
+         n: the Phong coefficient
+         light_positions: an L × 3 matrix with the position of every light source.
+         light_intensities: an L × 3 matrix with the intensity of every light source (corresponding to light_positions).
+         Ia: the 3 × 1 vector with the components of the diffuse irradiance of the ambient radiation intensity. Each component belongs to the interval [0, 1].
+
+    Returns:
+        A K × 3 matrix with the final color of every point
+    """
+
+    count('lighting_calls')
+    count('lit_points', np.size(colors) // 3)
+    P = np.broadcast_to(P, np.shape(normal_vectors))
+
     if lighting == 'Ambient':
-        color = ambient_light(ka, Ia)
+        colors = np.broadcast_to(ambient_light(ka, Ia), np.shape(colors)).copy()
 
     if lighting == 'Diffuse':
-        color = diffuse_light(P, normal_vector, color, kd, light_positions, light_intensities)
+        colors = diffuse_light_batch(P, normal_vectors, colors, kd, light_positions, light_intensities)
 
     if lighting == 'Specular':
-        color = specular_light(P, normal_vector, color, cam_pos, ks, n, light_positions, light_intensities)
+        colors = specular_light_batch(P, normal_vectors, colors, cam_pos, ks, n, light_positions, light_intensities)
 
     if lighting == 'All':
-        color = ambient_light(ka, Ia) + \
-                diffuse_light(P, normal_vector, color, kd, light_positions, light_intensities) + \
-                specular_light(P, normal_vector, color, cam_pos, ks, n, light_positions, light_intensities)
+        colors = ambient_light(ka, Ia) + \
+                 diffuse_light_batch(P, normal_vectors, colors, kd, light_positions, light_intensities) + \
+                 specular_light_batch(P, normal_vectors, colors, cam_pos, ks, n, light_positions, light_intensities)
 
-    return color
+    return colors
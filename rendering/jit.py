@@ -0,0 +1,355 @@
+import math
+import numpy as np
+from .helpers import get_colors
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Whether the compiled kernels can be used. Without numba the renderers fall back to the Python scanline shaders
+JIT_AVAILABLE = njit is not None
+
+
+def _jit(function):
+    return njit(cache=True)(function) if JIT_AVAILABLE else function
+
+
+@_jit
+def _interpolate_color(x1, x2, x, C1, C2, out):
+    # interpolate_color writing into out
+    if abs(x1 - x2) < 1e-3:
+        out[:] = C1
+        return
+    t = (x - x1) / (x2 - x1)
+    for c in range(out.shape[0]):
+        out[c] = abs(C1[c] + t * (C2[c] - C1[c]))
+
+
+@_jit
+def _interpolate_vector(x1, x2, x, vector1, vector2, out):
+    # interpolate_vector writing into out
+    if abs(x1 - x2) < 1e-3:
+        out[:] = vector1
+        return
+    t = (x2 - x) / (x2 - x1)
+    length = 0.0
+    for c in range(out.shape[0]):
+        out[c] = t * vector1[c] + (1 - t) * vector2[c]
+        length += out[c] * out[c]
+    length = math.sqrt(length)
+    for c in range(out.shape[0]):
+        out[c] /= length
+
+
+@_jit
+def _setup_edges(verts, edges, slopes, y_mins, y_maxs):
+    # The Edge objects of the scanline shaders, as flat arrays
+    for e in range(3):
+        a = edges[e, 0]
+        b = edges[e, 1]
+        if verts[a, 0] == verts[b, 0]:
+            slopes[e] = np.inf
+        else:
+            slopes[e] = (verts[a, 1] - verts[b, 1]) / (verts[a, 0] - verts[b, 0])
+        y_mins[e] = min(verts[a, 1], verts[b, 1])
+        y_maxs[e] = max(verts[a, 1], verts[b, 1])
+
+
+@_jit
+def _initial_active_edges(y_min, slopes, y_mins, active):
+    # Returns the number of active edges and whether the bottom of the triangle is a horizontal edge
+    count = 0
+    horizontal_line = False
+    for e in range(3):
+        if y_min == y_mins[e]:
+            if slopes[e] != 0:
+                if count < 2:
+                    active[count] = e
+                count += 1
+            else:
+                horizontal_line = True
+    return count, horizontal_line
+
+
+@_jit
+def _initial_end(verts, edges, e, y_maxs):
+    # find_initial_elements for one active edge, returns the vertex the scanline starts from
+    a = edges[e, 0]
+    if verts[a, 1] == y_maxs[e]:
+        return edges[e, 1]
+    return a
+
+
+@_jit
+def _update_active_edges(y, y_mins, y_maxs, active):
+    if y == y_maxs[active[0]]:
+        for e in range(3):
+            if y == y_mins[e]:
+                active[0] = e
+    elif y == y_maxs[active[1]]:
+        for e in range(3):
+            if y == y_mins[e]:
+                active[1] = e
+
+
+@_jit
+def _fill_colors(img, verts2d, colors, means, gouraud, paint_points):
+    """
+    Compiled scanline of shade_triangle (and of shade_gouraud, whose vertex colours are already lit) for a sequence of
+    triangles, drawn in order
+
+    Args:
+        img: an image (M × N × 3 matrix) with any pre-existing triangles
+        verts2d: a T × 3 × 2 integer array with the pixel coordinates of the vertices of every triangle
+        colors: a T × 3 × 3 array with the colours of the vertices of every triangle
+        means: a T × 3 array with the mean colour of every triangle
+        gouraud: True to interpolate the vertex colours, False to fill the triangles with their mean colour
+        paint_points: whether triangles collapsed to a single point paint that pixel, like shade_triangle does
+    """
+    M = img.shape[0]
+    N = img.shape[1]
+    # The vertices at the two ends of the edges AB, BC and AC, in the order the scanline shaders create them
+    edges = np.array([[0, 1], [1, 2], [0, 2]])
+    slopes = np.empty(3)
+    y_mins = np.empty(3, dtype=np.int64)
+    y_maxs = np.empty(3, dtype=np.int64)
+    active = np.zeros(2, dtype=np.int64)
+    color_A = np.empty(3)
+    color_B = np.empty(3)
+
+    for t in range(verts2d.shape[0]):
+        v = verts2d[t]
+        C = colors[t]
+        mean = means[t]
+
+        same_01 = v[0, 0] == v[1, 0] and v[0, 1] == v[1, 1]
+        same_12 = v[1, 0] == v[2, 0] and v[1, 1] == v[2, 1]
+        same_02 = v[0, 0] == v[2, 0] and v[0, 1] == v[2, 1]
+        if same_01 and same_12:
+            x = v[0, 0]
+            y = v[0, 1]
+            if paint_points and 0 <= x <= M - 1 and 0 <= y <= N - 1:
+                img[x, y] = mean
+            continue
+        if same_01 or same_12 or same_02:
+            continue
+
+        _setup_edges(v, edges, slopes, y_mins, y_maxs)
+        y_min = min(v[0, 1], v[1, 1], v[2, 1])
+        y_max = max(v[0, 1], v[1, 1], v[2, 1])
+        count, horizontal_line = _initial_active_edges(y_min, slopes, y_mins, active)
+        if count < 2:
+            continue
+
+        if not horizontal_line:
+            index = 0
+            for i in range(3):
+                if v[i, 1] == y_min:
+                    index = i
+            x1 = float(v[index, 0])
+            x2 = x1
+            if 0 <= x1 <= M - 1 and 0 <= y_min <= N - 1:
+                img[int(math.floor(x1 + 0.5)), y_min] = C[index]
+        else:
+            n1 = _initial_end(v, edges, active[0], y_maxs)
+            n2 = _initial_end(v, edges, active[1], y_maxs)
+            x1 = float(v[n1, 0])
+            x2 = float(v[n2, 0])
+            for x in range(v[n1, 0], v[n2, 0] + 1):
+                if 0 <= x <= M - 1 and 0 <= y_min <= N - 1:
+                    if gouraud:
+                        _interpolate_color(x1, x2, x, C[n1], C[n2], img[x, y_min])
+                    else:
+                        img[x, y_min] = mean
+
+        for y in range(y_min + 1, y_max + 1):
+            if slopes[active[0]] != np.inf:
+                x1 = x1 + 1 / slopes[active[0]]
+            if slopes[active[1]] != np.inf:
+                x2 = x2 + 1 / slopes[active[1]]
+            e1 = active[0]
+            e2 = active[1]
+            _interpolate_color(y_mins[e1], y_maxs[e1], y, C[edges[e1, 0]], C[edges[e1, 1]], color_A)
+            _interpolate_color(y_mins[e2], y_maxs[e2], y, C[edges[e2, 0]], C[edges[e2, 1]], color_B)
+            if 0 <= y <= N - 1:
+                for x in range(int(min(x1, x2)), int(max(x1, x2)) + 1):
+                    if 0 <= x <= M - 1:
+                        if gouraud:
+                            _interpolate_color(int(x1), int(x2), x, color_A, color_B, img[x, y])
+                        else:
+                            img[x, y] = mean
+            _update_active_edges(y, y_mins, y_maxs, active)
+
+
+@_jit
+def _fill_phong(color_buf, normal_buf, ids, verts2d, colors, normals):
+    """
+    Compiled scanline of shade_phong for a sequence of triangles, drawn in order. Instead of lighting every pixel, the
+    interpolated colour and normal vector are stored with the index of the triangle, so that only the pixels left
+    visible at the end need to be lit
+
+    Args:
+        color_buf: an M × N × 3 buffer for the interpolated colours
+        normal_buf: an M × N × 3 buffer for the interpolated normal vectors
+        ids: an M × N integer buffer for the index (into verts2d) of the triangle every pixel was last written by
+        verts2d: a T × 3 × 2 integer array with the pixel coordinates of the vertices of every triangle
+        colors: a T × 3 × 3 array with the colours of the vertices of every triangle
+        normals: a T × 3 × 3 array with the normal vectors of the vertices of every triangle
+    """
+    M = color_buf.shape[0]
+    N = color_buf.shape[1]
+    # The vertices at the two ends of the edges AB, BC and AC, in the order the scanline shaders create them
+    edges = np.array([[0, 1], [1, 2], [0, 2]])
+    slopes = np.empty(3)
+    y_mins = np.empty(3, dtype=np.int64)
+    y_maxs = np.empty(3, dtype=np.int64)
+    active = np.zeros(2, dtype=np.int64)
+    color_A = np.empty(3)
+    color_B = np.empty(3)
+    normal_1 = np.empty(3)
+    normal_2 = np.empty(3)
+
+    for t in range(verts2d.shape[0]):
+        v = verts2d[t]
+        C = colors[t]
+        Nv = normals[t]
+
+        _setup_edges(v, edges, slopes, y_mins, y_maxs)
+        y_min = min(v[0, 1], v[1, 1], v[2, 1])
+        y_max = max(v[0, 1], v[1, 1], v[2, 1])
+        count, horizontal_line = _initial_active_edges(y_min, slopes, y_mins, active)
+        if count < 2:
+            continue
+
+        if not horizontal_line:
+            index = 0
+            for i in range(3):
+                if v[i, 1] == y_min:
+                    index = i
+            x1 = float(v[index, 0])
+            x2 = x1
+            if 0 <= x1 <= M - 1 and 0 <= y_min <= N - 1:
+                x = int(math.floor(x1 + 0.5))
+                color_buf[x, y_min] = C[index]
+                normal_buf[x, y_min] = Nv[index]
+                ids[x, y_min] = t
+        else:
+            # The scanline shader picks the normal vectors by the end of the edge (0 or 1), not by the vertex
+            n1 = _initial_end(v, edges, active[0], y_maxs)
+            n2 = _initial_end(v, edges, active[1], y_maxs)
+            end1 = 0 if n1 == edges[active[0], 0] else 1
+            end2 = 0 if n2 == edges[active[1], 0] else 1
+            x1 = float(v[n1, 0])
+            x2 = float(v[n2, 0])
+            for x in range(v[n1, 0], v[n2, 0] + 1):
+                if 0 <= x <= M - 1 and 0 <= y_min <= N - 1:
+                    _interpolate_vector(x1, x2, x, Nv[end1], Nv[end2], normal_buf[x, y_min])
+                    _interpolate_color(x1, x2, x, C[n1], C[n2], color_buf[x, y_min])
+                    ids[x, y_min] = t
+
+        for y in range(y_min + 1, y_max + 1):
+            if slopes[active[0]] != 0:
+                x1 = x1 + 1 / slopes[active[0]]
+            if slopes[active[1]] != 0:
+                x2 = x2 + 1 / slopes[active[1]]
+            e1 = active[0]
+            e2 = active[1]
+            _interpolate_vector(y_mins[e1], y_maxs[e1], y, Nv[edges[e1, 0]], Nv[edges[e1, 1]], normal_1)
+            _interpolate_vector(y_mins[e2], y_maxs[e2], y, Nv[edges[e2, 0]], Nv[edges[e2, 1]], normal_2)
+            _interpolate_color(y_mins[e1], y_maxs[e1], y, C[edges[e1, 0]], C[edges[e1, 1]], color_A)
+            _interpolate_color(y_mins[e2], y_maxs[e2], y, C[edges[e2, 0]], C[edges[e2, 1]], color_B)
+            if 0 <= y <= N - 1:
+                for x in range(int(min(x1, x2)), int(max(x1, x2)) + 1):
+                    if 0 <= x <= M - 1:
+                        _interpolate_color(int(x1), int(x2), x, color_A, color_B, color_buf[x, y])
+                        _interpolate_vector(x1, x2, x, normal_1, normal_2, normal_buf[x, y])
+                        ids[x, y] = t
+            _update_active_edges(y, y_mins, y_maxs, active)
+
+
+def fill_triangles_compiled(img, verts2d, vcolors, faces, triangles, shade_t='Flat'):
+    """
+    Draws a sequence of triangles with the compiled scanline. Gives the same pixels as calling shade_triangle for every
+    triangle in order. With float32 colours or images, Gouraud colours may differ in the last bit, as numba and numpy do
+    not round float32 arithmetic alike
+
+    Args:
+        img: An image with possible pre-existing triangles
+        verts2d: A N x 2 integer matrix with the pixel coordinates of every vertex
+        vcolors: A N x 3 matrix with the colour of every vertex
+        faces: A K x 3 matrix describing the triangles
+        triangles: the indices of the triangles to draw, in drawing order
+        shade_t: the Shading mode. This can be flat(mean of color) or Gouraud(linear interpolation of color)
+
+    Returns:
+        The image with the triangles drawn on it
+    """
+    triangle_faces = faces[np.asarray(triangles, dtype=np.int64)]
+    colors, means = _colors_and_means(vcolors, triangle_faces)
+    _fill_colors(img, np.ascontiguousarray(verts2d[triangle_faces], dtype=np.int64), colors, means,
+                 shade_t == 'Gouraud', True)
+    return img
+
+
+def _colors_and_means(vcolors, triangle_faces):
+    # The colours keep their own precision, the scanline shaders do part of the interpolation in it
+    colors = np.ascontiguousarray(vcolors[triangle_faces])
+    return colors, np.mean(colors, axis=1).astype(np.float64)
+
+
+def shade_triangles_compiled(img, triangles, scene):
+    """
+    Compiled counterpart of shade_triangles for triangles overdrawn in the given order (no depth buffer). Vertex
+    lighting of Gouraud shading is evaluated for all triangles in one batch and Phong shading lights only the pixels
+    that are still visible once every triangle has been drawn
+
+    Args:
+        img: an image (M × N × 3 matrix) with any pre-existing triangles
+        triangles: the indices of the triangles to draw, in drawing order
+        scene: the object and lighting parameters, as expected by shade_triangles
+
+    Returns:
+        The image with the triangles drawn on it, img itself
+    """
+    # The kernels draw into a contiguous double precision image, copied back if img is not one
+    out = np.ascontiguousarray(img, dtype=np.float64)
+    _shade_triangles_compiled(out, triangles, scene)
+    if out is not img:
+        img[...] = out
+    return img
+
+
+def _shade_triangles_compiled(img, triangles, scene):
+    # shade_triangles_compiled on a contiguous float64 image
+    lighting, shader = scene['lighting'], scene['shader']
+    lighting_args = (scene['cam_pos'], scene['ka'], scene['kd'], scene['ks'], scene['n'], scene['light_positions'],
+                     scene['light_intensities'], scene['Ia'])
+    triangle_faces = scene['face_indices'][np.asarray(triangles, dtype=np.int64)]
+    verts2d = np.ascontiguousarray(scene['verts2d'][triangle_faces], dtype=np.int64)
+
+    if scene['lit_vert_colors'] is not None:
+        colors, means = _colors_and_means(scene['lit_vert_colors'], triangle_faces)
+        _fill_colors(img, verts2d, colors, means, True, True)
+        return img
+
+    normals = scene['normals'][triangle_faces].reshape(-1, 3)
+    colors = scene['vert_colors'][triangle_faces].reshape(-1, 3)
+    barycentres = np.mean(scene['verts'][triangle_faces], axis=1)
+
+    if shader == 'Gouraud':
+        lit_colors = get_colors(lighting, np.repeat(barycentres, 3, axis=0), normals, colors, *lighting_args)
+        # shade_gouraud stores the lit colours back into the vertex colours, in their precision
+        lit_colors = lit_colors.reshape(-1, 3, 3).astype(scene['vert_colors'].dtype)
+        _fill_colors(img, verts2d, lit_colors, np.mean(lit_colors, axis=1), True, False)
+        return img
+
+    M, N = img.shape[0:2]
+    color_buf = np.zeros((M, N, 3))
+    normal_buf = np.zeros((M, N, 3))
+    ids = np.full((M, N), -1, dtype=np.int64)
+    _fill_phong(color_buf, normal_buf, ids, verts2d, np.ascontiguousarray(colors.reshape(-1, 3, 3), dtype=np.float64),
+                np.ascontiguousarray(normals.reshape(-1, 3, 3), dtype=np.float64))
+    drawn = ids >= 0
+    img[drawn] = get_colors(lighting, barycentres[ids[drawn]], normal_buf[drawn], color_buf[drawn], *lighting_args)
+    return img
@@ -32,11 +32,8 @@ def diffuse_light(P, N, color, kd, light_positions, light_intensities):
     Returns:
         The trichromatic intensity, reflected from point P. The intensity contributes cumulatively to the final colour of the pixel.
     """
-
-    L = (P - light_positions) / la.norm(P - light_positions)
-    angle = np.dot(L, N.reshape((3, 1)))
-    I_lambda = (light_intensities * kd * angle)
-    return np.multiply(color, I_lambda).reshape(3,)
+    return diffuse_light_batch(np.reshape(P, (1, 3)), np.reshape(N, (1, 3)), np.reshape(color, (1, 3)), kd,
+                               light_positions, light_intensities).reshape(3,)
 
 
 def specular_light(P, N, color, cam_pos, ks, n, light_positions, light_intensities):
@@ -56,10 +53,63 @@ def specular_light(P, N, color, cam_pos, ks, n, light_positions, light_intensiti
     Returns:
         The intensity of trichromatic radiation reflected from point P. The intensity contributes cumulatively to the colour of the pixel.
     """
+    return specular_light_batch(np.reshape(P, (1, 3)), np.reshape(N, (1, 3)), np.reshape(color, (1, 3)), cam_pos,
+                                ks, n, light_positions, light_intensities).reshape(3,)
+
+
+def diffuse_light_batch(P, N, color, kd, light_positions, light_intensities):
+    """
+    Calculates the illumination of K points due to diffuse reflection from L light sources. Every light source is
+    normalized on its own and their contributions are summed
+
+    Args:
+        P: a K × 3 matrix with the coordinates of the points.
+        N: a K × 3 matrix with the unit surface normal vector at every point.
+        color: a K × 3 matrix with the colour components of every point. Each component belongs to the interval [0, 1].
+        kd: the diffuse reflection coefficient of the Phong model
+        light_positions: an L × 3 matrix with the position of every light source.
+        light_intensities: an L × 3 matrix with the intensity of every light source (corresponding to light_positions).
+
+    Returns:
+        A K × 3 matrix with the trichromatic intensity reflected from every point.
+    """
+    light_positions = np.reshape(light_positions, (-1, 3))
+    light_intensities = np.reshape(light_intensities, (-1, 3))
+
+    L = P[:, np.newaxis, :] - light_positions[np.newaxis, :, :]
+    L = L / la.norm(L, axis=2, keepdims=True)
+    angle = np.einsum('klc,kc->kl', L, N)
+    I_lambda = kd * np.dot(angle, light_intensities)
+    return np.multiply(color, I_lambda)
+
+
+def specular_light_batch(P, N, color, cam_pos, ks, n, light_positions, light_intensities):
+    """
+    Calculates the illumination of K points due to specular reflection from L light sources. Every light source is
+    normalized on its own and their contributions are summed
+
+    Args:
+        P: a K × 3 matrix with the coordinates of the points.
+        N: a K × 3 matrix with the unit surface normal vector at every point.
+        color: a K × 3 matrix with the colour components of every point. Each component belongs to the interval [0, 1].
+        cam_pos: a 3 × 1 column vector with the coordinates of the observer (i.e. the camera)
+        ks: the specular reflection coefficient of the Phong model
+        n: the Phong coefficient
+        light_positions: an L × 3 matrix with the position of every light source.
+        light_intensities: an L × 3 matrix with the intensity of every light source (corresponding to light_positions).
+
+    Returns:
+        A K × 3 matrix with the trichromatic intensity reflected from every point.
+    """
+    light_positions = np.reshape(light_positions, (-1, 3))
+    light_intensities = np.reshape(light_intensities, (-1, 3))
 
-    V = (cam_pos - P) / la.norm((cam_pos - P))
-    L = (light_positions - P) / la.norm(light_positions - P)
-    LN_inner_product = np.dot(N.T, L.T)
-    angle = np.dot(2 * N.T * LN_inner_product - L, V) ** n
-    I_lambda = light_intensities * ks * angle
-    return np.multiply(color, I_lambda).reshape(3,)
+    V = np.reshape(cam_pos, (1, 3)) - P
+    V = V / la.norm(V, axis=1, keepdims=True)
+    L = light_positions[np.newaxis, :, :] - P[:, np.newaxis, :]
+    L = L / la.norm(L, axis=2, keepdims=True)
+    LN_inner_product = np.einsum('klc,kc->kl', L, N)
+    R = 2 * N[:, np.newaxis, :] * LN_inner_product[:, :, np.newaxis] - L
+    angle = np.einsum('klc,kc->kl', R, V) ** n
+    I_lambda = ks * np.dot(angle, light_intensities)
+    return np.multiply(color, I_lambda)
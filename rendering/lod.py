@@ -0,0 +1,189 @@
+import heapq
+import numpy as np
+
+# Weight of the planes that keep boundary edges in place, relative to the planes of the faces
+BOUNDARY_WEIGHT = 100.0
+
+
+def _plane_quadrics(verts, faces):
+    # The quadric of the plane of every face, weighted by its area
+    a, b, c = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+    normals = np.cross(b - a, c - a)
+    double_areas = np.linalg.norm(normals, axis=1)
+    normals = np.divide(normals, double_areas[:, np.newaxis], out=np.zeros_like(normals),
+                        where=double_areas[:, np.newaxis] > 0)
+    planes = np.concatenate([normals, -np.sum(normals * a, axis=1, keepdims=True)], axis=1)
+    return 0.5 * double_areas[:, np.newaxis, np.newaxis] * planes[:, :, np.newaxis] * planes[:, np.newaxis, :]
+
+
+def _boundary_quadrics(verts, faces, quadrics):
+    # Adds to both ends of every boundary edge the quadric of the plane through the edge, perpendicular to its face
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    face_of_edge = np.tile(np.arange(len(faces)), 3)
+    _, inverse, counts = np.unique(np.sort(edges, axis=1), axis=0, return_inverse=True, return_counts=True)
+    is_boundary = counts[inverse.ravel()] == 1
+    if not np.any(is_boundary):
+        return
+    edges, face_of_edge = edges[is_boundary], face_of_edge[is_boundary]
+
+    a, b, c = (verts[faces[face_of_edge, i]] for i in range(3))
+    face_normals = np.cross(b - a, c - a)
+    p, q = verts[edges[:, 0]], verts[edges[:, 1]]
+    normals = np.cross(q - p, face_normals)
+    lengths = np.linalg.norm(normals, axis=1)
+    normals = np.divide(normals, lengths[:, np.newaxis], out=np.zeros_like(normals), where=lengths[:, np.newaxis] > 0)
+    planes = np.concatenate([normals, -np.sum(normals * p, axis=1, keepdims=True)], axis=1)
+    weights = BOUNDARY_WEIGHT * np.sum((q - p) ** 2, axis=1)
+    edge_quadrics = weights[:, np.newaxis, np.newaxis] * planes[:, :, np.newaxis] * planes[:, np.newaxis, :]
+    np.add.at(quadrics, edges[:, 0], edge_quadrics)
+    np.add.at(quadrics, edges[:, 1], edge_quadrics)
+
+
+def _collapse_costs(quadrics, verts, a, b):
+    # The cheapest of the two ends and the midpoint of every edge a-b, and how far along the edge it is
+    p, q = verts[a], verts[b]
+    points = np.ones((len(a), 3, 4))
+    points[:, 0, :3] = p
+    points[:, 1, :3] = (p + q) / 2
+    points[:, 2, :3] = q
+    costs = np.einsum('eij,ejk,eik->ei', points, quadrics[a] + quadrics[b], points)
+    best = np.argmin(costs, axis=1)
+    rows = np.arange(len(a))
+    return np.maximum(costs[rows, best], 0.0), best / 2, points[rows, best, :3]
+
+
+def simplify(verts, face_indices, vert_colors, target_faces):
+    """
+    Simplifies a triangle mesh by collapsing its edges in order of increasing quadric error (Garland and Heckbert).
+    Every vertex carries the sum of the squared distances to the planes of its faces, an edge collapses to whichever of
+    its ends or its midpoint keeps that error lowest, and its colour is interpolated accordingly. Collapses that would
+    flip a face or make the surface non-manifold are skipped, and boundary edges are kept in place
+
+    Args:
+        verts: a N x 3 matrix with the coordinates of the vertices of the object
+        face_indices: a K x 3 matrix describing the triangles
+        vert_colors: a N x 3 matrix with the colour components of each vertex of the object
+        target_faces: the number of triangles to stop at. Fewer collapses are done if no valid edge is left
+
+    Returns:
+        The vertices, colours and triangles of the simplified mesh, with unused vertices removed
+    """
+    verts = np.array(verts, dtype=float)
+    colors = np.array(vert_colors, dtype=float)
+    faces = np.array(face_indices, dtype=np.int64)
+
+    quadrics = np.zeros((len(verts), 4, 4))
+    np.add.at(quadrics, faces, _plane_quadrics(verts, faces)[:, np.newaxis])
+    _boundary_quadrics(verts, faces, quadrics)
+
+    vert_faces = [set() for _ in range(len(verts))]
+    for face, (a, b, c) in enumerate(faces.tolist()):
+        vert_faces[a].add(face)
+        vert_faces[b].add(face)
+        vert_faces[c].add(face)
+    face_alive = np.ones(len(faces), dtype=bool)
+    version = np.zeros(len(verts), dtype=np.int64)
+
+    def neighbours(v):
+        return set(faces[list(vert_faces[v])].ravel().tolist()) - {v}
+
+    def entries(a, b):
+        # The heap entries of the edges a-b, costed together
+        costs, ts, points = _collapse_costs(quadrics, verts, a, b)
+        return zip(costs.tolist(), a.tolist(), b.tolist(), version[a].tolist(), version[b].tolist(), ts.tolist(),
+                   map(tuple, points.tolist()))
+
+    edges = np.unique(np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1), axis=0)
+    heap = list(entries(edges[:, 0], edges[:, 1]))
+    heapq.heapify(heap)
+
+    face_count = len(faces)
+    while face_count > target_faces and heap:
+        cost, a, b, version_a, version_b, t, point = heapq.heappop(heap)
+        if version[a] != version_a or version[b] != version_b:
+            continue
+        shared = vert_faces[a] & vert_faces[b]
+        # Link condition: the ends of the edge may only share the neighbours of the faces that collapse with it
+        if len(neighbours(a) & neighbours(b)) > len(shared):
+            continue
+
+        point = np.array(point)
+        moved = list((vert_faces[a] | vert_faces[b]) - shared)
+        before = faces[moved]
+        after = np.where((before == a) | (before == b), len(verts), before)
+        # The normal vectors of the faces before and after the collapse, cross products written out as np.cross is
+        # slow on a handful of vectors
+        corners = np.concatenate([verts, point[np.newaxis]])[np.concatenate([before, after])]
+        u, v = corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+        normals = u[:, [1, 2, 0]] * v[:, [2, 0, 1]] - u[:, [2, 0, 1]] * v[:, [1, 2, 0]]
+        if np.any(np.sum(normals[:len(moved)] * normals[len(moved):], axis=1) <= 0):
+            continue
+
+        # b collapses into a, which moves to the chosen point
+        verts[a] = point
+        colors[a] = (1 - t) * colors[a] + t * colors[b]
+        quadrics[a] += quadrics[b]
+        version[a] += 1
+        version[b] += 1
+        for face in shared:
+            face_alive[face] = False
+            for v in faces[face].tolist():
+                vert_faces[v].discard(face)
+        face_count -= len(shared)
+        for face in vert_faces[b]:
+            faces[face][faces[face] == b] = a
+            vert_faces[a].add(face)
+        vert_faces[b] = set()
+        others = np.array(list(neighbours(a)), dtype=np.int64)
+        for entry in entries(np.full(len(others), a), others):
+            heapq.heappush(heap, entry)
+
+    faces = faces[face_alive]
+    used, faces = np.unique(faces, return_inverse=True)
+    return verts[used], colors[used], faces.reshape(-1, 3)
+
+
+def build_lod_chain(verts, face_indices, vert_colors, ratio=0.5, min_faces=64):
+    """
+    Builds levels of detail of a mesh, every level simplified from the previous one
+
+    Args:
+        verts: a N x 3 matrix with the coordinates of the vertices of the object
+        face_indices: a K x 3 matrix describing the triangles
+        vert_colors: a N x 3 matrix with the colour components of each vertex of the object
+        ratio: the fraction of the triangles of a level kept by the next one
+        min_faces: no level is simplified below this many triangles
+
+    Returns:
+        A list of (verts, vert_colors, face_indices) levels, from the original mesh to the coarsest
+    """
+    levels = [(verts, vert_colors, face_indices)]
+    while len(levels[-1][2]) * ratio >= min_faces:
+        verts, vert_colors, face_indices = levels[-1]
+        level = simplify(verts, face_indices, vert_colors, int(len(face_indices) * ratio))
+        # Stop once no edge can be collapsed any more
+        if len(level[2]) >= len(face_indices):
+            break
+        levels.append(level)
+    return levels
+
+
+def select_lod(face_counts, covered_pixels, pixels_per_triangle=1.0):
+    """
+    Chooses the level of detail of a mesh for the number of pixels it covers: the coarsest level that still has about
+    one triangle for every pixels_per_triangle pixels
+
+    Args:
+        face_counts: the number of triangles of every level, from the finest to the coarsest
+        covered_pixels: the estimated number of pixels covered by the mesh
+        pixels_per_triangle: the on-screen size of a triangle to aim for
+
+    Returns:
+        The index of the chosen level
+    """
+    budget = covered_pixels / pixels_per_triangle
+    level = 0
+    for i, faces in enumerate(face_counts):
+        if faces >= budget:
+            level = i
+    return level
@@ -0,0 +1,170 @@
+import numpy as np
+from .helpers import calculate_normals
+from .lod import build_lod_chain
+from .bvh import BVH
+
+
+class Mesh:
+    """
+    A triangle mesh stored in contiguous arrays: float32 vertices, colours and normal vectors and int32 faces.
+    Data derived from the geometry (normal vectors, face adjacency, ...) is computed on first use and kept until the
+    vertices or the faces change. The vertices, faces and colours are read-only views: they are changed by assigning
+    new arrays or through update_verts and update_colors, so that the derived data is never stale
+    """
+    __slots__ = ('_verts', '_faces', '_colors', '_cache')
+
+    def __init__(self, verts, faces, colors=None, normals=None):
+        """
+        Args:
+            verts: a N x 3 matrix with the coordinates of the vertices (N x 2 for already projected vertices)
+            faces: a K x 3 matrix with the indices of the vertices of every triangle
+            colors: a N x 3 matrix with the colour components of every vertex, white if not given
+            normals: an optional N x 3 matrix with the normal vector of every vertex, computed from the faces if not given
+        """
+        # Always copied, so that editing the mesh never writes into the caller's (possibly read-only) arrays
+        self._verts = np.array(verts, dtype=np.float32, copy=True)
+        self._faces = np.array(faces, dtype=np.int32, copy=True)
+        if colors is None:
+            colors = np.ones((len(self._verts), 3))
+        self._colors = np.array(colors, dtype=np.float32, copy=True)
+        self._cache = {}
+        if normals is not None:
+            self._cache['normals'] = np.array(normals, dtype=np.float32, copy=True)
+
+    @property
+    def verts(self):
+        return _read_only(self._verts)
+
+    @verts.setter
+    def verts(self, verts):
+        self._verts = np.array(verts, dtype=np.float32, copy=True)
+        self.invalidate()
+
+    @property
+    def faces(self):
+        return _read_only(self._faces)
+
+    @faces.setter
+    def faces(self, faces):
+        self._faces = np.array(faces, dtype=np.int32, copy=True)
+        self.invalidate()
+
+    @property
+    def colors(self):
+        return _read_only(self._colors)
+
+    @colors.setter
+    def colors(self, colors):
+        self._colors = np.array(colors, dtype=np.float32, copy=True)
+        self.invalidate(geometry=False)
+
+    def update_verts(self, indices, verts):
+        """
+        Moves some of the vertices of the mesh
+
+        Args:
+            indices: the indices of the vertices to move
+            verts: their new coordinates
+        """
+        self._verts[indices] = verts
+        self.invalidate()
+
+    def update_colors(self, indices, colors):
+        """
+        Changes the colour of some of the vertices of the mesh
+
+        Args:
+            indices: the indices of the vertices to recolour
+            colors: their new colour components
+        """
+        self._colors[indices] = colors
+        self.invalidate(geometry=False)
+
+    def invalidate(self, geometry=True):
+        """
+        Drops the cached data derived from the mesh
+
+        Args:
+            geometry: True if the vertices or faces changed, which invalidates everything. False if only the colours
+                changed, which keeps the data that depends on the geometry alone
+        """
+        if geometry:
+            self._cache.clear()
+        else:
+            for key in [key for key in self._cache if key.startswith('colors:')]:
+                del self._cache[key]
+
+    def cached(self, key, compute):
+        """
+        Returns data derived from the mesh, computing it only the first time it is requested
+
+        Args:
+            key: the name of the data. Names starting with 'colors:' also depend on the colours of the mesh
+            compute: a function of the mesh that computes the data
+
+        Returns:
+            The cached data
+        """
+        if key not in self._cache:
+            self._cache[key] = compute(self)
+        return self._cache[key]
+
+    @property
+    def normals(self):
+        """The unit normal vector of every vertex (N x 3, float32)"""
+        return self.cached('normals', lambda mesh: calculate_normals(mesh.verts, mesh.faces).astype(np.float32))
+
+    @property
+    def adjacency(self):
+        """
+        For every face, the index of the face across each of its edges AB, BC and CA (K x 3, int32), or -1 on a
+        boundary edge
+        """
+        return self.cached('adjacency', _face_adjacency)
+
+    @property
+    def bvh(self):
+        """A bounding volume hierarchy over the faces, for frustum culling and picking"""
+        return self.cached('bvh', lambda mesh: BVH(mesh.verts, mesh.faces))
+
+    @property
+    def lod_chain(self):
+        """
+        Levels of detail of the mesh simplified by quadric error edge collapses, from the mesh itself to the coarsest,
+        every level having about half the triangles of the previous one
+        """
+        return self.cached('colors:lod', _lod_chain)
+
+    def arrays(self):
+        """
+        Returns:
+            The vertices, colours and faces of the mesh, in the order render_object takes them
+        """
+        return _read_only(self._verts), _read_only(self._colors), _read_only(self._faces)
+
+
+def _read_only(array):
+    # A view of the array that raises on writes, the array itself stays writable for the update methods
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _face_adjacency(mesh):
+    # Every edge is labelled by its sorted pair of vertices, equal labels next to each other after sorting are shared
+    faces = mesh.faces.astype(np.int64)
+    edges = np.sort(faces[:, [[0, 1], [1, 2], [2, 0]]], axis=2).reshape(-1, 2)
+    keys = edges[:, 0] * len(mesh.verts) + edges[:, 1]
+    order = np.argsort(keys, kind='stable')
+    shared = np.flatnonzero(keys[order][1:] == keys[order][:-1])
+    first, second = order[shared], order[shared + 1]
+
+    adjacency = np.full(3 * len(faces), -1, dtype=np.int32)
+    adjacency[first] = second // 3
+    adjacency[second] = first // 3
+    return adjacency.reshape(-1, 3)
+
+
+def _lod_chain(mesh):
+    levels = build_lod_chain(mesh.verts, mesh.faces, mesh.colors)
+    return [mesh] + [Mesh(verts, faces, colors) for verts, colors, faces in levels[1:]]
@@ -0,0 +1,180 @@
+import os
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+
+# File formats write_image knows, by extension
+FORMATS = {'.png': 'png', '.ppm': 'ppm', '.rgb': 'raw', '.raw': 'raw'}
+
+
+def to_uint8(img, gamma=None):
+    """
+    Quantizes a float image to 8 bits per channel
+
+    Args:
+        img: an M × N × 3 image with colour components in [0, 1], values outside are clipped
+        gamma: an optional display gamma (e.g. 2.2), the components are raised to 1 / gamma before quantizing
+
+    Returns:
+        An M × N × 3 uint8 image
+    """
+    img = np.clip(img, 0, 1)
+    if gamma is not None:
+        img **= 1 / gamma
+    img *= 255
+    img += 0.5
+    return img.astype(np.uint8)
+
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+
+def encode_png(pixels, compression=6):
+    """
+    Encodes an 8 bit RGB image as PNG
+
+    Args:
+        pixels: an M × N × 3 uint8 image, the first axis being the rows
+        compression: the zlib compression level, from 0 (fastest) to 9 (smallest)
+
+    Returns:
+        The bytes of the PNG file
+    """
+    height, width = pixels.shape[0:2]
+    # Every row starts with its filter type, 0 for none
+    rows = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    rows[:, 1:] = pixels.reshape(height, 3 * width)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) + \
+        _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), compression)) + _png_chunk(b'IEND', b'')
+
+
+def encode_ppm(pixels):
+    """
+    Encodes an 8 bit RGB image as binary PPM
+
+    Args:
+        pixels: an M × N × 3 uint8 image, the first axis being the rows
+
+    Returns:
+        The bytes of the PPM file
+    """
+    height, width = pixels.shape[0:2]
+    return b'P6\n%d %d\n255\n' % (width, height) + np.ascontiguousarray(pixels).tobytes()
+
+
+def encode(pixels, format='png', compression=6):
+    """
+    Encodes an 8 bit RGB image as 'png', 'ppm' or 'raw' (the bare rows of RGB bytes)
+    """
+    assert format in ['png', 'ppm', 'raw']
+    if format == 'png':
+        return encode_png(pixels, compression)
+    if format == 'ppm':
+        return encode_ppm(pixels)
+    return np.ascontiguousarray(pixels).tobytes()
+
+
+def _format_of(path, format):
+    if format is None:
+        format = FORMATS[os.path.splitext(path)[1].lower()]
+    return format
+
+
+def write_image(path, img, format=None, gamma=None, compression=6):
+    """
+    Writes a rendered image straight to a file, without going through matplotlib
+
+    Args:
+        path: the path of the file
+        img: an M × N × 3 float image as returned by the render_object functions, or an already quantized uint8 image
+        format: 'png', 'ppm' or 'raw', guessed from the extension of path if not given
+        gamma: an optional display gamma applied when quantizing a float image
+        compression: the zlib compression level of PNG files
+    """
+    format = _format_of(path, format)
+    pixels = img if img.dtype == np.uint8 else to_uint8(img, gamma)
+    with open(path, 'wb') as f:
+        f.write(encode(pixels, format, compression))
+
+
+class FrameWriter:
+    """
+    Writes a sequence of frames from a background thread, so that the next frame is rendered while the previous ones
+    are encoded and written. Frames are quantized when they are handed over, so the caller may reuse its image.
+    Use it as a context manager, or call close() to wait for the last frames
+    """
+
+    def __init__(self, pattern, format=None, gamma=None, compression=6, max_pending=4):
+        """
+        Args:
+            pattern: the path of every frame, formatted with the index of the frame, e.g. 'frames/frame_{:04d}.png'
+            format: 'png', 'ppm' or 'raw', guessed from the extension of pattern if not given
+            gamma: an optional display gamma applied when quantizing the frames
+            compression: the zlib compression level of PNG files
+            max_pending: the number of frames that can wait to be written before write blocks
+        """
+        self.pattern = pattern
+        self.format = _format_of(pattern, format)
+        self.gamma = gamma
+        self.compression = compression
+        self.count = 0
+        self._queue = queue.Queue(max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, pixels = item
+            try:
+                with open(path, 'wb') as f:
+                    f.write(encode(pixels, self.format, self.compression))
+            except Exception as error:
+                self._error = error
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, img, path=None):
+        """
+        Queues a frame to be written
+
+        Args:
+            img: an M × N × 3 float or uint8 image
+            path: the path of the frame, the pattern formatted with the index of the frame if not given
+
+        Returns:
+            The path the frame is written to
+        """
+        self._check()
+        if path is None:
+            path = self.pattern.format(self.count)
+        pixels = img.copy() if img.dtype == np.uint8 else to_uint8(img, self.gamma)
+        self._queue.put((path, pixels))
+        self.count += 1
+        return path
+
+    def close(self):
+        """
+        Waits for every queued frame to be written
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
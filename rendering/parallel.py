@@ -0,0 +1,173 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from .shade import shade_triangles
+
+# The shared memory arrays a worker process has opened, by kind ('color' or 'depth')
+_worker = {}
+
+
+def bin_triangles(verts2d, face_indices, triangles, M, N, tile_size=64):
+    """
+    Splits the image into square tiles and finds the triangles whose bounding box overlaps every tile
+
+    Args:
+        verts2d: a N x 2 matrix with the pixel coordinates of every projected vertex
+        face_indices: a K x 3 matrix describing the triangles
+        triangles: the indices of the triangles to bin, in drawing order
+        M: the height of the image in pixels
+        N: the width of the image in pixels
+        tile_size: the side of a tile in pixels
+
+    Returns:
+        A list of (x0, x1, y0, y1, tile_triangles) tuples, one for every tile with at least one triangle. The tile covers
+        the pixels x0 <= x < x1 and y0 <= y < y1, and tile_triangles keeps the drawing order of triangles
+    """
+    triangles = np.asarray(triangles)
+    corners = verts2d[face_indices[triangles]]
+    # One pixel of margin, the scanline may round a pixel past the bounding box of the vertices
+    x_min = corners[:, :, 0].min(axis=1) - 1
+    x_max = corners[:, :, 0].max(axis=1) + 1
+    y_min = corners[:, :, 1].min(axis=1) - 1
+    y_max = corners[:, :, 1].max(axis=1) + 1
+
+    tiles = []
+    for x0 in range(0, M, tile_size):
+        x1 = min(x0 + tile_size, M)
+        rows = (x_min < x1) & (x_max >= x0)
+        for y0 in range(0, N, tile_size):
+            y1 = min(y0 + tile_size, N)
+            overlap = rows & (y_min < y1) & (y_max >= y0)
+            if np.any(overlap):
+                tiles.append((x0, x1, y0, y1, triangles[overlap]))
+    return tiles
+
+
+class TilePool:
+    """
+    A pool of worker processes and a shared memory image (and depth buffer) the screen tiles are shaded into. Starting
+    the processes and allocating the shared memory is done once, so a sequence of frames can be rendered on the same
+    pool. The shared memory is reallocated only when the size or floating point type of the image changes. Close the pool (or use it as a context
+    manager) to stop the processes and free the shared memory
+    """
+
+    def __init__(self, workers=2):
+        """
+        Args:
+            workers: the number of worker processes
+        """
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._color_shm = None
+        self._depth_shm = None
+        self._format = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory"""
+        self._executor.shutdown()
+        self._free()
+
+    def _free(self):
+        for shm in (self._color_shm, self._depth_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._color_shm = self._depth_shm = None
+
+    def _buffers(self, M, N, dtype, depth):
+        # The shared image and depth buffer of an M × N frame, allocated on first use and kept for the next frames. The
+        # image has the type of the frame, so that colours are rounded exactly as when drawn on a single process
+        dtype = np.dtype(dtype)
+        if self._format != (M, N, dtype):
+            self._free()
+            self._format = (M, N, dtype)
+        if self._color_shm is None:
+            self._color_shm = shared_memory.SharedMemory(create=True, size=M * N * 3 * dtype.itemsize)
+        if depth and self._depth_shm is None:
+            self._depth_shm = shared_memory.SharedMemory(create=True, size=M * N * 4)
+        color = np.ndarray((M, N, 3), dtype=dtype, buffer=self._color_shm.buf)
+        zbuf = np.ndarray((M, N), dtype=np.float32, buffer=self._depth_shm.buf) if depth else None
+        return color, zbuf
+
+    def render(self, scene, triangles, img, zbuf=None, tile_size=64):
+        """
+        Draws the triangles of an object on the pool, as render_tiles does
+
+        Args:
+            scene, triangles, img, zbuf, tile_size: as in render_tiles
+
+        Returns:
+            The image with the triangles drawn on it, and the depth buffer (None if no depth test was requested)
+        """
+        M, N = img.shape[0:2]
+        tiles = bin_triangles(scene['verts2d'], scene['face_indices'], triangles, M, N, tile_size)
+        color, depth = self._buffers(M, N, img.dtype, zbuf is not None)
+        color[:] = img
+        if zbuf is not None:
+            depth[:] = zbuf
+
+        # Tiles are dealt out round-robin in a few batches per worker, so that the scene is sent to the workers a few
+        # times per frame instead of once per tile, while neighbouring (similarly costly) tiles are still spread out
+        names = (self._color_shm.name, None if zbuf is None else self._depth_shm.name, M, N, img.dtype.str)
+        batches = min(len(tiles), 4 * self.workers)
+        futures = [self._executor.submit(_render_batch, *names, scene, tiles[i::batches]) for i in range(batches)]
+        for future in futures:
+            future.result()
+
+        img[:] = color
+        if zbuf is not None:
+            zbuf[:] = depth
+        return img, zbuf
+
+
+def _attach(kind, name, shape, dtype):
+    # Opens a shared memory array of the pool, kept open until the pool replaces the segment with a new one
+    if kind in _worker and _worker[kind][0] != name:
+        _, shm, array = _worker.pop(kind)
+        del array
+        shm.close()
+    if kind not in _worker:
+        shm = shared_memory.SharedMemory(name=name)
+        _worker[kind] = (name, shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return _worker[kind][2]
+
+
+def _render_batch(color_name, depth_name, M, N, dtype, scene, tiles):
+    # Every triangle is clipped to the tile before it is shaded, straight into shared memory. Tiles do not overlap, so
+    # no pixel is written by two workers
+    img = _attach('color', color_name, (M, N, 3), dtype)
+    zbuf = None if depth_name is None else _attach('depth', depth_name, (M, N), np.float32)
+    for x0, x1, y0, y1, triangles in tiles:
+        shade_triangles(img, zbuf, triangles, scene, (x0, x1, y0, y1))
+
+
+def render_tiles(scene, triangles, img, zbuf=None, tile_size=64, workers=2, pool=None):
+    """
+    Draws the triangles of an object on a pool of processes. Triangles are binned into screen tiles once, and every tile
+    is shaded by one worker straight into a shared memory image, with the fragments of its triangles clipped to the
+    tile. Tiles do not overlap, so no locking is needed, and the result is identical to drawing the triangles one after
+    the other
+
+    Args:
+        scene: the object and lighting parameters, as expected by shade_triangles
+        triangles: the indices of the triangles to draw, in drawing order
+        img: an image (M × N × 3 matrix) with any pre-existing triangles
+        zbuf: an M × N depth buffer the triangles are tested against, or None to overdraw them in the given order
+        tile_size: the side of a tile in pixels
+        workers: the number of worker processes, when no pool is given
+        pool: an open TilePool to render on, e.g. the one of a sequence of frames. If not given, a pool of workers
+            processes is started for this call only
+
+    Returns:
+        The image with the triangles drawn on it, and the depth buffer (None if no depth test was requested)
+    """
+    if pool is not None:
+        return pool.render(scene, triangles, img, zbuf, tile_size)
+    with TilePool(workers) as pool:
+        return pool.render(scene, triangles, img, zbuf, tile_size)
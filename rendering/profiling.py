@@ -0,0 +1,115 @@
+import time
+from contextlib import contextmanager
+
+# Counters of the stage being recorded, None when nothing is being profiled
+_counters = None
+
+# The counters every stage record starts with
+COUNTERS = ('pixels_written', 'lighting_calls', 'lit_points')
+
+
+def count(name, amount=1):
+    """
+    Adds to a counter of the stage being profiled. Does nothing (and costs almost nothing) when no Profiler is recording
+
+    Args:
+        name: the counter, one of COUNTERS
+        amount: how much to add
+    """
+    if _counters is not None:
+        _counters[name] += amount
+
+
+class Profiler:
+    """
+    Collects the wall time and counters of every stage of a render. Pass one to render_object as profile and read
+    the result with report() once the image is rendered, or give a callback that is called with every stage as soon as
+    it ends. Work done in worker processes (workers > 1) or in numba kernels (backend='jit') is timed but its pixels are
+    not counted
+    """
+
+    def __init__(self, callback=None):
+        """
+        Args:
+            callback: an optional function called with the record of every stage when it ends
+        """
+        self.stages = []
+        self.callback = callback
+        self._level = 0
+
+    @contextmanager
+    def stage(self, name, triangles=None):
+        """
+        Records a stage of the pipeline. The record is a dict with the 'name' of the stage, its wall time in 'seconds',
+        the number of triangles that went in ('triangles_in') and out ('triangles_out'), the number of
+        'pixels_written', of calls to get_color / get_colors ('lighting_calls') and of points they lit ('lit_points').
+        The stage can change triangles_out and add its own entries to the record it is given. A stage that sets
+        'covered_pixels' also gets the 'overdraw' ratio of pixels written to pixels covered. A stage recorded inside
+        another one has its own record, with its nesting 'level' (0 for the outermost stages), and its counters are
+        added to those of the enclosing stage as well
+
+        Args:
+            name: the name of the stage
+            triangles: the number of triangles that go into the stage, kept by default
+        """
+        global _counters
+        record = dict(name=name, seconds=0.0, triangles_in=triangles, triangles_out=triangles, level=self._level)
+        outer, _counters = _counters, dict.fromkeys(COUNTERS, 0)
+        self._level += 1
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            record.update(_counters)
+            if 'covered_pixels' in record:
+                record['overdraw'] = record['pixels_written'] / max(record['covered_pixels'], 1)
+            if outer is not None:
+                for counter in COUNTERS:
+                    outer[counter] += _counters[counter]
+            _counters = outer
+            self._level -= 1
+            self.stages.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def report(self):
+        """
+        Returns:
+            A dict with the list of stage records under 'stages' and the total 'seconds' and counters of the outermost
+            stages, which already include those of the stages nested in them
+        """
+        outermost = [stage for stage in self.stages if stage['level'] == 0]
+        report = dict(stages=list(self.stages), seconds=sum(stage['seconds'] for stage in outermost))
+        for name in COUNTERS:
+            report[name] = sum(stage[name] for stage in outermost)
+        return report
+
+    def format(self):
+        """
+        Returns:
+            The report as a text table, one line per stage, nested stages indented under the stage enclosing them
+        """
+        lines = ['{:<16} {:>10} {:>10} {:>10} {:>12} {:>9} {:>12}'.format('stage', 'ms', 'tri in', 'tri out', 'pixels',
+                                                                          'overdraw', 'lit points')]
+        for stage in self.stages:
+            overdraw = stage.get('overdraw')
+            lines.append('{:<16} {:>10.2f} {:>10} {:>10} {:>12} {:>9} {:>12}'.format(
+                '  ' * stage['level'] + stage['name'], 1000 * stage['seconds'], _blank(stage['triangles_in']), _blank(stage['triangles_out']),
+                stage['pixels_written'], '' if overdraw is None else '{:.2f}'.format(overdraw), stage['lit_points']))
+        return '\n'.join(lines)
+
+
+def _blank(value):
+    return '' if value is None else value
+
+
+class _NoProfiler:
+    # Stands in for a Profiler when render_object is not profiled, every stage record is thrown away
+
+    @contextmanager
+    def stage(self, name, triangles=None):
+        yield {}
+
+
+NO_PROFILER = _NoProfiler()
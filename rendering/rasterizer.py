@@ -0,0 +1,335 @@
+import numpy as np
+from .profiling import count
+
+
+def _increment(pointA, pointB):
+    # How much the crossing of an edge with a column moves from one column to the next, 1 / slope like the scanline.
+    # Vertical edges do not move, horizontal edges are never walked
+    if pointA[0] == pointB[0] or pointA[1] == pointB[1]:
+        return 0.0
+    return 1 / ((pointA[1] - pointB[1]) / (pointA[0] - pointB[0]))
+
+
+def _walk(x_start, *legs):
+    # The crossings of consecutive edges (increment, number of columns) with every column, accumulated one column at a
+    # time from x_start exactly like the scanline does, rounding errors included
+    steps = np.empty(1 + sum(columns for _, columns in legs))
+    steps[0] = x_start
+    position = 1
+    for increment, columns in legs:
+        steps[position:position + columns] = increment
+        position += columns
+    return np.cumsum(steps)
+
+
+# The vertices at the two ends of the edges AB, BC and AC, in the order the scanline shaders create them
+_EDGES = [(0, 1), (1, 2), (0, 2)]
+
+
+def _scanline_walks(verts2d):
+    # The two active edges of the scanline of shade_triangle, x1 and x2. For each one, the edges it follows (with the
+    # last column of each one) and its crossing with every column, from the lowest one up
+    ys = [vertex[1] for vertex in verts2d]
+    y_min, y_max = int(min(ys)), int(max(ys))
+    walks = []
+    for p, q in _EDGES:
+        if ys[p] == ys[q] or min(ys[p], ys[q]) != y_min:
+            continue
+        bottom, end = (p, q) if ys[p] == y_min else (q, p)
+        legs = [((p, q), int(ys[end]))]
+        if ys[end] != y_max:
+            # The edge ends at the middle vertex, the scanline turns onto the edge starting there
+            turn = [edge for edge in _EDGES if min(ys[edge[0]], ys[edge[1]]) == ys[end]][-1]
+            legs.append((turn, y_max))
+        first_column = y_min
+        increments = []
+        for (a, b), last_column in legs:
+            increments.append((_increment(verts2d[a], verts2d[b]), last_column - first_column))
+            first_column = last_column
+        walks.append((bottom, legs, _walk(verts2d[bottom][0], *increments)))
+    return y_min, walks
+
+
+def _scanline_spans(verts2d):
+    # The first column, and the ends of the span of every column, of the scanline of shade_triangle
+    y_min, ((bottom1, _, walk1), (bottom2, _, walk2)) = _scanline_walks(verts2d)
+    low, high = np.minimum(walk1, walk2), np.maximum(walk1, walk2)
+    # With a horizontal lowest edge, the lowest column is only drawn if the first active edge starts before the second
+    if bottom1 != bottom2 and verts2d[bottom1][0] > verts2d[bottom2][0]:
+        return y_min + 1, low[1:], high[1:]
+    return y_min, low, high
+
+
+def scanline_colors(verts2d, vcolors, xs, ys):
+    """
+    Finds the colours the scanline of shade_triangle (and shade_gouraud) gives a triangle at some of its pixels, all at
+    once. The scanline interpolates the vertex colours along the two active edges at every column, from the first
+    vertex of the edge (in the order AB, BC, AC) rather than from its lowest one, and then along the truncated span
+    between them, taking the absolute value at both steps. Blending the vertex colours with barycentric weights gives
+    other colours, which are extrapolated at the pixels of the span rule outside the triangle
+
+    Args:
+        verts2d: 3x2 array containing the (integer) pixel coordinates of the 3 vertices of a triangle
+        vcolors: 3x3 array containing the color of the vertices
+        xs: the first (vertical) pixel coordinate of every pixel, covered by the triangle (see triangle_fragments)
+        ys: the second (horizontal) pixel coordinate of every pixel
+
+    Returns:
+        A K x 3 matrix with the color of every pixel
+    """
+    verts2d = np.asarray(verts2d, dtype=float)
+    vcolors = np.asarray(vcolors, dtype=float)
+    if len(xs) == 0 or np.all(verts2d == verts2d[0]):
+        return np.broadcast_to(np.mean(vcolors, axis=0), (len(xs), 3)).copy()
+
+    y_min, walks = _scanline_walks(verts2d.tolist())
+    ys = np.asarray(ys)
+    lowest = ys == y_min
+    # The colour interpolated along both active edges, and their truncated crossing, at the column of every pixel
+    edge_colors = []
+    ends = []
+    for bottom, legs, walk in walks:
+        edge_color = np.empty((len(xs), 3))
+        edge_color[lowest] = vcolors[bottom]
+        first_column = y_min
+        for (a, b), last_column in legs:
+            on_edge = (ys > first_column) & (ys <= last_column)
+            low, high = sorted((verts2d[a, 1], verts2d[b, 1]))
+            t = ((ys[on_edge] - low) / (high - low))[:, np.newaxis]
+            edge_color[on_edge] = np.abs(vcolors[a] + t * (vcolors[b] - vcolors[a]))
+            first_column = last_column
+        edge_colors.append(edge_color)
+        ends.append(np.trunc(walk[ys - y_min]))
+
+    (color_A, color_B), (x1, x2) = edge_colors, ends
+    span = x1 != x2
+    colors = color_A.copy()
+    t = ((xs[span] - x1[span]) / (x2[span] - x1[span]))[:, np.newaxis]
+    colors[span] = np.abs(color_A[span] + t * (color_B[span] - color_A[span]))
+    (bottom1, _, _), (bottom2, _, _) = walks
+    if bottom1 == bottom2:
+        # The lowest column is the lowest vertex alone, painted with its own colour
+        colors[lowest] = vcolors[bottom1]
+    return colors
+
+
+def triangle_fragments(verts2d, img_shape):
+    """
+    Finds every pixel of an image covered by a triangle, with the same span rule as the scanline of shade_triangle:
+    every column y between the lowest and highest vertex is filled from the truncated lowest to the truncated highest
+    crossing of the triangle edges with it, both included. All the spans are computed at once instead of walking the
+    triangle one scanline at a time. Like the scanline, a triangle with two equal vertices or lying on a horizontal line
+    covers nothing, and one whose 3 vertices lie on another line covers the pixels along it
+
+    Args:
+        verts2d: 3x2 array containing the (integer) pixel coordinates of the 3 vertices of a triangle
+        img_shape: the shape of the image (M x N x 3) the triangle is drawn on
+
+    Returns:
+        xs: the first (vertical) pixel coordinate of every covered pixel
+        ys: the second (horizontal) pixel coordinate of every covered pixel
+        weights: a K x 3 matrix with the barycentric weights of every covered pixel with respect to the 3 vertices. The
+            span rule includes pixels up to one pixel outside the triangle, whose weights are slightly extrapolated
+    """
+    verts2d = np.asarray(verts2d, dtype=float)
+    empty = np.empty(0, dtype=int)
+
+    # A triangle collapsed to a single point still covers the pixel it lies on
+    if np.all(verts2d == verts2d[0]):
+        x, y = int(verts2d[0, 0]), int(verts2d[0, 1])
+        if 0 <= x <= img_shape[0] - 1 and 0 <= y <= img_shape[1] - 1:
+            return np.array([x]), np.array([y]), np.full((1, 3), 1 / 3)
+        return empty, empty, np.empty((0, 3))
+
+    a, b, c = verts2d.tolist()
+    if a == b or b == c or a == c or a[1] == b[1] == c[1]:
+        return empty, empty, np.empty((0, 3))
+
+    y_min, low, high = _scanline_spans([a, b, c])
+    columns = np.arange(y_min, y_min + len(low))
+    inside = (columns >= 0) & (columns <= img_shape[1] - 1)
+    columns, low, high = columns[inside], low[inside], high[inside]
+
+    # int() of the scanline truncates towards zero, then the span is clipped to the image like clip_span does
+    starts = np.maximum(np.trunc(low), 0).astype(int)
+    ends = np.minimum(np.trunc(high), img_shape[0] - 1).astype(int)
+    lengths = np.maximum(ends - starts + 1, 0)
+    total = int(lengths.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    xs = np.repeat(starts, lengths) + offsets
+    ys = np.repeat(columns, lengths)
+
+    (x0, y0), (x1, y1), (x2, y2) = verts2d
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    if area == 0:
+        # A line, the weights are shared between its two ends
+        bottom, top = np.argmin(verts2d[:, 1]), np.argmax(verts2d[:, 1])
+        t = (ys - verts2d[bottom, 1]) / (verts2d[top, 1] - verts2d[bottom, 1])
+        weights = np.zeros((len(xs), 3))
+        weights[:, bottom] = 1 - t
+        weights[:, top] = t
+        return xs, ys, weights
+
+    # Edge functions, each one is proportional to the barycentric weight of the opposite vertex
+    e0 = (x1 - xs) * (y2 - ys) - (x2 - xs) * (y1 - ys)
+    e1 = (x2 - xs) * (y0 - ys) - (x0 - xs) * (y2 - ys)
+    e2 = (x0 - xs) * (y1 - ys) - (x1 - xs) * (y0 - ys)
+    weights = np.stack((e0, e1, e2), axis=1) / area
+    return xs, ys, weights
+
+
+def fill_triangle(img, verts2d, vcolors, shade_t='Flat'):
+    """
+    Vectorized counterpart of shade_triangle. Every covered pixel of the triangle is written with a single array
+    assignment. Flat mode uses the mean of the vertex colors, Gouraud mode the scanline_colors of the pixels
+
+    Args:
+        img: An image with possible pre-existing triangles
+        verts2d: 3x2 array containing the coordinates for the 3 vertices of a triangle
+        vcolors: 3x3 array containing the color of the vertices in an RGB scale, ranging from [0,1]
+        shade_t: the Shading mode. This can be flat(mean of color) or Gouraud(linear interpolation of color)
+
+    Returns:
+        A triangle filled with color
+    """
+    xs, ys, _ = triangle_fragments(verts2d, img.shape)
+    count('pixels_written', len(xs))
+    if shade_t == 'Gouraud':
+        img[xs, ys] = scanline_colors(verts2d, vcolors, xs, ys)
+    else:
+        img[xs, ys] = np.mean(vcolors, axis=0)
+    return img
+
+
+def depth_tested_fragments(zbuf, verts2d, vdepth, origin=(0, 0)):
+    """
+    Rasterizes a triangle against a depth buffer. Covered pixels whose interpolated depth is not closer to the camera
+    than the depth already stored are rejected, the rest overwrite the stored depth
+
+    Args:
+        zbuf: an M x N depth buffer holding the depth of the closest surface drawn so far at every pixel
+        verts2d: 3x2 array containing the pixel coordinates of the 3 vertices of a triangle
+        vdepth: the depth of the 3 vertices of the triangle
+        origin: the image pixel of zbuf[0, 0] when zbuf is a window of a larger image. The triangle is rasterized in
+            image coordinates and cut to the window, so that it covers the same pixels as when drawn on the whole image
+
+    Returns:
+        xs: the first (vertical) pixel coordinate of every visible pixel, in zbuf
+        ys: the second (horizontal) pixel coordinate of every visible pixel, in zbuf
+        weights: a K x 3 matrix with the barycentric weights of every visible pixel
+    """
+    xs, ys, weights = triangle_fragments(verts2d, (origin[0] + zbuf.shape[0], origin[1] + zbuf.shape[1]))
+    if origin != (0, 0):
+        inside = (xs >= origin[0]) & (ys >= origin[1])
+        xs, ys, weights = xs[inside] - origin[0], ys[inside] - origin[1], weights[inside]
+    z = np.dot(weights, vdepth)
+    visible = z < zbuf[xs, ys]
+    xs, ys, weights = xs[visible], ys[visible], weights[visible]
+    zbuf[xs, ys] = z[visible]
+    count('pixels_written', len(xs))
+    return xs, ys, weights
+
+
+# Number of fractional bits of the fixed-point vertex coordinates of exact_fragments
+SUBPIXEL_BITS = 8
+
+
+def _owns_edge(dx, dy):
+    # Top-left rule: of the two triangles sharing an edge, the pixel centres lying exactly on it belong to the one that
+    # walks it with dx < 0, or with dx == 0 and dy > 0 (the other one walks it in the opposite direction)
+    return dx < 0 or (dx == 0 and dy > 0)
+
+
+def exact_fragments(verts2d, img_shape, vdepth=None, subpixel_bits=SUBPIXEL_BITS):
+    """
+    Finds every pixel of an image whose centre is covered by a triangle, with the vertices snapped to a fixed-point
+    grid of 1 / 2^subpixel_bits pixel instead of to whole pixels. The edge functions are evaluated exactly in integers
+    and pixel centres on an edge are assigned by the top-left rule, so the triangles of a closed surface cover every
+    pixel exactly once, without cracks or pixels drawn twice along shared edges. Triangles with no area cover nothing.
+    Given the depth of the vertices, the weights are perspective-correct instead of linear in screen space
+
+    Args:
+        verts2d: 3x2 array containing the (unrounded) pixel coordinates of the 3 vertices of a triangle
+        img_shape: the shape of the image (M x N x 3) the triangle is drawn on
+        vdepth: the optional depth of the 3 vertices of the triangle, in camera coordinates
+        subpixel_bits: the number of fractional bits of the vertex coordinates
+
+    Returns:
+        xs: the first (vertical) pixel coordinate of every covered pixel
+        ys: the second (horizontal) pixel coordinate of every covered pixel
+        weights: a K x 3 matrix with the barycentric weights of every covered pixel with respect to the 3 vertices
+        z: the perspective-correct depth of every covered pixel, None if vdepth is not given
+    """
+    scale = 1 << subpixel_bits
+    fixed = np.around(np.asarray(verts2d, dtype=float) * scale).astype(np.int64)
+    empty = np.empty(0, dtype=int)
+
+    (x0, y0), (x1, y1), (x2, y2) = fixed.tolist()
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    if area == 0:
+        return empty, empty, np.empty((0, 3)), None if vdepth is None else np.empty(0)
+    # Walk every triangle counter-clockwise, so that the edge functions are positive inside
+    order = [0, 1, 2] if area > 0 else [0, 2, 1]
+    fixed = fixed[order]
+
+    x_min = max(-(-int(fixed[:, 0].min()) // scale), 0)
+    x_max = min(int(fixed[:, 0].max()) // scale, img_shape[0] - 1)
+    y_min = max(-(-int(fixed[:, 1].min()) // scale), 0)
+    y_max = min(int(fixed[:, 1].max()) // scale, img_shape[1] - 1)
+    if x_min > x_max or y_min > y_max:
+        return empty, empty, np.empty((0, 3)), None if vdepth is None else np.empty(0)
+
+    xs, ys = np.mgrid[x_min:x_max + 1, y_min:y_max + 1]
+    xs = xs.ravel()
+    ys = ys.ravel()
+    px = xs.astype(np.int64) * scale
+    py = ys.astype(np.int64) * scale
+
+    # Edge function of the edge opposite to every vertex, proportional to the barycentric weight of that vertex
+    edges = np.empty((len(xs), 3), dtype=np.int64)
+    inside = np.ones(len(xs), dtype=bool)
+    for i in range(3):
+        (ax, ay), (bx, by) = fixed[(i + 1) % 3], fixed[(i + 2) % 3]
+        edges[:, i] = (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+        inside &= edges[:, i] >= (0 if _owns_edge(bx - ax, by - ay) else 1)
+
+    weights = edges[inside][:, order] / abs(area)
+    xs, ys = xs[inside], ys[inside]
+    if vdepth is None:
+        return xs, ys, weights, None
+
+    # Attributes are linear in 1 / z on the screen, not in z
+    weights /= np.asarray(vdepth, dtype=float)
+    inverse_depth = np.sum(weights, axis=1)
+    weights /= inverse_depth[:, np.newaxis]
+    return xs, ys, weights, 1 / inverse_depth
+
+
+def fill_triangle_exact(img, verts2d, vcolors, vdepth, shade_t='Flat', zbuf=None):
+    """
+    Counterpart of fill_triangle on exact_fragments: sub-pixel vertex coordinates, top-left fill rule and
+    perspective-correct Gouraud colours
+
+    Args:
+        img: An image with possible pre-existing triangles
+        verts2d: 3x2 array containing the (unrounded) pixel coordinates of the 3 vertices of a triangle
+        vcolors: 3x3 array containing the color of the vertices in an RGB scale, ranging from [0,1]
+        vdepth: the depth of the 3 vertices of the triangle, in camera coordinates
+        shade_t: the Shading mode. This can be flat(mean of color) or Gouraud(linear interpolation of color)
+        zbuf: an optional M x N depth buffer. Pixels of the triangle that are not closer than the stored depth are
+            rejected, the rest overwrite it
+
+    Returns:
+        A triangle filled with color
+    """
+    xs, ys, weights, z = exact_fragments(verts2d, img.shape, vdepth)
+    if zbuf is not None:
+        visible = z < zbuf[xs, ys]
+        xs, ys, weights = xs[visible], ys[visible], weights[visible]
+        zbuf[xs, ys] = z[visible]
+    count('pixels_written', len(xs))
+    if shade_t == 'Gouraud':
+        img[xs, ys] = np.dot(weights, vcolors)
+    else:
+        img[xs, ys] = np.mean(vcolors, axis=0)
+    return img
@@ -1,11 +1,42 @@
 import numpy as np
-from .shade import shade_phong, shade_gouraud, shade_triangle
-from .helpers import rasterize, calculate_normals
-from transformations.projection import project_cam_lookat
+from itertools import repeat
+from .shade import shade_triangle, shade_triangles
+from .rasterizer import fill_triangle, fill_triangle_exact, depth_tested_fragments, scanline_colors
+from .culling import cull_triangles
+from .mesh import Mesh
+from .framebuffer import get_framebuffer
+from .lod import select_lod
+from .profiling import NO_PROFILER
+from .deferred import rasterize_gbuffer, shade_gbuffer
+from .helpers import rasterize, calculate_normals, get_colors
+from transformations.projection import project_cam_lookat, world_to_pixel_matrix
+
+
+def _render_tiles(*args):
+    # The process pool is only imported once more than one worker is asked for
+    from .parallel import render_tiles
+    return render_tiles(*args)
+
+
+def _tile_pool(workers):
+    # A TilePool that several images are shaded on, imported like _render_tiles
+    from .parallel import TilePool
+    return TilePool(workers)
+
+
+def _compiled(backend):
+    # numba is slow to import, so the compiled kernels are only loaded for the jit backend. Returns the rendering.jit
+    # module, or None if the backend is not 'jit' or numba is not installed
+    if backend != 'jit':
+        return None
+    from . import jit
+    return jit if jit.JIT_AVAILABLE else None
 
 
 def render_object(lighting, shader, focal, eye, lookat, up, bg_color, M, N, H, W, verts, vert_colors, face_indices, ka,
-                  kd, ks, n, light_positions, light_intensities, Ia):
+                  kd, ks, n, light_positions, light_intensities, Ia, depth_test=False, deferred=False,
+                  vertex_lighting=False, workers=1, tile_size=64, cull=False, stats=None, backend='scanline',
+                  profile=None, framebuffer=None, lod=False, lighting_cache=None, pool=None):
     """
     Renders an object made of a specific material, placed in a scene with light sources and a camera.
     It calculates how light is reflected onto the object, and its final color at each point.
@@ -22,7 +53,8 @@ def render_object(lighting, shader, focal, eye, lookat, up, bg_color, M, N, H, W
         N: the width of the generated image in pixels
         H: the physical height of the camera lens in units of length identical to those used in the camera coordinate system.
         W: the physical width of the camera lens in units of length identical to those used in the camera coordinate system.
-        verts: is a 3 × N matrix with the coordinates of the vertices of the object
+        verts: is a 3 × N matrix with the coordinates of the vertices of the object, or a Mesh holding the vertices,
+            colours and triangles of the object (vert_colors and face_indices are then ignored)
         vert_colors: a 3 × N matrix with the colour components of each vertex of the object
         face_indices: a 3×N matrix describing the triangles
         ka: the factor of diffused light from the environment
@@ -32,52 +64,238 @@ def render_object(lighting, shader, focal, eye, lookat, up, bg_color, M, N, H, W
         light_positions: a list of 3 × N vectors containing the components of the position of the light sources.
         light_intensities: a list of 3 × N vectors containing the intensities of the bright sources (corresponding to light_positions).
         Ia: the 3 × 1 vector with the components of the diffuse irradiance of the ambient radiation intensity. Each component belongs to the interval [0, 1].
+        depth_test: if True, triangles are drawn front to back against a per-pixel depth buffer and hidden pixels are
+            rejected before they are lit, instead of overdrawing sorted triangles back to front. Visible pixels get
+            the colours the scanline shaders give them
+        deferred: if True, the position, normal vector and colour of the visible surface are first rasterized into
+            M × N buffers, and every visible pixel is then lit once in a single vectorized pass. Only valid with
+            Phong shading, the surface point used for lighting is interpolated per pixel
+        vertex_lighting: if True, every vertex is lit exactly once at its own position and Gouraud shading only
+            interpolates the precomputed colours, instead of lighting the 3 vertices of every triangle at its barycentre.
+            Only valid with Gouraud shading
+        workers: the number of processes the image is shaded on. With more than one, triangles are binned into
+            tile_size × tile_size screen tiles that are shaded in parallel into a shared image. Not used by deferred
+            shading
+        tile_size: the side of a screen tile in pixels
+        cull: if True, triangles behind the camera, outside the image or facing away from the camera are removed
+            before the depth sort. Set it to 'frustum' to keep the back-facing triangles. When verts is a Mesh, whole
+            groups of triangles outside the view frustum are first skipped with its bvh, before anything is projected
+        stats: an optional dict that the culling counts are stored in, under 'culled'
+        backend: 'scanline' for the Python scanline shaders, 'jit' for the same scanline compiled with numba. The
+            compiled scanline is used for triangles overdrawn on a single process, and falls back to the Python
+            shaders when numba is not installed
+        profile: an optional rendering.profiling.Profiler that records the time, triangle counts, pixels written,
+            overdraw and lighting calls of every stage of the pipeline
+        framebuffer: an optional M × N float64 Framebuffer (with a depth buffer if depth_test is set) that is cleared
+            to bg_color and drawn into, instead of allocating a new image. The returned image is its colour image
+        lod: if True, verts must be a Mesh and the level of its lod_chain with about one triangle per pixel covered by
+            the object (estimated from its projected bounding box) is rendered instead. A number sets the pixels per
+            triangle to aim for. The chosen level is stored in stats under 'lod'. The chain is built the first time
+            it is used, read mesh.lod_chain once beforehand (e.g. when loading the scene) to keep that out of a frame
+        lighting_cache: an optional rendering.cache.LightingCache used by vertex_lighting and deferred shading. Renders
+            of the same geometry, camera and light sources then reuse the diffuse and specular light computed before,
+            whatever the lighting mode, colours, ka, kd and ks
+        pool: an optional open rendering.parallel.TilePool the screen tiles are shaded on, instead of starting workers
+            processes for this image only. Pass the same pool to the frames of an animation to start the processes once
 
     Returns:
-        An image with a rendered object
+        An image with a rendered object. If depth_test is set, the M × N float32 depth buffer is returned as well
     """
     assert lighting in ['Ambient', 'Diffuse', 'Specular', 'All']
     assert shader in ['Gouraud', 'Phong']
+    assert not deferred or shader == 'Phong'
+    assert not vertex_lighting or shader == 'Gouraud'
+    assert backend in ['scanline', 'jit']
 
-    normals = calculate_normals(verts, face_indices)
-    verts_projected, depth = project_cam_lookat(eye, lookat, up, verts, focal)
-    verts2d = rasterize(verts_projected, M, N, H, W).astype(int)
-    image_shape = (M, N, 3)
-    img = np.ones(image_shape)
+    if profile is None:
+        profile = NO_PROFILER
 
-    # Average depth of every triangle
-    depth_order = np.array(np.mean(depth[face_indices], axis=1))
+    if lod:
+        assert isinstance(verts, Mesh), 'level of detail selection needs a Mesh'
+        with profile.stage('lod', len(verts.faces)) as record:
+            level = _select_level(verts.lod_chain, eye, lookat, up, focal, M, N, H, W,
+                                  1.0 if lod is True else lod)
+            verts = verts.lod_chain[level]
+            record['triangles_out'] = len(verts.faces)
+        if stats is not None:
+            stats['lod'] = level
 
-    # Sort triangles by depth
-    sorted_triangles = list(np.flip(np.argsort(depth_order)))
+    frustum_culled = None
+    with profile.stage('normals'):
+        if isinstance(verts, Mesh):
+            mesh = verts
+            normals = mesh.normals
+            verts, vert_colors, face_indices = mesh.arrays()
+        else:
+            mesh = None
+            normals = calculate_normals(verts, face_indices)
+    if cull and mesh is not None:
+        with profile.stage('frustum', len(face_indices)) as record:
+            face_indices = face_indices[mesh.bvh.frustum_faces(eye, lookat, up, focal, H, W)]
+            frustum_culled = len(mesh.faces) - len(face_indices)
+            record['triangles_out'] = len(face_indices)
+    with profile.stage('projection'):
+        verts_projected, depth = project_cam_lookat(eye, lookat, up, verts, focal)
+    with profile.stage('rasterize'):
+        verts2d = rasterize(verts_projected, M, N, H, W).astype(int)
+    framebuffer = get_framebuffer(framebuffer, M, N, np.float64, depth_test, bg_color)
+    img = framebuffer.color
 
-    if shader == 'Gouraud':
-        for triangle in sorted_triangles:
-            triangle_vertices_indeces = face_indices[triangle]
-            triangle_verts2d = np.array(verts2d[triangle_vertices_indeces])
-            triangle_vcolors = np.array(vert_colors[triangle_vertices_indeces])
-            barycentre_coords = np.mean(verts[triangle_vertices_indeces], axis=0)
-            img = shade_gouraud(lighting, triangle_verts2d, normals[triangle_vertices_indeces], triangle_vcolors,
-                                barycentre_coords, eye, ka, kd, ks, n, light_positions, light_intensities, Ia, img)
-
-    if shader == 'Phong':
-        for triangle in sorted_triangles:
-            triangle_vertices_indeces = face_indices[triangle]
-            triangle_verts2d = np.array(verts2d[triangle_vertices_indeces])
-            triangle_vcolors = np.array(vert_colors[triangle_vertices_indeces])
-            barycentre_coords = np.mean(verts[triangle_vertices_indeces], axis=0)
-            img = shade_phong(lighting, triangle_verts2d, normals[triangle_vertices_indeces], triangle_vcolors,
-                              barycentre_coords, eye, ka, kd, ks, n, light_positions, light_intensities, Ia, img)
-    return img
+    if cull:
+        with profile.stage('cull', len(face_indices)) as record:
+            visible, culled = cull_triangles(verts, verts2d, depth, face_indices, eye, M, N, cull != 'frustum')
+            face_indices = face_indices[visible]
+            record['triangles_out'] = len(face_indices)
+        if frustum_culled is not None:
+            culled['frustum'] = frustum_culled
+        if stats is not None:
+            stats['culled'] = culled
+
+    if deferred:
+        with profile.stage('gbuffer', len(face_indices)) as record:
+            position, normal, albedo, zbuf = rasterize_gbuffer(verts2d, depth, verts, normals, vert_colors,
+                                                               face_indices, M, N)
+            record['covered_pixels'] = int(np.count_nonzero(np.isfinite(zbuf)))
+        with profile.stage('deferred_shading'):
+            img = shade_gbuffer(lighting, position, normal, albedo, zbuf, eye, ka, kd, ks, n, light_positions,
+                                light_intensities, Ia, img, lighting_cache)
+        if depth_test:
+            framebuffer.depth[:] = zbuf
+            zbuf = framebuffer.depth
+        return (img, zbuf) if depth_test else img
+
+    scene = dict(lighting=lighting, shader=shader, verts=verts, verts2d=verts2d, depth=depth, normals=normals,
+                 vert_colors=vert_colors, face_indices=face_indices, cam_pos=eye, ka=ka, kd=kd, ks=ks, n=n,
+                 light_positions=light_positions, light_intensities=light_intensities, Ia=Ia, lit_vert_colors=None)
+    if vertex_lighting:
+        with profile.stage('vertex_lighting'):
+            shade = get_colors if lighting_cache is None else lighting_cache.get_colors
+            scene['lit_vert_colors'] = shade(lighting, verts, normals, vert_colors, eye, ka, kd, ks, n,
+                                             light_positions, light_intensities, Ia)
+
+    with profile.stage('sort', len(face_indices)):
+        # Average depth of every triangle
+        depth_order = np.array(np.mean(depth[face_indices], axis=1))
+        if depth_test:
+            # Closest triangles first, so that hidden pixels fail the depth test and are never lit
+            zbuf = framebuffer.depth
+            sorted_triangles = np.argsort(depth_order)
+        else:
+            # Sort triangles by depth
+            zbuf = None
+            sorted_triangles = np.flip(np.argsort(depth_order))
+
+    with profile.stage('shading', len(sorted_triangles)) as record:
+        if workers > 1 or pool is not None:
+            img, zbuf = _render_tiles(scene, sorted_triangles, img, zbuf, tile_size, workers, pool)
+        elif _compiled(backend) is not None and zbuf is None:
+            img = _compiled(backend).shade_triangles_compiled(img, sorted_triangles, scene)
+        else:
+            img = shade_triangles(img, zbuf, sorted_triangles, scene)
+            # Pixels written by worker processes and numba kernels are not counted, so neither is the overdraw
+            if profile is not NO_PROFILER:
+                covered = np.isfinite(zbuf) if zbuf is not None else np.any(img != framebuffer.bg_color, axis=2)
+                record['covered_pixels'] = int(np.count_nonzero(covered))
+    return (img, zbuf) if depth_test else img
+
+
+def _select_level(chain, eye, lookat, up, focal, M, N, H, W, pixels_per_triangle):
+    # The pixels covered by the object are estimated by the projected bounding box of its coarsest level
+    verts_projected, _ = project_cam_lookat(eye, lookat, up, chain[-1].verts, focal)
+    verts2d = rasterize(verts_projected, M, N, H, W, subpixel=True)
+    low = np.clip(verts2d.min(axis=0), 0, [M, N])
+    high = np.clip(verts2d.max(axis=0), 0, [M, N])
+    covered_pixels = np.prod(high - low)
+    return select_lod([len(mesh.faces) for mesh in chain], covered_pixels, pixels_per_triangle)
+
+
+def render_stream(chunks, lighting, shader, focal, eye, lookat, up, bg_color, M, N, H, W, ka, kd, ks, n,
+                  light_positions, light_intensities, Ia, vertex_lighting=False, workers=1, tile_size=64, cull=True,
+                  stats=None, framebuffer=None, pool=None):
+    """
+    Renders an object given as a sequence of chunks of triangles, like render_object with depth_test set. Every chunk
+    is projected, culled, depth tested and shaded into the same image and depth buffer and then dropped, so the memory
+    used depends on the size of a chunk and not on the size of the object. Triangles are drawn closest first within a
+    chunk only, so a pixel lying exactly on an edge shared with a triangle of another chunk may take the colour of
+    that other triangle
+
+    Args:
+        chunks: an iterable of (verts, vert_colors, face_indices) or (verts, vert_colors, face_indices, normals) tuples,
+            such as the one returned by rendering.scene.iter_chunks. face_indices point into the vertices of the chunk.
+            If normals are not given (or None), they are computed from the triangles of the chunk alone, which is
+            only right when no vertex is shared with another chunk: the normal vectors of vertices along the chunk
+            borders are wrong otherwise. iter_chunks always gives the normal vectors of the whole mesh
+        lighting, shader, focal, eye, lookat, up, bg_color, M, N, H, W, ka, kd, ks, n, light_positions,
+        light_intensities, Ia, vertex_lighting, workers, tile_size, pool: as in render_object. Without a pool, the
+            workers processes are started once and shade every chunk
+        cull: whether triangles behind the camera, outside the image or facing away from the camera are removed from
+            every chunk. Set it to 'frustum' to keep the back-facing triangles
+        stats: an optional dict that the number of 'chunks' and the summed culling counts ('culled') are stored in
+        framebuffer: an optional M × N float64 Framebuffer with a depth buffer, cleared to bg_color and drawn into
+
+    Returns:
+        An image with a rendered object, and its M × N float32 depth buffer
+    """
+    assert lighting in ['Ambient', 'Diffuse', 'Specular', 'All']
+    assert shader in ['Gouraud', 'Phong']
+    assert not vertex_lighting or shader == 'Gouraud'
+
+    framebuffer = get_framebuffer(framebuffer, M, N, np.float64, True, bg_color)
+    img, zbuf = framebuffer.color, framebuffer.depth
+    if stats is not None:
+        stats['chunks'] = 0
+        stats['culled'] = {'behind': 0, 'offscreen': 0, 'backface': 0}
+
+    tiles = pool if pool is not None or workers <= 1 else _tile_pool(workers)
+    try:
+        for chunk in chunks:
+            verts, vert_colors, face_indices = chunk[0:3]
+            normals = chunk[3] if len(chunk) > 3 else None
+            if normals is None:
+                normals = calculate_normals(verts, face_indices)
+            verts_projected, depth = project_cam_lookat(eye, lookat, up, verts, focal)
+            verts2d = rasterize(verts_projected, M, N, H, W).astype(int)
+
+            if cull:
+                visible, culled = cull_triangles(verts, verts2d, depth, face_indices, eye, M, N, cull != 'frustum')
+                face_indices = face_indices[visible]
+                if stats is not None:
+                    for key in culled:
+                        stats['culled'][key] += culled[key]
+            if stats is not None:
+                stats['chunks'] += 1
+            if len(face_indices) == 0:
+                continue
 
+            scene = dict(lighting=lighting, shader=shader, verts=verts, verts2d=verts2d, depth=depth, normals=normals,
+                         vert_colors=vert_colors, face_indices=face_indices, cam_pos=eye, ka=ka, kd=kd, ks=ks, n=n,
+                         light_positions=light_positions, light_intensities=light_intensities, Ia=Ia,
+                         lit_vert_colors=None)
+            if vertex_lighting:
+                scene['lit_vert_colors'] = get_colors(lighting, verts, normals, vert_colors, eye, ka, kd, ks, n,
+                                                      light_positions, light_intensities, Ia)
 
-def render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f, c_org, c_lookat, c_up):
+            # Closest triangles of the chunk first, the depth buffer takes care of the order between chunks
+            sorted_triangles = np.argsort(np.mean(depth[face_indices], axis=1))
+            if tiles is not None:
+                img, zbuf = tiles.render(scene, sorted_triangles, img, zbuf, tile_size)
+            else:
+                img = shade_triangles(img, zbuf, sorted_triangles, scene)
+    finally:
+        if tiles is not None and tiles is not pool:
+            tiles.close()
+    return img, zbuf
+
+
+def render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f, c_org, c_lookat, c_up,
+                         backend='scanline', framebuffer=None):
     """
     Renders an object by projecting it onto the camera lens and then quantizing the image. The color and how the light
     falls on the object are known prior
 
     Args:
-        verts_3d: a Nx3 Matrix containing every triangle vertice of the object
+        verts_3d: a Nx3 Matrix containing every triangle vertice of the object, or a Mesh holding the vertices, colours
+            and triangles of the object (faces and vcolors are then ignored)
         faces: a Nx3 matrix containing every triangle points
         vcolors: a NX3 matrix containing every RGB Color of every vertice
         img_h: The height of the image, measured in pixels
@@ -88,42 +306,192 @@ def render_object_camera(verts_3d, faces, vcolors, img_h, img_w, cam_h, cam_w, f
         c_org: A point indicating where is the camera in the scene of the world
         c_lookat: The point where the camera looks/focuses
         c_up: A vector indicating the standing side of the camera
+        backend: the triangle filling algorithm. 'scanline' walks every triangle line by line, 'vectorized' covers the
+            bounding box of every triangle with barycentric edge functions, 'jit' runs the scanline compiled with numba.
+            'exact' keeps sub-pixel vertex coordinates, writes every pixel of a surface exactly once (top-left fill
+            rule) and interpolates colours perspective-correctly
+        framebuffer: an optional img_h × img_w Framebuffer that is cleared and drawn into, instead of allocating a new
+            image
 
     Returns:
         An image with a rendered object
     """
+    if isinstance(verts_3d, Mesh):
+        verts_3d, vcolors, faces = verts_3d.arrays()
+    # Projected in double precision like render_sequence does, float32 vertices may round to other pixels otherwise
+    verts_3d = np.asarray(verts_3d, dtype=float)
     verts_2d, depth = project_cam_lookat(c_org, c_lookat, c_up, verts_3d, f)
-    verts_2d = rasterize(verts_2d, img_h, img_w, cam_h, cam_w).astype(int)
+    verts_2d = rasterize(verts_2d, img_h, img_w, cam_h, cam_w, subpixel=backend == 'exact')
+    if backend != 'exact':
+        verts_2d = verts_2d.astype(int)
 
-    return render_object_base(verts_2d, faces, vcolors, depth, "Gouraud")
+    return render_object_base(verts_2d, faces, vcolors, depth, "Gouraud", backend, M=img_h, N=img_w,
+                              framebuffer=framebuffer)
 
 
-def render_object_base(verts2d, faces, vcolors, depth, shade_t="Flat"):
+def render_object_base(verts2d, faces, vcolors, depth, shade_t="Flat", backend='scanline', depth_test=False, M=512,
+                       N=512, dtype=np.float32, bg_color=None, framebuffer=None, pool=None, tile_size=64):
     """
     Renders an object which has been previously projected onto a camera
 
     Args:
-        verts2d: A N x 3 matrix containing every triangle vertice of a projected object
+        verts2d: A N x 3 matrix containing every triangle vertice of a projected object, or a Mesh holding the
+            projected vertices, colours and triangles of the object (faces and vcolors are then ignored)
         faces: A N x 3 list containing the vertices of each triangle
         vcolors: A N x 3 list containing the colors of each vertice
         depth: a N x 1 list containing the depth of each triangle in a scene
         shade_t: the Shading mode. This can be flat(mean of color) or Gouraud(linear interpolation of color)
+        backend: the triangle filling algorithm. 'scanline' walks every triangle line by line, 'vectorized' covers the
+            bounding box of every triangle with barycentric edge functions, 'jit' runs the scanline compiled with numba
+            (or the Python scanline when numba is not installed). 'exact' takes unrounded pixel coordinates, snaps them
+            to a sub-pixel grid, writes every pixel of a surface exactly once (top-left fill rule) and interpolates
+            colours perspective-correctly with depth
+        depth_test: if True, triangles are drawn front to back against a per-pixel depth buffer instead of overdrawing
+            sorted triangles back to front. Depth testing uses the vectorized rasterizer, or the exact one with the
+            'exact' backend
+        M: the height of the image in pixels
+        N: the width of the image in pixels
+        dtype: the floating point type of the image
+        bg_color: the 3 × 1 vector with the colour components of the background, white if not given
+        framebuffer: an optional M × N Framebuffer (with a depth buffer if depth_test is set) that is cleared and drawn
+            into, instead of allocating a new image. M, N and dtype are then taken from it
+        pool: an optional open rendering.parallel.TilePool the scanline backend shades tile_size × tile_size screen
+            tiles on in parallel, when triangles are overdrawn without a depth test
+        tile_size: the side of a screen tile in pixels
 
     Returns:
-        An image with a rendered object
+        An image with a rendered object. If depth_test is set, the M × N float32 depth buffer is returned as well
     """
     assert shade_t in ['Flat', 'Gouraud']
+    assert backend in ['scanline', 'vectorized', 'jit', 'exact']
+    if isinstance(verts2d, Mesh):
+        verts2d, vcolors, faces = verts2d.arrays()
+        if backend != 'exact':
+            verts2d = verts2d.astype(int)
+    fill = fill_triangle if backend == 'vectorized' else shade_triangle
 
-    M = N = 512
-    image_shape = (M, N, 3)
-    img = np.ones(image_shape)
+    if framebuffer is not None:
+        M, N = framebuffer.shape
+        dtype = framebuffer.color.dtype
+    framebuffer = get_framebuffer(framebuffer, M, N, dtype, depth_test, bg_color)
+    img = framebuffer.color
     # Average depth of every triangle
     depth_order = np.array(np.mean(depth[faces], axis=1))
+
+    if backend == 'exact':
+        # Without a depth buffer, the triangles are still overdrawn back to front
+        zbuf = framebuffer.depth if depth_test else None
+        sorted_triangles = np.argsort(depth_order) if depth_test else np.flip(np.argsort(depth_order))
+        triangle_faces = faces[sorted_triangles]
+        triangles_verts2d = verts2d[triangle_faces]
+        triangles_vcolors = vcolors[triangle_faces]
+        triangles_depth = depth[triangle_faces]
+        for i in range(len(triangle_faces)):
+            img = fill_triangle_exact(img, triangles_verts2d[i], triangles_vcolors[i], triangles_depth[i], shade_t,
+                                      zbuf)
+        return (img, zbuf) if depth_test else img
+
+    if depth_test:
+        zbuf = framebuffer.depth
+        for triangle in np.argsort(depth_order):
+            triangle_vertices_indeces = faces[triangle]
+            xs, ys, weights = depth_tested_fragments(zbuf, verts2d[triangle_vertices_indeces],
+                                                      depth[triangle_vertices_indeces])
+            if shade_t == 'Gouraud':
+                # Interpolated like the scanline does, rather than blended with the barycentric weights
+                img[xs, ys] = scanline_colors(verts2d[triangle_vertices_indeces], vcolors[triangle_vertices_indeces],
+                                              xs, ys)
+            else:
+                img[xs, ys] = np.mean(vcolors[triangle_vertices_indeces], axis=0)
+        return img, zbuf
+
     # Sort triangles by depth
     sorted_triangles = list(np.flip(np.argsort(depth_order)))
-    for triangles in sorted_triangles:
-        triangle_vertices_indeces = faces[triangles]
-        triangle_verts2d = np.array(verts2d[triangle_vertices_indeces])
-        triangle_vcolors = np.array(vcolors[triangle_vertices_indeces])
-        img = shade_triangle(img, triangle_verts2d, triangle_vcolors, shade_t)
+    if pool is not None and backend == 'scanline':
+        # The vertex colours are shaded like colours lit in advance, without any lighting
+        scene = dict(lighting=None, shader=shade_t, verts=None, verts2d=verts2d, depth=depth, normals=None,
+                     vert_colors=vcolors, face_indices=faces, cam_pos=None, ka=None, kd=None, ks=None, n=None,
+                     light_positions=None, light_intensities=None, Ia=None, lit_vert_colors=vcolors)
+        return pool.render(scene, sorted_triangles, img, None, tile_size)[0]
+    if _compiled(backend) is not None:
+        return _compiled(backend).fill_triangles_compiled(img, verts2d, vcolors, faces, sorted_triangles, shade_t)
+    # Gather the vertices and colours of every triangle once, in drawing order
+    triangle_faces = faces[sorted_triangles]
+    triangles_verts2d = verts2d[triangle_faces]
+    triangles_vcolors = vcolors[triangle_faces]
+    for i in range(len(triangle_faces)):
+        img = fill(img, triangles_verts2d[i], triangles_vcolors[i], shade_t)
     return img
+
+
+def render_sequence(mesh, cameras, transforms=None, img_h=512, img_w=512, cam_h=15, cam_w=15, f=70, shade_t="Gouraud",
+                    backend='scanline', batch_size=16, framebuffer=None, workers=1, tile_size=64, pool=None):
+    """
+    Renders the frames of a camera path or an animation of an object, one frame at a time. Everything that does not
+    depend on the view is prepared once, and the object is projected for batch_size frames at a time with a single
+    batched matrix multiplication, so memory use does not grow with the number of frames. Both this and
+    render_object_camera project in double precision, so every frame is the image render_object_camera gives for its
+    camera (and the transformed object), except that the fused matrix rounds differently in the last bits: a vertex
+    within about 1e-12 pixels of the middle of two pixels may land on the other one
+
+    Args:
+        mesh: a Mesh, or a (verts_3d, faces, vcolors) tuple with the vertices, triangles and vertex colors of the object
+        cameras: an iterable of (c_org, c_lookat, c_up) camera poses, one per frame
+        transforms: an optional iterable of 4x4 homogeneous matrices (see affine_matrix), one per frame, applied to the
+            object before it is projected
+        img_h: The height of the image, measured in pixels
+        img_w: The width of the image, measured in pixels
+        cam_h: The height of the camera, measured in world units
+        cam_w: The width of the camera, measured in world units
+        f: How far is the camera lens from the camera's shutter, measured in world units
+        shade_t: the Shading mode. This can be flat(mean of color) or Gouraud(linear interpolation of color)
+        backend: the triangle filling algorithm, as in render_object_base
+        batch_size: the number of frames projected together
+        framebuffer: an optional img_h × img_w Framebuffer every frame is drawn into. The yielded images are then the
+            same array, overwritten by the next frame
+        workers: the number of processes the frames are shaded on with the scanline backend. With more than one, a
+            single rendering.parallel.TilePool is started and shades the tile_size × tile_size screen tiles of every
+            frame, and is closed once the last frame has been rendered
+        tile_size: the side of a screen tile in pixels
+        pool: an optional open TilePool to use instead of starting one, e.g. to share it with other renders. It is
+            left open
+
+    Yields:
+        An image with the rendered object for every frame
+    """
+    if isinstance(mesh, Mesh):
+        verts_3d, vcolors, faces = mesh.arrays()
+    else:
+        verts_3d, faces, vcolors = mesh
+    verts_3d = np.asarray(verts_3d, dtype=float)
+    faces = np.asarray(faces)
+    vcolors = np.asarray(vcolors)
+    if transforms is None:
+        transforms = repeat(np.eye(4))
+
+    tiles = pool if pool is not None or workers <= 1 or backend != 'scanline' else _tile_pool(workers)
+    options = (shade_t, backend, img_h, img_w, framebuffer, tiles, tile_size)
+    try:
+        batch = []
+        for camera, transform in zip(cameras, transforms):
+            batch.append(np.dot(world_to_pixel_matrix(*camera, f, img_h, img_w, cam_h, cam_w), transform))
+            if len(batch) == batch_size:
+                yield from _render_batch(np.array(batch), verts_3d, faces, vcolors, *options)
+                batch = []
+        if batch:
+            yield from _render_batch(np.array(batch), verts_3d, faces, vcolors, *options)
+    finally:
+        if tiles is not None and tiles is not pool:
+            tiles.close()
+
+
+def _render_batch(matrices, verts_3d, faces, vcolors, shade_t, backend, M, N, framebuffer, pool, tile_size):
+    # Projects the object with a stack of world to pixel matrices and renders every frame
+    projected = np.einsum('bij,nj->bni', matrices[:, :, 0:3], verts_3d) + matrices[:, np.newaxis, :, 3]
+    depth = projected[:, :, 3]
+    verts2d = projected[:, :, 0:2] / depth[:, :, np.newaxis]
+    if backend != 'exact':
+        verts2d = np.around(verts2d).astype(int)
+    for i in range(len(matrices)):
+        yield render_object_base(verts2d[i], faces, vcolors, depth[i], shade_t, backend, M=M, N=N,
+                                 framebuffer=framebuffer, pool=pool, tile_size=tile_size)
@@ -0,0 +1,277 @@
+import numpy as np
+from .light import ambient_light, diffuse_light_batch, specular_light_batch
+from .mesh import Mesh
+from .rasterizer import depth_tested_fragments
+from .helpers import rasterize
+from .profiling import count
+from transformations.projection import project_cam_lookat
+
+
+class RetainedRenderer:
+    """
+    Renders a Mesh with deferred Phong shading and keeps the buffers of the last frame, so that the next frame only
+    recomputes what an edit changes. Every pixel keeps the closest face, its barycentric weights, the surface position,
+    normal vector and colour, and the diffuse and specular light of every light source for a white surface with unit
+    coefficients. As the lighting model is linear in the colour and in kd and ks:
+        - moving or dimming a light source relights every visible pixel for that light source only
+        - changing ka, kd, ks, Ia or the colour of vertices only recombines the stored light of the affected pixels
+        - moving vertices re-rasterizes and relights only the screen rectangle covered by the faces whose shading
+          changes, before and after the move
+    Every edit returns the screen rectangles that changed, which are also kept in dirty
+    """
+    __slots__ = ('mesh', 'focal', 'eye', 'lookat', 'up', 'M', 'N', 'H', 'W', 'lighting', 'ka', 'kd', 'ks', 'n',
+                 'light_positions', 'light_intensities', 'Ia', 'bg_color', 'tile_size', 'img', 'zbuf', 'face_id',
+                 'weights', 'position', 'normal', 'albedo', 'diffuse', 'specular', 'dirty', '_verts2d', '_depth')
+
+    def __init__(self, mesh, lighting, focal, eye, lookat, up, M, N, H, W, ka, kd, ks, n, light_positions,
+                 light_intensities, Ia, bg_color=(1, 1, 1), tile_size=32):
+        """
+        Renders the first frame
+
+        Args:
+            mesh: the Mesh to render. It is edited in place by update_verts and update_colors
+            lighting: 'Ambient', 'Diffuse', 'Specular' or 'All', as in render_object
+            focal, eye, lookat, up, M, N, H, W: the camera and image, as in render_object
+            ka, kd, ks, n, light_positions, light_intensities, Ia: the material and light sources, as in render_object
+            bg_color: the 3 × 1 vector with the colour components of the background
+            tile_size: the side of the screen tiles the changed regions are reported in
+        """
+        assert isinstance(mesh, Mesh)
+        assert lighting in ['Ambient', 'Diffuse', 'Specular', 'All']
+        self.mesh = mesh
+        self.focal, self.eye, self.lookat, self.up = focal, np.asarray(eye, dtype=float), lookat, up
+        self.M, self.N, self.H, self.W = M, N, H, W
+        self.lighting = lighting
+        self.ka, self.kd, self.ks, self.n, self.Ia = ka, kd, ks, n, np.asarray(Ia, dtype=float)
+        self.light_positions = np.array(light_positions, dtype=float).reshape(-1, 3)
+        self.light_intensities = np.array(light_intensities, dtype=float).reshape(-1, 3)
+        self.bg_color = np.asarray(bg_color, dtype=float)
+        self.tile_size = tile_size
+
+        self.img = np.empty((M, N, 3))
+        self.zbuf = np.empty((M, N), dtype=np.float32)
+        self.face_id = np.empty((M, N), dtype=np.int32)
+        self.weights = np.zeros((M, N, 3))
+        self.position = np.zeros((M, N, 3))
+        self.normal = np.zeros((M, N, 3))
+        self.albedo = np.zeros((M, N, 3))
+        self.diffuse = np.zeros((len(self.light_positions), M, N, 3))
+        self.specular = np.zeros((len(self.light_positions), M, N, 3))
+        self.render()
+
+    def render(self):
+        """
+        Rasterizes, lights and shades the whole frame again
+
+        Returns:
+            The changed screen rectangles, i.e. the whole image
+        """
+        self._project()
+        self._rasterize(0, 0, self.M, self.N)
+        everywhere = np.ones((self.M, self.N), dtype=bool)
+        self._light(everywhere, range(len(self.light_positions)))
+        self._shade(everywhere)
+        self.dirty = [(0, 0, self.M, self.N)]
+        return self.dirty
+
+    def set_lights(self, light_positions=None, light_intensities=None, Ia=None):
+        """
+        Changes the light sources. Only the light sources whose position or intensity changed are recomputed, and only
+        the ambient term is if just Ia changed. Adding or removing light sources relights every one of them
+
+        Args:
+            light_positions: the new L × 3 positions of the light sources, unchanged if None
+            light_intensities: the new L × 3 intensities of the light sources, unchanged if None
+            Ia: the new ambient irradiance, unchanged if None
+
+        Returns:
+            The changed screen rectangles, as (x_start, y_start, x_end, y_end) with exclusive ends
+        """
+        positions = self.light_positions if light_positions is None else \
+            np.array(light_positions, dtype=float).reshape(-1, 3)
+        intensities = self.light_intensities if light_intensities is None else \
+            np.array(light_intensities, dtype=float).reshape(-1, 3)
+        if len(positions) != len(self.light_positions) or len(intensities) != len(self.light_intensities):
+            lights = range(len(positions))
+            self.diffuse = np.zeros((len(positions), self.M, self.N, 3))
+            self.specular = np.zeros((len(positions), self.M, self.N, 3))
+        else:
+            lights = np.flatnonzero(np.any(positions != self.light_positions, axis=1) |
+                                    np.any(intensities != self.light_intensities, axis=1))
+        self.light_positions, self.light_intensities = positions, intensities
+        if Ia is not None:
+            self.Ia = np.asarray(Ia, dtype=float)
+
+        visible = np.isfinite(self.zbuf)
+        self._light(visible, lights)
+        return self._update(visible)
+
+    def set_material(self, ka=None, kd=None, ks=None, n=None, lighting=None):
+        """
+        Changes the material or the lighting mode. Only a new Phong coefficient n or lighting mode relights the pixels,
+        the other coefficients scale the stored light
+
+        Args:
+            ka, kd, ks, n: the new coefficients of the Phong model, unchanged if None
+            lighting: the new lighting mode, unchanged if None
+
+        Returns:
+            The changed screen rectangles, as (x_start, y_start, x_end, y_end) with exclusive ends
+        """
+        self.ka = self.ka if ka is None else ka
+        self.kd = self.kd if kd is None else kd
+        self.ks = self.ks if ks is None else ks
+        visible = np.isfinite(self.zbuf)
+        if lighting is not None and lighting != self.lighting:
+            # Only the terms of the previous mode were computed
+            assert lighting in ['Ambient', 'Diffuse', 'Specular', 'All']
+            self.lighting = lighting
+            self.n = self.n if n is None else n
+            self._light(visible, range(len(self.light_positions)))
+        elif n is not None and n != self.n:
+            self.n = n
+            self._light(visible, range(len(self.light_positions)), diffuse=False)
+        return self._update(visible)
+
+    def update_colors(self, indices, colors):
+        """
+        Recolours some of the vertices of the mesh. Only the pixels of the faces that use them are shaded again
+
+        Args:
+            indices: the indices of the vertices to recolour
+            colors: their new colour components
+
+        Returns:
+            The changed screen rectangles, as (x_start, y_start, x_end, y_end) with exclusive ends
+        """
+        self.mesh.update_colors(indices, colors)
+        faces = np.flatnonzero(np.any(np.isin(self.mesh.faces, indices), axis=1))
+        pixels = np.isin(self.face_id, faces)
+        triangles = self.mesh.faces[self.face_id[pixels]]
+        self.albedo[pixels] = np.einsum('kj,kjc->kc', self.weights[pixels], self.mesh.colors[triangles])
+        return self._update(pixels)
+
+    def update_verts(self, indices, verts):
+        """
+        Moves some of the vertices of the mesh. The normal vectors of their neighbours change as well, so every face
+        touching a vertex of a moved face is drawn again: the rectangle covering those faces before and after the move
+        is re-rasterized with all the faces overlapping it, and relit
+
+        Args:
+            indices: the indices of the vertices to move
+            verts: their new coordinates
+
+        Returns:
+            The changed screen rectangles, as (x_start, y_start, x_end, y_end) with exclusive ends
+        """
+        faces = self.mesh.faces
+        moved = np.unique(faces[np.any(np.isin(faces, indices), axis=1)])
+        affected = np.flatnonzero(np.any(np.isin(faces, moved), axis=1))
+        old_rows, old_cols = np.nonzero(np.isin(self.face_id, affected))
+
+        self.mesh.update_verts(indices, verts)
+        self._project()
+        new_corners = self._verts2d[faces[affected]].reshape(-1, 2)
+        rows = np.concatenate([old_rows, np.clip(new_corners[:, 0], 0, self.M - 1)])
+        cols = np.concatenate([old_cols, np.clip(new_corners[:, 1], 0, self.N - 1)])
+        if len(rows) == 0:
+            self.dirty = []
+            return self.dirty
+        x_start, x_end = rows.min(), rows.max() + 1
+        y_start, y_end = cols.min(), cols.max() + 1
+
+        before = self.img[x_start:x_end, y_start:y_end].copy()
+        self._rasterize(x_start, y_start, x_end, y_end)
+        region = np.zeros((self.M, self.N), dtype=bool)
+        region[x_start:x_end, y_start:y_end] = True
+        self._light(region, range(len(self.light_positions)))
+        self._shade(region)
+        changed = np.zeros((self.M, self.N), dtype=bool)
+        changed[x_start:x_end, y_start:y_end] = np.any(self.img[x_start:x_end, y_start:y_end] != before, axis=2)
+        self.dirty = self._tiles(changed)
+        return self.dirty
+
+    def _project(self):
+        # Pixel coordinates and depth of every vertex of the mesh
+        verts_projected, self._depth = project_cam_lookat(self.eye, self.lookat, self.up, self.mesh.verts, self.focal)
+        self._verts2d = rasterize(verts_projected, self.M, self.N, self.H, self.W).astype(int)
+
+    def _rasterize(self, x_start, y_start, x_end, y_end):
+        # Clears a rectangle of the geometry buffer and draws into it every face overlapping it, closest first
+        zbuf = self.zbuf[x_start:x_end, y_start:y_end]
+        face_id = self.face_id[x_start:x_end, y_start:y_end]
+        weights = self.weights[x_start:x_end, y_start:y_end]
+        zbuf.fill(np.inf)
+        face_id.fill(-1)
+
+        faces = self.mesh.faces
+        corners = self._verts2d[faces]
+        low, high = corners.min(axis=1), corners.max(axis=1)
+        overlapping = np.flatnonzero((high[:, 0] >= x_start) & (low[:, 0] < x_end) &
+                                     (high[:, 1] >= y_start) & (low[:, 1] < y_end))
+        depth_order = np.mean(self._depth[faces[overlapping]], axis=1)
+        for face in overlapping[np.argsort(depth_order)]:
+            xs, ys, face_weights = depth_tested_fragments(zbuf, corners[face], self._depth[faces[face]],
+                                                          (x_start, y_start))
+            face_id[xs, ys] = face
+            weights[xs, ys] = face_weights
+
+        visible = face_id >= 0
+        triangles = faces[face_id[visible]]
+        pixel_weights = weights[visible]
+        normal = np.einsum('kj,kjc->kc', pixel_weights, self.mesh.normals[triangles])
+        lengths = np.linalg.norm(normal, axis=1, keepdims=True)
+        self.position[x_start:x_end, y_start:y_end][visible] = \
+            np.einsum('kj,kjc->kc', pixel_weights, self.mesh.verts[triangles])
+        self.normal[x_start:x_end, y_start:y_end][visible] = np.divide(normal, lengths, out=normal, where=lengths > 0)
+        self.albedo[x_start:x_end, y_start:y_end][visible] = \
+            np.einsum('kj,kjc->kc', pixel_weights, self.mesh.colors[triangles])
+
+    def _light(self, pixels, lights, diffuse=True):
+        # Recomputes the light of some light sources on the visible pixels of a mask, for a white surface with unit
+        # coefficients. Only the terms the lighting mode uses are computed
+        visible = pixels & np.isfinite(self.zbuf)
+        position, normal = self.position[visible], self.normal[visible]
+        white = np.ones_like(position)
+        for light in lights:
+            count('lighting_calls')
+            count('lit_points', len(position))
+            if diffuse and self.lighting in ['Diffuse', 'All']:
+                self.diffuse[light][visible] = diffuse_light_batch(position, normal, white, 1.0,
+                                                                   self.light_positions[light],
+                                                                   self.light_intensities[light])
+            if self.lighting in ['Specular', 'All']:
+                self.specular[light][visible] = specular_light_batch(position, normal, white, self.eye, 1.0, self.n,
+                                                                     self.light_positions[light],
+                                                                     self.light_intensities[light])
+
+    def _shade(self, pixels):
+        # Combines the stored light of the pixels of a mask into their final colour, the background elsewhere
+        visible = pixels & np.isfinite(self.zbuf)
+        self.img[pixels & ~visible] = self.bg_color
+        colors = np.zeros((np.count_nonzero(visible), 3))
+        if self.lighting in ['Ambient', 'All']:
+            colors += ambient_light(self.ka, self.Ia)
+        if self.lighting in ['Diffuse', 'All']:
+            colors += self.kd * self.albedo[visible] * np.sum(self.diffuse[:, visible], axis=0)
+        if self.lighting in ['Specular', 'All']:
+            colors += self.ks * self.albedo[visible] * np.sum(self.specular[:, visible], axis=0)
+        count('pixels_written', len(colors))
+        self.img[visible] = colors
+
+    def _update(self, pixels):
+        # Shades the pixels of a mask again and keeps the tiles where the image changed
+        before = self.img[pixels]
+        self._shade(pixels)
+        changed = np.zeros((self.M, self.N), dtype=bool)
+        changed[pixels] = np.any(self.img[pixels] != before, axis=1)
+        self.dirty = self._tiles(changed)
+        return self.dirty
+
+    def _tiles(self, changed):
+        # The tile_size × tile_size screen tiles holding at least one changed pixel, as rectangles
+        size = self.tile_size
+        rows, cols = np.nonzero(changed)
+        tiles = np.unique(np.stack([rows // size, cols // size], axis=1), axis=0)
+        return [(x * size, y * size, min((x + 1) * size, self.M), min((y + 1) * size, self.N))
+                for x, y in tiles.tolist()]
@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+import numpy as np
+from .helpers import accumulate_normals
+
+# Version of the scene header written by save_scene
+SCENE_VERSION = 1
+
+# Every array of the data file starts on a multiple of this many bytes
+_ALIGNMENT = 64
+
+
+def _data_path(path):
+    # The arrays of scene.json are stored next to it in scene.bin
+    return os.path.splitext(path)[0] + '.bin'
+
+
+def save_scene(path, data):
+    """
+    Writes a scene as a JSON header and a raw little-endian data file next to it holding every array, so the scene can
+    be read back lazily with np.memmap by load_scene
+
+    Args:
+        path: the path of the JSON header, e.g. materials/hw3.json. The arrays are written to materials/hw3.bin
+        data: a dict of named arrays (vertices, faces, colours, ...) and scalar parameters (ka, M, ...)
+    """
+    data_path = _data_path(path)
+    header = {'version': SCENE_VERSION, 'data': os.path.basename(data_path), 'arrays': {}, 'params': {}}
+    with open(data_path, 'wb') as f:
+        for name, value in data.items():
+            array = np.asarray(value)
+            assert array.dtype.kind in 'biuf', 'unsupported scene value ' + name
+            if array.ndim == 0:
+                header['params'][name] = array.item()
+                continue
+            dtype = array.dtype.newbyteorder('<')
+            f.write(bytes(-f.tell() % _ALIGNMENT))
+            header['arrays'][name] = {'offset': f.tell(), 'dtype': dtype.str, 'shape': list(array.shape)}
+            np.ascontiguousarray(array, dtype=dtype).tofile(f)
+
+    with open(path, 'w') as f:
+        json.dump(header, f, indent=2)
+
+
+def load_scene(path, mode='r'):
+    """
+    Opens a scene written by save_scene. Arrays are memory mapped, so their data is only paged in when it is used
+
+    Args:
+        path: the path of the JSON header
+        mode: the np.memmap mode of the arrays, 'r' for read-only, 'c' for copy-on-write or 'r+' to write back
+
+    Returns:
+        A dict with every array and parameter of the scene, under the same names given to save_scene
+    """
+    with open(path) as f:
+        header = json.load(f)
+    assert header['version'] == SCENE_VERSION
+
+    scene = dict(header['params'])
+    data_path = os.path.join(os.path.dirname(path), header['data'])
+    for name, entry in header['arrays'].items():
+        shape = tuple(entry['shape'])
+        if 0 in shape:
+            # np.memmap cannot map zero bytes
+            scene[name] = np.empty(shape, dtype=entry['dtype'])
+        else:
+            scene[name] = np.memmap(data_path, dtype=entry['dtype'], mode=mode, offset=entry['offset'], shape=shape)
+    return scene
+
+
+def iter_chunks(verts, face_indices, vert_colors, chunk_size=65536, normals=None):
+    """
+    Splits a mesh into chunks of consecutive triangles, for example straight from the memory-mapped arrays of
+    load_scene. Every chunk only holds the vertices its triangles use, so only chunk_size triangles and their vertices
+    are read from the arrays at a time
+
+    Args:
+        verts: a N x 3 matrix with the coordinates of the vertices of the object
+        face_indices: a K x 3 matrix describing the triangles
+        vert_colors: a N x 3 matrix with the colour components of each vertex of the object
+        chunk_size: the number of triangles in every chunk
+        normals: an optional N x 3 matrix with the normal vector of every vertex. If not given, they are computed by
+            stream_normals in a first pass over the triangles, before the first chunk is returned
+
+    Returns:
+        A generator of (verts, vert_colors, face_indices, normals) chunks, with face_indices pointing into the
+        vertices of the chunk
+    """
+    if normals is None:
+        normals = stream_normals(verts, face_indices, chunk_size)
+    for start in range(0, len(face_indices), chunk_size):
+        faces = np.asarray(face_indices[start:start + chunk_size])
+        used, local_faces = np.unique(faces, return_inverse=True)
+        local_faces = local_faces.reshape(faces.shape)
+        yield np.asarray(verts[used]), np.asarray(vert_colors[used]), local_faces, np.asarray(normals[used])
+
+
+def stream_normals(verts, face_indices, chunk_size=65536):
+    """
+    Calculates the normal vector of every vertex of a mesh like calculate_normals, reading chunk_size triangles at a
+    time. The normal vector of a vertex depends on every triangle around it, including those of other chunks, so
+    the chunks of a mesh cannot compute it on their own. Only the N x 3 sums are kept in memory
+
+    Args:
+        verts: a N x 3 matrix with the coordinates of the vertices of the object
+        face_indices: a K x 3 matrix describing the triangles
+        chunk_size: the number of triangles read at a time
+
+    Returns:
+        A N x 3 matrix with the unit normal vector of every vertex
+    """
+    sums = np.zeros(np.shape(verts))
+    for start in range(0, len(face_indices), chunk_size):
+        accumulate_normals(sums, verts, np.asarray(face_indices[start:start + chunk_size]))
+    lengths = np.linalg.norm(sums, axis=-1, keepdims=True)
+    return np.divide(sums, lengths, out=np.zeros(np.shape(sums)), where=lengths > 0)
+
+
+def convert_npy(npy_path, path=None):
+    """
+    Converts one of the pickled materials/hw*.npy dicts to the scene format. This is the only place such a file is
+    unpickled, so it should only be used on trusted files
+
+    Args:
+        npy_path: the path of the .npy file
+        path: the path of the JSON header to write, the .npy path with a .json extension if not given
+
+    Returns:
+        The path of the JSON header
+    """
+    if path is None:
+        path = os.path.splitext(npy_path)[0] + '.json'
+    data = dict(np.load(npy_path, allow_pickle=True).tolist())
+    save_scene(path, data)
+    return path
+
+
+if __name__ == '__main__':
+    # python -m rendering.scene materials/hw1.npy materials/hw2.npy ...
+    for npy_path in sys.argv[1:]:
+        print(convert_npy(npy_path))
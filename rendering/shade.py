@@ -1,11 +1,14 @@
 import numpy as np
 import math
+from rendering.rasterizer import depth_tested_fragments, scanline_colors
+from rendering.profiling import count
 from rendering.helpers import Edge, update_active_edges, find_initial_elements, slope, \
-    interpolate_color, interpolate_vector, get_color
+    interpolate_color, interpolate_vector, interpolate_color_span, interpolate_vector_span, clip_span, get_color, \
+    get_colors
 
 
 def shade_gouraud(lighting, vertice_positions, vertice_normal_vectors, vertice_colors, barycentre_coords, cam_pos, ka,
-                  kd, ks, n, light_positions, light_intensities, Ia, img):
+                  kd, ks, n, light_positions, light_intensities, Ia, img, window=None):
     """
     Fills a triangle using Gouraud shading with color depending on the light reflection on the polygon and the triangle vertices colors.
 
@@ -24,20 +27,17 @@ def shade_gouraud(lighting, vertice_positions, vertice_normal_vectors, vertice_c
         light_intensities: a list of 3 × N vectors containing the intensities of the bright sources (corresponding to light_positions).
         Ia: the 3 × 1 vector with the components of the diffuse irradiance of the ambient radiation intensity. Each component belongs to the interval [0, 1].
         img: an image (M × N × 3 matrix) with any pre-existing triangles
+        window: an optional (x0, x1, y0, y1) tuple. Only the pixels x0 <= x < x1 and y0 <= y < y1 are drawn, the whole
+            image if not given
 
     Returns:
         A triangle filled with color
     """
 
-    vertice_colors[0] = get_color(lighting, barycentre_coords, vertice_normal_vectors[0], vertice_colors[0], cam_pos,
-                                  ka, kd, ks, n, light_positions, light_intensities, Ia)
-
-    vertice_colors[1] = get_color(lighting, barycentre_coords, vertice_normal_vectors[1], vertice_colors[1], cam_pos,
-                                  ka, kd, ks, n, light_positions, light_intensities, Ia)
-
-    vertice_colors[2] = get_color(lighting, barycentre_coords, vertice_normal_vectors[2], vertice_colors[2], cam_pos,
-                                  ka, kd, ks, n, light_positions, light_intensities, Ia)
+    vertice_colors[:] = get_colors(lighting, barycentre_coords, vertice_normal_vectors, vertice_colors, cam_pos,
+                                   ka, kd, ks, n, light_positions, light_intensities, Ia)
 
+    x_low, x_high, y_low, y_high = (0, img.shape[0], 0, img.shape[1]) if window is None else window
     if np.all(vertice_positions[0, 0] == vertice_positions[:, 0]) and np.all(
             vertice_positions[:, 1] == vertice_positions[0, 1]):
         return img
@@ -86,16 +86,20 @@ def shade_gouraud(lighting, vertice_positions, vertice_normal_vectors, vertice_c
                 index = i
                 x1 = vertice_positions[i, 0]
                 x2 = x1
-        if 0 <= x1 <= img.shape[0] - 1 and 0 <= y_min <= img.shape[1] - 1:
+        if x_low <= x1 <= x_high - 1 and y_low <= y_min <= y_high - 1:
+            count('pixels_written')
             img[int(math.floor(x1 + 0.5)), int(math.floor(y_min + 0.5))] = vertice_colors[index, :]
     else:
         x1, x2, C1, C2, n1, n2 = find_initial_elements(edges, active_edges)
-        for x in range(x1, x2 + 1):
-            if 0 <= x <= img.shape[0] - 1 and 0 <= y_min <= img.shape[1] - 1:
-                img[x, y_min] = interpolate_color(x1, x2, x, C1, C2)
+        x_start, x_end = clip_span(x1, x2, x_high, x_low)
+        if x_start <= x_end and y_low <= y_min <= y_high - 1:
+            count('pixels_written', x_end - x_start + 1)
+            interpolate_color_span(x1, x2, x_start, x_end, C1, C2, out=img[x_start:x_end + 1, y_min])
 
     # Begin Scanline Algorithm
     for y in range(y_min + 1, y_max + 1):
+        if y >= y_high:
+            break
         if edges[active_edges[0]].slope != float('inf'):
             x1 = x1 + 1 / edges[active_edges[0]].slope
         if edges[active_edges[1]].slope != float('inf'):
@@ -106,16 +110,16 @@ def shade_gouraud(lighting, vertice_positions, vertice_normal_vectors, vertice_c
         color_B = interpolate_color(edges[active_edges[1]].y_min, edges[active_edges[1]].y_max, y,
                                     edges[active_edges[1]].colors[0, :], edges[active_edges[1]].colors[1, :])
 
-        for x in range(int(min(x1, x2)), int(max(x1, x2)) + 1):
-            if 0 <= x <= img.shape[0] - 1 and 0 <= y <= img.shape[1] - 1:
-                img[int(math.floor(x + 0.5)), y] = interpolate_color(int(x1), int(x2), int(math.floor(x + 0.5)),
-                                                                     color_A, color_B)
+        x_start, x_end = clip_span(int(min(x1, x2)), int(max(x1, x2)), x_high, x_low)
+        if x_start <= x_end and y_low <= y <= y_high - 1:
+            count('pixels_written', x_end - x_start + 1)
+            interpolate_color_span(int(x1), int(x2), x_start, x_end, color_A, color_B, out=img[x_start:x_end + 1, y])
         active_edges = update_active_edges(edges, active_edges, y)
     return img
 
 
 def shade_phong(lighting, vertice_positions, vertice_normal_vectors, vertice_colors, barycentre_coords, cam_pos, ka, kd,
-                ks, n, light_positions, light_intensities, Ia, img):
+                ks, n, light_positions, light_intensities, Ia, img, window=None):
     """
     Fills a triangle using Phong shading. In comparison with Gouraud shading, this method also interpolates the normal vectors,
     for each point to achieve better illumination
@@ -134,11 +138,14 @@ def shade_phong(lighting, vertice_positions, vertice_normal_vectors, vertice_col
         light_intensities: a list of 3 × N vectors containing the intensities of the bright sources (corresponding to light_positions).
         Ia: the 3 × 1 vector with the components of the diffuse irradiance of the ambient radiation intensity. Each component belongs to the interval [0, 1].
         img: an image (M × N × 3 matrix) with any pre-existing triangles
+        window: an optional (x0, x1, y0, y1) tuple. Only the pixels x0 <= x < x1 and y0 <= y < y1 are drawn (and lit),
+            the whole image if not given
 
     Returns:
         A triangle filled with color
     """
 
+    x_low, x_high, y_low, y_high = (0, img.shape[0], 0, img.shape[1]) if window is None else window
     # Initialize Edge elements
     Edge1 = Edge("AB", np.array([vertice_positions[0, :], vertice_positions[1, :]]),
                  np.array([vertice_colors[0, :], vertice_colors[1, :]]),
@@ -180,7 +187,8 @@ def shade_phong(lighting, vertice_positions, vertice_normal_vectors, vertice_col
                 index = i
                 x1 = vertice_positions[i, 0]
                 x2 = x1
-        if 0 <= x1 <= img.shape[0] - 1 and 0 <= y_min <= img.shape[1] - 1:
+        if x_low <= x1 <= x_high - 1 and y_low <= y_min <= y_high - 1:
+            count('pixels_written')
             img[int(math.floor(x1 + 0.5)), int(math.floor(y_min))] = get_color(lighting, barycentre_coords,
                                                                                      vertice_normal_vectors[index, :],
                                                                                      vertice_colors[index, :],
@@ -189,15 +197,19 @@ def shade_phong(lighting, vertice_positions, vertice_normal_vectors, vertice_col
             ...
     else:
         x1, x2, C1, C2, n1, n2 = find_initial_elements(edges, active_edges)
-        for x in range(x1, x2 + 1):
-            if 0 <= x <= img.shape[0] - 1 and 0 <= y_min <= img.shape[1] - 1:
-                normal_vector = interpolate_vector(x1, x2, x, vertice_normal_vectors[n1], vertice_normal_vectors[n2])
-                color = interpolate_color(x1, x2, x, C1, C2)
-                img[x, y_min] = get_color(lighting, barycentre_coords, normal_vector, color, cam_pos,
-                                          ka, kd, ks, n, light_positions, light_intensities, Ia)
+        x_start, x_end = clip_span(x1, x2, x_high, x_low)
+        if x_start <= x_end and y_low <= y_min <= y_high - 1:
+            count('pixels_written', x_end - x_start + 1)
+            normal_vectors = interpolate_vector_span(x1, x2, x_start, x_end, vertice_normal_vectors[n1],
+                                                     vertice_normal_vectors[n2])
+            colors = interpolate_color_span(x1, x2, x_start, x_end, C1, C2)
+            img[x_start:x_end + 1, y_min] = get_colors(lighting, barycentre_coords, normal_vectors, colors, cam_pos,
+                                                       ka, kd, ks, n, light_positions, light_intensities, Ia)
 
     # Begin Scanline Algorithm
     for y in range(y_min+1, y_max + 1):
+        if y >= y_high:
+            break
         if edges[active_edges[0]].slope != 0:
             x1 = x1 + 1 / edges[active_edges[0]].slope
         if edges[active_edges[1]].slope != 0:
@@ -215,18 +227,18 @@ def shade_phong(lighting, vertice_positions, vertice_normal_vectors, vertice_col
         color_B = interpolate_color(edges[active_edges[1]].y_min, edges[active_edges[1]].y_max, y,
                                     edges[active_edges[1]].colors[0, :], edges[active_edges[1]].colors[1, :])
 
-        for x in range(int(min(x1, x2)), int(max(x1, x2)) + 1):
-            if 0 <= x <= img.shape[0] - 1 and 0 <= y <= img.shape[1] - 1:
-                color = interpolate_color(int(x1), int(x2), int(math.floor(x + 0.5)),
-                                          color_A, color_B)
-                normal_vector = interpolate_vector(x1, x2, x, normal_vector_1, normal_vector_2)
-                img[int(math.floor(x + 0.5)), y] = get_color(lighting, barycentre_coords, normal_vector, color, cam_pos,
-                                                             ka, kd, ks, n, light_positions, light_intensities, Ia)
+        x_start, x_end = clip_span(int(min(x1, x2)), int(max(x1, x2)), x_high, x_low)
+        if x_start <= x_end and y_low <= y <= y_high - 1:
+            count('pixels_written', x_end - x_start + 1)
+            colors = interpolate_color_span(int(x1), int(x2), x_start, x_end, color_A, color_B)
+            normal_vectors = interpolate_vector_span(x1, x2, x_start, x_end, normal_vector_1, normal_vector_2)
+            img[x_start:x_end + 1, y] = get_colors(lighting, barycentre_coords, normal_vectors, colors, cam_pos,
+                                                   ka, kd, ks, n, light_positions, light_intensities, Ia)
         active_edges = update_active_edges(edges, active_edges, y)
     return img
 
 
-def shade_triangle(img, verts2d, vcolors, shade_t='Flat'):
+def shade_triangle(img, verts2d, vcolors, shade_t='Flat', window=None):
     """
     Calculates color of a triange with 2 different ways. Flat mode is using the mean of the triangle vertices colors as global color
     and fills the whole triangle with that color. Gouraud shading interpolates the color vertically, and then horizontally
@@ -237,15 +249,20 @@ def shade_triangle(img, verts2d, vcolors, shade_t='Flat'):
         verts2d: 3x2 array containing the coordinates for the 3 vertices of a triangle
         vcolors: 3x3 array containing the color of the vertices in an RGB scale, ranging from [0,1]
         shade_t: the Shading mode. This can be flat(mean of color) or Gouraud(linear interpolation of color)
+        window: an optional (x0, x1, y0, y1) tuple. Only the pixels x0 <= x < x1 and y0 <= y < y1 are drawn, the whole
+            image if not given
 
     Returns:
         A triangle filled with color
     """
+    x_low, x_high, y_low, y_high = (0, img.shape[0], 0, img.shape[1]) if window is None else window
     # Check for exception
     if np.all(verts2d[:, 0] == verts2d[0, 0]) and np.all(verts2d[:, 1] == verts2d[0, 1]):
         x = verts2d[0, 0]
         y = verts2d[0, 1]
-        img[x, y] = np.mean(vcolors, axis=0)
+        if x_low <= x <= x_high - 1 and y_low <= y <= y_high - 1:
+            count('pixels_written')
+            img[x, y] = np.mean(vcolors, axis=0)
         return img
 
     if len(np.unique(verts2d, axis=0)) < 3:
@@ -287,20 +304,24 @@ def shade_triangle(img, verts2d, vcolors, shade_t='Flat'):
                 index = i
                 x1 = verts2d[i, 0]
                 x2 = x1
-        if 0 <= x1 <= img.shape[0] - 1 and 0 <= y_min <= img.shape[1] - 1:
+        if x_low <= x1 <= x_high - 1 and y_low <= y_min <= y_high - 1:
+            count('pixels_written')
             img[int(math.floor(x1 + 0.5)), int(math.floor(y_min + 0.5))] = vcolors[index, :]
     else:
         x1, x2, C1, C2, n1, n2 = find_initial_elements(edges, active_edges)
-        for x in range(x1, x2 + 1):
-            if 0 <= x <= img.shape[0] - 1 and 0 <= y_min <= img.shape[1] - 1:
-                if shade_t == 'Gouraud':
-                    img[x, y_min] = interpolate_color(x1, x2, x, C1, C2)
-                else:
-                    img[x, y_min] = np.mean(vcolors, axis=0)
+        x_start, x_end = clip_span(x1, x2, x_high, x_low)
+        if x_start <= x_end and y_low <= y_min <= y_high - 1:
+            count('pixels_written', x_end - x_start + 1)
+            if shade_t == 'Gouraud':
+                interpolate_color_span(x1, x2, x_start, x_end, C1, C2, out=img[x_start:x_end + 1, y_min])
+            else:
+                img[x_start:x_end + 1, y_min] = np.mean(vcolors, axis=0)
     # Individual cases over
 
     # Begin Scanline Algorithm
     for y in range(y_min + 1, y_max + 1):
+        if y >= y_high:
+            break
         if edges[active_edges[0]].slope != float('inf'):
             x1 = x1 + 1 / edges[active_edges[0]].slope
         if edges[active_edges[1]].slope != float('inf'):
@@ -309,12 +330,132 @@ def shade_triangle(img, verts2d, vcolors, shade_t='Flat'):
                                     edges[active_edges[0]].colors[0, :], edges[active_edges[0]].colors[1, :])
         color_B = interpolate_color(edges[active_edges[1]].y_min, edges[active_edges[1]].y_max, y,
                                     edges[active_edges[1]].colors[0, :], edges[active_edges[1]].colors[1, :])
-        for x in range(int(min(x1, x2)), int(max(x1, x2)) + 1):
-            if 0 <= x <= img.shape[0] - 1 and 0 <= y <= img.shape[1] - 1:
-                if shade_t == 'Gouraud':
-                    img[int(math.floor(x + 0.5)), y] = interpolate_color(int(x1), int(x2), int(math.floor(x + 0.5)),
-                                                                         color_A, color_B)
-                else:
-                    img[int(math.floor(x + 0.5)), y] = np.mean(vcolors, axis=0)
+        x_start, x_end = clip_span(int(min(x1, x2)), int(max(x1, x2)), x_high, x_low)
+        if x_start <= x_end and y_low <= y <= y_high - 1:
+            count('pixels_written', x_end - x_start + 1)
+            if shade_t == 'Gouraud':
+                interpolate_color_span(int(x1), int(x2), x_start, x_end, color_A, color_B,
+                                       out=img[x_start:x_end + 1, y])
+            else:
+                img[x_start:x_end + 1, y] = np.mean(vcolors, axis=0)
         active_edges = update_active_edges(edges, active_edges, y)
     return img
+
+
+def shade_fragments(lighting, shader, xs, ys, weights, vertice_normal_vectors, vertice_colors, barycentre_coords, cam_pos,
+                    ka, kd, ks, n, light_positions, light_intensities, Ia, img, verts2d=None, origin=(0, 0)):
+    """
+    Shades the pixels of a triangle that survived the depth test. Gouraud shading lights the 3 vertices and blends
+    the resulting colors, Phong shading blends the normal vectors and colors and lights every pixel
+
+    Args:
+        lighting: a variable that controls whether all the light sources in the scene will be used, or just one and which one.
+        shader: the shading method, 'Gouraud' or 'Phong'
+        xs: the first (vertical) pixel coordinate of every visible pixel
+        ys: the second (horizontal) pixel coordinate of every visible pixel
+        weights: a K x 3 matrix with the barycentric weights of every visible pixel
+        vertice_normal_vectors: a 3 × 3 matrix containing in its columns the normal vectors of the vertices of the triangle.
+        vertice_colors: a 3 × 3 matrix containing the colour components for each point of the triangle.
+        barycentre_coords: a vector of dimension 3×1 contains the barycentre of the triangle before its projection.
+        cam_pos: a 3 × 1 column vector with the coordinates of the observer (i.e. the camera).
+        ka: the factor of diffused light from the environment
+        kd: the diffuse reflection coefficient of the Phong model
+        ks: the specular reflection coefficient of the Phong model
+        n: the Phong coefficient
+        light_positions: a list of 3 × N vectors containing the components of the position of the light sources.
+        light_intensities: a list of 3 × N vectors containing the intensities of the bright sources (corresponding to light_positions).
+        Ia: the 3 × 1 vector with the components of the diffuse irradiance of the ambient radiation intensity. Each component belongs to the interval [0, 1].
+        img: an image (M × N × 3 matrix) with any pre-existing triangles
+        verts2d: the optional 3 × 2 pixel coordinates of the vertices. If given, the (lit) vertex colors are
+            interpolated like the scanline shaders do (see scanline_colors) instead of blended with weights, so that
+            the pixels get the colors of shade_gouraud and shade_phong
+        origin: the image pixel of img[0, 0] when img is a window of the image verts2d is given in
+
+    Returns:
+        The image with the visible pixels of the triangle filled with color
+    """
+    if len(xs) == 0:
+        return img
+
+    if shader == 'Gouraud':
+        lit_colors = get_colors(lighting, barycentre_coords, vertice_normal_vectors, vertice_colors, cam_pos,
+                                ka, kd, ks, n, light_positions, light_intensities, Ia)
+        img[xs, ys] = _blend(lit_colors, xs, ys, weights, verts2d, origin)
+        return img
+
+    colors = _blend(vertice_colors, xs, ys, weights, verts2d, origin)
+    normal_vectors = np.dot(weights, vertice_normal_vectors)
+    lengths = np.linalg.norm(normal_vectors, axis=1, keepdims=True)
+    normal_vectors = np.divide(normal_vectors, lengths, out=np.zeros_like(normal_vectors), where=lengths > 0)
+    img[xs, ys] = get_colors(lighting, barycentre_coords, normal_vectors, colors, cam_pos,
+                             ka, kd, ks, n, light_positions, light_intensities, Ia)
+    return img
+
+
+def _blend(vertice_colors, xs, ys, weights, verts2d, origin):
+    # The colors of the fragments, like the scanline shaders interpolate them if the vertices are given
+    if verts2d is None:
+        return np.dot(weights, vertice_colors)
+    return scanline_colors(verts2d, vertice_colors, xs + origin[0], ys + origin[1])
+
+
+def shade_triangles(img, zbuf, triangles, scene, window=None):
+    """
+    Draws a sequence of triangles of an object, in the given order, with the shading method selected in the scene
+
+    Args:
+        img: an image (M × N × 3 matrix) with any pre-existing triangles
+        zbuf: an M × N depth buffer the triangles are tested against, or None to overdraw them in the given order
+        triangles: the indices of the triangles to draw, in drawing order
+        scene: a dict with the object and lighting parameters of render_object ('lighting', 'shader', 'verts',
+            'verts2d', 'depth', 'normals', 'vert_colors', 'face_indices', 'cam_pos', 'ka', 'kd', 'ks', 'n',
+            'light_positions', 'light_intensities', 'Ia') and 'lit_vert_colors', the vertex colours lit in advance
+            or None. Lit vertex colours are blended (or averaged if the shader is 'Flat') without any lighting
+        window: an optional (x0, x1, y0, y1) tuple, e.g. a screen tile. The fragments of every triangle are clipped to
+            the pixels x0 <= x < x1 and y0 <= y < y1 before they are shaded, and no other pixel is written
+
+    Returns:
+        The image with the triangles drawn on it
+    """
+    lighting, shader = scene['lighting'], scene['shader']
+    verts2d, depth, face_indices = scene['verts2d'], scene['depth'], scene['face_indices']
+    lit_vert_colors = scene['lit_vert_colors']
+    lighting_args = (scene['cam_pos'], scene['ka'], scene['kd'], scene['ks'], scene['n'], scene['light_positions'],
+                     scene['light_intensities'], scene['Ia'])
+    vertex_shader = 'Flat' if shader == 'Flat' else 'Gouraud'
+    if window is None:
+        window = (0, img.shape[0], 0, img.shape[1])
+    x0, x1, y0, y1 = window
+    if zbuf is not None:
+        # Only the part of the buffers inside the window is rasterized, in the coordinates of the whole image
+        zbuf_window, img_window = zbuf[x0:x1, y0:y1], img[x0:x1, y0:y1]
+
+    # Gather the vertices, colours and normal vectors of every triangle once, in drawing order
+    triangle_faces = face_indices[np.asarray(triangles, dtype=int)]
+    triangles_verts2d = verts2d[triangle_faces]
+    triangles_depth = depth[triangle_faces]
+    triangles_vcolors = (scene['vert_colors'] if lit_vert_colors is None else lit_vert_colors)[triangle_faces]
+    if lit_vert_colors is None:
+        triangles_normals = scene['normals'][triangle_faces]
+        barycentres = np.mean(scene['verts'][triangle_faces], axis=1)
+
+    for i in range(len(triangle_faces)):
+        if zbuf is not None:
+            xs, ys, weights = depth_tested_fragments(zbuf_window, triangles_verts2d[i], triangles_depth[i], (x0, y0))
+            if len(xs) == 0:
+                continue
+            # The colors are interpolated like the scanline shaders do, in image coordinates
+            if lit_vert_colors is None:
+                shade_fragments(lighting, shader, xs, ys, weights, triangles_normals[i], triangles_vcolors[i],
+                                barycentres[i], *lighting_args, img_window, triangles_verts2d[i], (x0, y0))
+            elif vertex_shader == 'Gouraud':
+                img_window[xs, ys] = scanline_colors(triangles_verts2d[i], triangles_vcolors[i], xs + x0, ys + y0)
+            else:
+                img_window[xs, ys] = np.mean(triangles_vcolors[i], axis=0)
+        elif lit_vert_colors is not None:
+            img = shade_triangle(img, triangles_verts2d[i], triangles_vcolors[i], vertex_shader, window)
+        else:
+            shade = shade_gouraud if shader == 'Gouraud' else shade_phong
+            img = shade(lighting, triangles_verts2d[i], triangles_normals[i], triangles_vcolors[i], barycentres[i],
+                        *lighting_args, img, window)
+    return img
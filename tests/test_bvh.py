@@ -0,0 +1,68 @@
+import os
+import numpy as np
+from rendering.bvh import BVH, _ray_triangles
+from rendering.helpers import rasterize
+from rendering.scene import load_scene
+from transformations.projection import camera_axes, project_cam_lookat
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def scene():
+    data = load_scene(SCENE)
+    verts, faces = np.array(data['verts'], dtype=float), np.array(data['face_indices'])
+    return data, verts, faces, BVH(verts, faces)
+
+
+def test_frustum_faces_keep_every_visible_triangle():
+    data, verts, faces, bvh = scene()
+    eye, lookat, up = data['cam_eye'], np.asarray(data['cam_lookat'], dtype=float), data['cam_up']
+    c_x, c_y, _ = camera_axes(eye, lookat, up)
+    # The whole object, a close-up, and views panned half off the object and past the camera's side of it
+    for target, focal in [(lookat, 70), (lookat, 250), (lookat + 3 * c_x, 150), (lookat - 4 * c_y, 150)]:
+        kept = bvh.frustum_faces(eye, target, up, focal, data['H'], data['W'])
+        # Brute force: the triangles with a vertex in front of the camera and inside the image
+        projected, depth = project_cam_lookat(eye, target, up, verts, focal)
+        inside = (depth > 0) & (np.abs(projected[:, 0]) <= data['H'] / 2) & (np.abs(projected[:, 1]) <= data['W'] / 2)
+        visible = np.flatnonzero(np.any(inside[faces], axis=1))
+        assert np.all(np.isin(visible, kept))
+        assert np.array_equal(kept, np.unique(kept))
+        if focal > 70:
+            assert len(kept) < len(faces)
+
+
+def test_pick_matches_brute_force():
+    data, verts, faces, bvh = scene()
+    camera = (data['cam_eye'], data['cam_lookat'], data['cam_up'])
+    c_x, c_y, c_z = camera_axes(*camera)
+    triangles = verts[faces]
+    hits = 0
+    for x in range(0, 32, 3):
+        for y in range(0, 32, 3):
+            face, depth = bvh.pick(x, y, *camera, 70, 32, 32, data['H'], data['W'])
+            x_projected = (x + 0.5) * data['H'] / 32 - data['H'] / 2
+            y_projected = data['W'] / 2 - (y + 0.5) * data['W'] / 32
+            direction = c_z - (x_projected / 70) * c_y - (y_projected / 70) * c_x
+            t, hit = _ray_triangles(np.asarray(data['cam_eye'], dtype=float), direction, triangles)
+            if not np.any(hit):
+                assert (face, depth) == (-1, np.inf)
+                continue
+            hits += 1
+            expected = np.min(t[hit])
+            assert np.isclose(depth, expected, rtol=1e-12)
+            assert hit[face] and np.isclose(t[face], expected, rtol=1e-12)
+    assert hits > 10
+
+
+def test_picked_point_projects_to_the_pixel():
+    data, verts, faces, bvh = scene()
+    camera = (data['cam_eye'], data['cam_lookat'], data['cam_up'])
+    c_x, c_y, c_z = camera_axes(*camera)
+    face, depth = bvh.pick(10, 16, *camera, 70, 32, 32, data['H'], data['W'])
+    assert face >= 0
+    x_projected = 10.5 * data['H'] / 32 - data['H'] / 2
+    y_projected = data['W'] / 2 - 16.5 * data['W'] / 32
+    point = data['cam_eye'] + depth * (c_z - (x_projected / 70) * c_y - (y_projected / 70) * c_x)
+    projected, point_depth = project_cam_lookat(*camera, point[np.newaxis], 70)
+    assert np.isclose(point_depth[0], depth)
+    assert np.allclose(rasterize(projected, 32, 32, data['H'], data['W'], subpixel=True), [[10, 16]], atol=1e-9)
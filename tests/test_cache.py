@@ -0,0 +1,86 @@
+import os
+import numpy as np
+import pytest
+from rendering.cache import LightingCache, state_key
+from rendering.helpers import get_colors
+from rendering.render import render_object
+from rendering.scene import load_scene
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def points(K, seed=0):
+    # K random points with unit normal vectors and colours
+    rng = np.random.default_rng(seed)
+    normals = rng.normal(size=(K, 3))
+    return rng.normal(size=(K, 3)), normals / np.linalg.norm(normals, axis=1, keepdims=True), rng.random((K, 3))
+
+
+LIGHTS = dict(light_positions=np.array([[5.0, 10.0, 3.0], [-4.0, 2.0, 8.0]]),
+              light_intensities=np.array([[1.0, 0.9, 0.8], [0.3, 0.3, 0.5]]), Ia=np.array([0.2, 0.2, 0.2]))
+
+
+def test_cached_colors_match_get_colors():
+    P, normals, colors = points(100)
+    cache = LightingCache()
+    for lighting in ['Ambient', 'Diffuse', 'Specular', 'All']:
+        expected = get_colors(lighting, P, normals, colors, [0, 0, 10], 0.2, 0.6, 0.4, 8, **LIGHTS)
+        assert np.allclose(cache.get_colors(lighting, P, normals, colors, [0, 0, 10], 0.2, 0.6, 0.4, 8, **LIGHTS),
+                           expected, rtol=0, atol=1e-12)
+    # 'All' reused the terms of 'Diffuse' and 'Specular' and the ambient term is never stored
+    assert (cache.misses, cache.hits, len(cache)) == (2, 2, 2)
+
+    # New colours and coefficients reuse the terms, new light sources or points do not
+    cache.get_colors('All', P, normals, colors[::-1], [0, 0, 10], 0.1, 0.3, 0.9, 8, **LIGHTS)
+    assert (cache.misses, cache.hits) == (2, 4)
+    cache.get_colors('Specular', P, normals, colors, [0, 0, 10], 0.2, 0.6, 0.4, 16, **LIGHTS)
+    cache.get_colors('Diffuse', P + 1, normals, colors, [0, 0, 10], 0.2, 0.6, 0.4, 8, **LIGHTS)
+    assert (cache.misses, cache.hits, len(cache)) == (4, 4, 4)
+
+    cache.clear()
+    assert (len(cache), cache.nbytes) == (0, 0)
+
+
+def test_least_recently_used_terms_are_dropped():
+    entry = np.zeros((10, 3)).nbytes
+    cache = LightingCache(max_bytes=2 * entry)
+    compute = lambda: np.zeros((10, 3))
+    cache.cached('a', compute)
+    cache.cached('b', compute)
+    cache.cached('a', compute)
+    cache.cached('c', compute)
+    # 'b' was used least recently
+    assert list(cache._entries) == ['a', 'c']
+    assert (cache.nbytes, cache.hits, cache.misses) == (2 * entry, 1, 3)
+
+    # A term larger than the cache is returned without being stored
+    large = cache.cached('d', lambda: np.zeros((100, 3)))
+    assert large.shape == (100, 3) and 'd' not in cache._entries and len(cache) == 2
+
+    value = cache.cached('a', compute)
+    with pytest.raises(ValueError):
+        value[0, 0] = 1
+
+
+def test_state_key():
+    values = np.arange(6, dtype=float)
+    key = state_key(values, 2)
+    assert key == state_key(values.copy(), 2)
+    assert key != state_key(values.reshape(2, 3), 2)
+    assert key != state_key(values.astype(np.float32), 2)
+    assert key != state_key(values + 1e-12, 2)
+    assert key != state_key(values, 3)
+
+
+def test_render_object_with_a_cache():
+    data = load_scene(SCENE)
+    cache = LightingCache()
+    for shader, options in [('Gouraud', dict(vertex_lighting=True)), ('Phong', dict(deferred=True))]:
+        for lighting in ['Diffuse', 'All']:
+            images = [render_object(lighting, shader, 70, data['cam_eye'], data['cam_lookat'], data['cam_up'],
+                                    data['bg_color'], 64, 64, data['H'], data['W'], data['verts'],
+                                    data['vertex_colors'], data['face_indices'], data['ka'], data['kd'], data['ks'],
+                                    data['n'], data['light_positions'], data['light_intensities'], data['Ia'],
+                                    lighting_cache=lighting_cache, **options) for lighting_cache in [None, cache]]
+            assert np.allclose(images[0], images[1], rtol=0, atol=1e-12)
+    assert cache.hits > 0
@@ -0,0 +1,44 @@
+import numpy as np
+from benchmarks.meshes import sphere, camera_for
+from rendering.culling import cull_triangles
+from rendering.helpers import rasterize
+from rendering.render import render_object
+from transformations.projection import project_cam_lookat
+
+EYE, LOOKAT, UP = np.array([0.0, 0.0, -10.0]), np.zeros(3), np.array([0.0, 1.0, 0.0])
+
+
+def test_cull_counts():
+    # Counter-clockwise as seen from the camera
+    front = np.array([[0.0, 1.0, 0.0], [1.0, -1.0, 0.0], [-1.0, -1.0, 0.0]])
+    triangles = [front, front[::-1], front + [0, 0, -20], front + [100, 0, 0], front[::-1] + [0, 0, -20]]
+    verts = np.concatenate(triangles)
+    faces = np.arange(len(verts)).reshape(-1, 3)
+    verts2d, depth = project_cam_lookat(EYE, LOOKAT, UP, verts, 1)
+    verts2d = rasterize(verts2d, 64, 64, 1, 1)
+
+    visible, culled = cull_triangles(verts, verts2d, depth, faces, EYE, 64, 64)
+    assert visible.tolist() == [0]
+    # A triangle is counted once, for the first reason it is culled for
+    assert culled == {'behind': 2, 'offscreen': 1, 'backface': 1}
+    visible, culled = cull_triangles(verts, verts2d, depth, faces, EYE, 64, 64, backface=False)
+    assert visible.tolist() == [0, 1]
+    assert culled == {'behind': 2, 'offscreen': 1, 'backface': 0}
+
+
+def test_culling_keeps_the_image_of_a_closed_mesh():
+    verts, faces, colors = sphere(2000)
+    eye, lookat, up = camera_for(verts, 0.6)
+    arguments = dict(focal=70, eye=eye, lookat=lookat, up=up, bg_color=np.ones(3), M=128, N=128, H=15, W=15,
+                     verts=verts, vert_colors=colors, face_indices=faces, ka=0.2, kd=0.6, ks=0.3, n=10,
+                     light_positions=np.array([eye]), light_intensities=np.ones((1, 3)), Ia=np.ones(3))
+    stats = {}
+    img = render_object('All', 'Gouraud', **arguments, cull=True, stats=stats)
+    culled = stats['culled']
+    assert culled['behind'] == 0 and culled['offscreen'] == 0
+    assert 0.4 * len(faces) < culled['backface'] < 0.6 * len(faces)
+    expected = render_object('All', 'Gouraud', **arguments)
+    covered = np.any(expected != 1, axis=2)
+    assert np.array_equal(np.any(img != 1, axis=2), covered)
+    # The scanline leaves a few pixels uncovered along shared edges, through which the back of the sphere shows
+    assert np.count_nonzero(np.any(img != expected, axis=2)) < 0.01 * np.count_nonzero(covered)
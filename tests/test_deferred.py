@@ -0,0 +1,52 @@
+import os
+import numpy as np
+from rendering.deferred import rasterize_gbuffer, shade_gbuffer
+from rendering.helpers import calculate_normals, get_color, rasterize
+from rendering.render import render_object
+from rendering.scene import load_scene
+from transformations.projection import project_cam_lookat
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def render(lighting, **options):
+    data = load_scene(SCENE)
+    return render_object(lighting, 'Phong', 70, data['cam_eye'], data['cam_lookat'], data['cam_up'], data['bg_color'],
+                         128, 128, data['H'], data['W'], data['verts'], data['vertex_colors'], data['face_indices'],
+                         data['ka'], data['kd'], data['ks'], data['n'], data['light_positions'],
+                         data['light_intensities'], data['Ia'], depth_test=True, **options)
+
+
+def test_deferred_covers_the_pixels_of_forward_phong():
+    img, zbuf = render('Ambient', deferred=True)
+    expected, expected_zbuf = render('Ambient')
+    assert np.array_equal(zbuf, expected_zbuf)
+    assert np.array_equal(img, expected)
+    assert np.count_nonzero(np.isfinite(zbuf)) > 5000
+
+
+def test_deferred_matches_forward_phong():
+    for lighting in ['Diffuse', 'Specular', 'All']:
+        img, zbuf = render(lighting, deferred=True)
+        expected, _ = render(lighting)
+        covered = np.isfinite(zbuf)
+        assert np.array_equal(img[~covered], expected[~covered])
+        # Forward Phong lights every pixel at the barycentre of its triangle, deferred shading at the pixel itself
+        differences = np.max(np.abs(img - expected), axis=2)[covered]
+        assert np.mean(differences) < 0.01
+        assert np.percentile(differences, 99) < 0.05
+
+
+def test_gbuffer_pixels_are_lit_like_get_color():
+    data = load_scene(SCENE)
+    verts, faces, colors = np.asarray(data['verts']), np.asarray(data['face_indices']), data['vertex_colors']
+    verts2d, depth = project_cam_lookat(data['cam_eye'], data['cam_lookat'], data['cam_up'], verts, 70)
+    verts2d = rasterize(verts2d, 64, 64, data['H'], data['W']).astype(int)
+    buffers = rasterize_gbuffer(verts2d, depth, verts, calculate_normals(verts, faces), colors, faces, 64, 64)
+    lighting = (data['cam_eye'], data['ka'], data['kd'], data['ks'], data['n'], data['light_positions'],
+                data['light_intensities'], data['Ia'])
+    img = shade_gbuffer('All', *buffers, *lighting, np.zeros((64, 64, 3)))
+    position, normal, albedo, zbuf = buffers
+    for x, y in np.argwhere(np.isfinite(zbuf))[::50]:
+        expected = get_color('All', position[x, y], normal[x, y], albedo[x, y], *lighting)
+        assert np.allclose(img[x, y], expected, rtol=0, atol=1e-12)
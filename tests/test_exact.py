@@ -0,0 +1,65 @@
+import numpy as np
+from rendering.helpers import rasterize
+from rendering.rasterizer import exact_fragments, fill_triangle_exact
+from transformations.projection import project_cam_lookat
+
+RNG = np.random.default_rng(0)
+
+
+def jittered_grid(M, N, cells):
+    # A mesh of random sub-pixel triangles covering a little more than an M x N image, with random diagonals
+    xs = np.linspace(-1.5, M + 0.5, cells + 1)
+    ys = np.linspace(-1.5, N + 0.5, cells + 1)
+    points = np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=2)
+    points[1:-1, 1:-1] += RNG.uniform(-0.3, 0.3, (cells - 1, cells - 1, 2)) * [xs[1] - xs[0], ys[1] - ys[0]]
+    index = np.arange((cells + 1) ** 2).reshape(cells + 1, cells + 1)
+    a, b, c, d = index[:-1, :-1].ravel(), index[1:, :-1].ravel(), index[1:, 1:].ravel(), index[:-1, 1:].ravel()
+    flip = RNG.random(len(a)) < 0.5
+    faces = np.concatenate([np.where(flip[:, None], np.stack([a, b, c], 1), np.stack([a, b, d], 1)),
+                            np.where(flip[:, None], np.stack([a, c, d], 1), np.stack([b, c, d], 1))])
+    return points.reshape(-1, 2), faces
+
+
+def test_shared_edges_are_covered_exactly_once():
+    for M, N, cells in [(32, 32, 12), (40, 24, 30)]:
+        verts2d, faces = jittered_grid(M, N, cells)
+        coverage = np.zeros((M, N), dtype=int)
+        for face in faces:
+            xs, ys, _, _ = exact_fragments(verts2d[face], (M, N, 3))
+            np.add.at(coverage, (xs, ys), 1)
+        assert np.all(coverage == 1)
+
+
+def test_weights_are_perspective_correct():
+    verts = np.array([[-2.0, -1.0, 0.0], [3.0, -2.0, -6.0], [0.5, 3.0, 2.0]])
+    eye, lookat, up = np.array([0.0, 0.0, 8.0]), np.zeros(3), np.array([0.0, 1.0, 0.0])
+    projected, depth = project_cam_lookat(eye, lookat, up, verts, 2)
+    verts2d = rasterize(projected, 64, 64, 4, 4, subpixel=True)
+    xs, ys, weights, z = exact_fragments(verts2d, (64, 64, 3), depth)
+    assert len(xs) > 100 and np.allclose(np.sum(weights, axis=1), 1)
+    # The surface point interpolated for a pixel lies on the ray through the centre of that pixel, at depth z
+    points = np.dot(weights, verts)
+    pixels, point_depth = project_cam_lookat(eye, lookat, up, points, 2)
+    pixels = rasterize(pixels, 64, 64, 4, 4, subpixel=True)
+    assert np.allclose(pixels, np.stack([xs, ys], axis=1), atol=0.02)
+    assert np.allclose(point_depth, z)
+
+    # Without the depth, the weights are the screen-space ones, and with equal depths the two agree
+    screen_xs, screen_ys, screen_weights, _ = exact_fragments(verts2d, (64, 64, 3))
+    assert np.array_equal(screen_xs, xs) and np.array_equal(screen_ys, ys)
+    _, _, flat_weights, flat_z = exact_fragments(verts2d, (64, 64, 3), np.full(3, 5.0))
+    assert np.allclose(flat_weights, screen_weights) and np.allclose(flat_z, 5)
+
+
+def test_fill_triangle_exact_depth_test():
+    img = np.zeros((16, 16, 3))
+    zbuf = np.full((16, 16), np.inf)
+    verts2d = np.array([[1.2, 1.7], [14.6, 3.1], [6.3, 13.8]])
+    fill_triangle_exact(img, verts2d, np.eye(3), np.array([2.0, 2.0, 2.0]), 'Flat', zbuf)
+    covered = np.isfinite(zbuf)
+    assert np.allclose(img[covered], 1 / 3) and not np.any(img[~covered])
+    # The same triangle further away is hidden, closer it is drawn over the first one
+    fill_triangle_exact(img, verts2d, np.zeros((3, 3)), np.array([3.0, 3.0, 3.0]), 'Flat', zbuf)
+    assert np.allclose(img[covered], 1 / 3)
+    fill_triangle_exact(img, verts2d, np.ones((3, 3)), np.array([1.0, 1.0, 1.0]), 'Gouraud', zbuf)
+    assert np.allclose(img[covered], 1) and np.allclose(zbuf[covered], 1)
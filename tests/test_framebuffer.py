@@ -0,0 +1,44 @@
+import os
+import numpy as np
+import pytest
+from rendering.framebuffer import Framebuffer, get_framebuffer
+from rendering.render import render_object, render_object_base
+from rendering.scene import load_scene
+
+MATERIALS = os.path.join(os.path.dirname(__file__), '..', 'materials')
+
+
+def test_framebuffer_of_another_type_is_not_reused():
+    framebuffer = Framebuffer(4, 4)
+    assert get_framebuffer(framebuffer, 4, 4, np.float32, False, None) is framebuffer
+    with pytest.raises(AssertionError):
+        get_framebuffer(framebuffer, 4, 4, np.float64, False, None)
+
+
+def test_render_object_jit_draws_into_the_framebuffer():
+    data = load_scene(os.path.join(MATERIALS, 'hw3.json'))
+    arguments = dict(focal=70, eye=data['cam_eye'], lookat=data['cam_lookat'], up=data['cam_up'],
+                     bg_color=data['bg_color'], M=64, N=64, H=data['H'], W=data['W'], verts=np.array(data['verts']),
+                     vert_colors=np.array(data['vertex_colors']), face_indices=np.array(data['face_indices']),
+                     ka=data['ka'], kd=data['kd'], ks=data['ks'], n=data['n'], light_positions=data['light_positions'],
+                     light_intensities=data['light_intensities'], Ia=data['Ia'])
+    framebuffer = Framebuffer(64, 64, np.float64)
+    for shader in ['Gouraud', 'Phong']:
+        expected = render_object('All', shader, **arguments)
+        img = render_object('All', shader, **arguments, backend='jit', framebuffer=framebuffer)
+        assert img is framebuffer.color
+        assert np.allclose(img, expected, atol=1e-6)
+    # render_object shades in double precision
+    with pytest.raises(AssertionError):
+        render_object('All', 'Gouraud', **arguments, backend='jit', framebuffer=Framebuffer(64, 64))
+
+
+def test_render_object_base_jit_draws_into_the_framebuffer():
+    data = load_scene(os.path.join(MATERIALS, 'hw1.json'))
+    verts2d, faces = np.array(data['verts2d']).astype(int), np.array(data['faces'])
+    vcolors, depth = np.array(data['vcolors']), np.array(data['depth'])
+    framebuffer = Framebuffer(512, 512)
+    expected = render_object_base(verts2d, faces, vcolors, depth, 'Gouraud')
+    img = render_object_base(verts2d, faces, vcolors, depth, 'Gouraud', 'jit', framebuffer=framebuffer)
+    assert img is framebuffer.color
+    assert np.allclose(img, expected, atol=1e-6)
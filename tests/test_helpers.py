@@ -0,0 +1,50 @@
+import numpy as np
+from rendering.helpers import clip_span, interpolate_color, interpolate_color_span, interpolate_vector, \
+    interpolate_vector_span
+
+RNG = np.random.default_rng(0)
+
+
+def spans():
+    # Random edges and spans, including spans reaching past the edge ends and edges shorter than the tolerance
+    for _ in range(200):
+        x1, x2 = RNG.uniform(-20, 60, 2)
+        if RNG.random() < 0.1:
+            x2 = x1 + 1e-4
+        x_start = int(RNG.integers(-10, 40))
+        yield x1, x2, x_start, x_start + int(RNG.integers(0, 30))
+
+
+def test_color_span_matches_interpolate_color():
+    for x1, x2, x_start, x_end in spans():
+        C1, C2 = RNG.uniform(-0.2, 1, 3), RNG.uniform(-0.2, 1, 3)
+        expected = [interpolate_color(x1, x2, x, C1, C2) for x in range(x_start, x_end + 1)]
+        assert np.array_equal(interpolate_color_span(x1, x2, x_start, x_end, C1, C2), expected)
+
+
+def test_vector_span_matches_interpolate_vector():
+    for x1, x2, x_start, x_end in spans():
+        vector1, vector2 = RNG.normal(size=3), RNG.normal(size=3)
+        vector1 /= np.linalg.norm(vector1)
+        vector2 /= np.linalg.norm(vector2)
+        expected = [interpolate_vector(x1, x2, x, vector1, vector2) for x in range(x_start, x_end + 1)]
+        assert np.allclose(interpolate_vector_span(x1, x2, x_start, x_end, vector1, vector2), expected, rtol=0,
+                           atol=1e-12)
+
+
+def test_spans_are_written_in_place():
+    img = np.zeros((16, 8, 3))
+    line = img[3:11, 5]
+    assert interpolate_color_span(2.0, 12.0, 3, 10, np.zeros(3), np.ones(3), out=line) is line
+    assert np.allclose(img[3:11, 5, 0], np.arange(3, 11) / 10 - 0.2)
+    assert np.count_nonzero(img) == 3 * 8
+    out = np.empty((4, 3))
+    assert interpolate_vector_span(0.0, 3.0, 0, 3, np.array([1.0, 0, 0]), np.array([0, 1.0, 0]), out=out) is out
+    assert np.allclose(np.linalg.norm(out, axis=1), 1)
+
+
+def test_clip_span():
+    assert clip_span(-3.7, 20.2, 16) == (0, 15)
+    assert clip_span(2, 9, 16, first=4) == (4, 9)
+    start, end = clip_span(18, 25, 16)
+    assert start > end
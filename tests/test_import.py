@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+from benchmarks.bench_import import MODULES, cold_import
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def loaded_modules(code):
+    # The names in sys.modules after running code in a fresh interpreter
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get('PYTHONPATH', '')]))
+    output = subprocess.run([sys.executable, '-c', code + '\nimport sys\nprint(" ".join(sys.modules))'], env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+def test_package_import_is_lazy():
+    modules = loaded_modules('import rendering')
+    assert 'rendering' in modules
+    assert not [name for name in modules if name.startswith('rendering.')]
+    assert not [name for name in modules if name.split('.')[0] in ['numba', 'llvmlite', 'matplotlib', 'cv2']]
+
+
+def test_submodules_load_on_first_use():
+    modules = loaded_modules('import rendering\nrendering.scene')
+    assert 'rendering.scene' in modules
+    assert 'rendering.render' not in modules
+
+
+def test_core_modules_skip_heavy_dependencies():
+    for module in MODULES:
+        seconds, loaded = cold_import(module, repeat=1)
+        assert not loaded, (module, loaded)
+        # A loose bound, an import slower than this loads far more than it needs
+        assert seconds < 5, (module, seconds)
@@ -0,0 +1,33 @@
+import os
+import numpy as np
+from rendering.jit import fill_triangles_compiled
+from rendering.render import render_object_base
+from rendering.scene import load_scene
+from rendering.shade import shade_triangle
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw1.json')
+
+
+def test_compiled_points_match_python_off_screen():
+    # Triangles collapsed to a point, on and off a 10 × 10 image, and a triangle crossing its border
+    verts2d = np.array([[-1, 5], [5, -3], [10, 2], [3, 12], [4, 4], [8, 7], [12, 9], [6, 13]])
+    faces = np.array([[0, 0, 0], [1, 1, 1], [2, 2, 2], [3, 3, 3], [4, 4, 4], [5, 6, 7]])
+    vcolors = np.linspace(0, 1, 24).reshape(8, 3)
+    for shade_t in ['Flat', 'Gouraud']:
+        expected = np.ones((10, 10, 3))
+        for face in faces:
+            shade_triangle(expected, verts2d[face], vcolors[face], shade_t)
+        img = fill_triangles_compiled(np.ones((10, 10, 3)), verts2d, vcolors, faces, range(len(faces)), shade_t)
+        assert np.array_equal(img, expected)
+        assert np.count_nonzero(np.any(img != 1, axis=2)) > 1
+
+
+def test_compiled_matches_python_on_hw1():
+    data = load_scene(SCENE)
+    verts2d, faces = np.array(data['verts2d']).astype(int), np.array(data['faces'])
+    # In double precision, float32 arithmetic is rounded differently by numba
+    vcolors, depth = np.array(data['vcolors'], dtype=np.float64), np.array(data['depth'])
+    for shade_t in ['Flat', 'Gouraud']:
+        expected = render_object_base(verts2d, faces, vcolors, depth, shade_t, 'scanline', dtype=np.float64)
+        img = render_object_base(verts2d, faces, vcolors, depth, shade_t, 'jit', dtype=np.float64)
+        assert np.array_equal(img, expected)
@@ -0,0 +1,63 @@
+import numpy as np
+from numpy import linalg as la
+from rendering.helpers import get_color, get_colors
+from rendering.light import diffuse_light, diffuse_light_batch, specular_light, specular_light_batch
+
+RNG = np.random.default_rng(0)
+P = RNG.uniform(-1, 1, (50, 3))
+N = RNG.normal(size=(50, 3))
+N /= la.norm(N, axis=1, keepdims=True)
+COLORS = RNG.uniform(0, 1, (50, 3))
+CAM_POS = np.array([0.5, 4.0, 3.0])
+LIGHT_POSITIONS = np.array([[5.0, 5.0, 5.0], [-4.0, 3.0, 6.0], [0.0, -6.0, 2.0]])
+LIGHT_INTENSITIES = np.array([[1.0, 1.0, 1.0], [0.5, 0.2, 0.1], [0.0, 0.3, 0.9]])
+
+
+def diffuse_one(P, N, color, kd, light_position, light_intensity):
+    # The diffuse light of a single point and light source, as light.py computed it one light at a time
+    L = (P - light_position) / la.norm(P - light_position)
+    return color * light_intensity * kd * np.dot(L, N)
+
+
+def specular_one(P, N, color, cam_pos, ks, n, light_position, light_intensity):
+    # The specular light of a single point and light source, as light.py computed it one light at a time
+    V = (cam_pos - P) / la.norm(cam_pos - P)
+    L = (light_position - P) / la.norm(light_position - P)
+    return color * light_intensity * ks * np.dot(2 * N * np.dot(N, L) - L, V) ** n
+
+
+def test_batches_sum_every_light_source():
+    diffuse = diffuse_light_batch(P, N, COLORS, 0.7, LIGHT_POSITIONS, LIGHT_INTENSITIES)
+    specular = specular_light_batch(P, N, COLORS, CAM_POS, 0.4, 5, LIGHT_POSITIONS, LIGHT_INTENSITIES)
+    for k in range(len(P)):
+        expected = sum(diffuse_one(P[k], N[k], COLORS[k], 0.7, *light)
+                       for light in zip(LIGHT_POSITIONS, LIGHT_INTENSITIES))
+        assert np.allclose(diffuse[k], expected, rtol=1e-12, atol=1e-15)
+        expected = sum(specular_one(P[k], N[k], COLORS[k], CAM_POS, 0.4, 5, *light)
+                       for light in zip(LIGHT_POSITIONS, LIGHT_INTENSITIES))
+        assert np.allclose(specular[k], expected, rtol=1e-12, atol=1e-15)
+
+
+def test_single_points_match_the_batch():
+    diffuse = diffuse_light_batch(P, N, COLORS, 0.7, LIGHT_POSITIONS[:1], LIGHT_INTENSITIES[:1])
+    specular = specular_light_batch(P, N, COLORS, CAM_POS, 0.4, 5, LIGHT_POSITIONS[:1], LIGHT_INTENSITIES[:1])
+    for k in range(len(P)):
+        assert np.array_equal(diffuse_light(P[k], N[k], COLORS[k], 0.7, LIGHT_POSITIONS[0], LIGHT_INTENSITIES[0]),
+                              diffuse[k])
+        assert np.array_equal(specular_light(P[k], N[k], COLORS[k], CAM_POS, 0.4, 5, LIGHT_POSITIONS[0],
+                                             LIGHT_INTENSITIES[0]), specular[k])
+
+
+def test_get_colors_matches_get_color():
+    arguments = (CAM_POS, 0.2, 0.7, 0.4, 5, LIGHT_POSITIONS, LIGHT_INTENSITIES, np.array([0.3, 0.3, 0.3]))
+    for lighting in ['Ambient', 'Diffuse', 'Specular', 'All']:
+        colors = get_colors(lighting, P, N, COLORS, *arguments)
+        for k in range(len(P)):
+            assert np.allclose(colors[k], get_color(lighting, P[k], N[k], COLORS[k], *arguments), rtol=1e-12,
+                               atol=1e-15)
+        # A single point shared by every normal vector, as the scanline shaders light a triangle at its barycentre
+        shared = get_colors(lighting, P[0], N, COLORS, *arguments)
+        assert np.allclose(shared, get_colors(lighting, np.tile(P[0], (len(N), 1)), N, COLORS, *arguments))
+    assert np.allclose(get_colors('All', P, N, COLORS, *arguments),
+                       0.2 * 0.3 + diffuse_light_batch(P, N, COLORS, 0.7, LIGHT_POSITIONS, LIGHT_INTENSITIES)
+                       + specular_light_batch(P, N, COLORS, CAM_POS, 0.4, 5, LIGHT_POSITIONS, LIGHT_INTENSITIES))
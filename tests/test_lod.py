@@ -0,0 +1,53 @@
+import numpy as np
+from benchmarks.meshes import sphere, terrain
+from rendering.lod import build_lod_chain, select_lod, simplify
+
+
+def edge_counts(faces):
+    # How many faces share every edge
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    return np.unique(edges, axis=0, return_counts=True)[1]
+
+
+def closed_sphere(triangles):
+    # The sphere of the benchmarks with the copies of the vertices along its seam and on its poles merged
+    verts, faces, colors = sphere(triangles)
+    _, first, merged = np.unique(np.round(verts, 9), axis=0, return_index=True, return_inverse=True)
+    faces = merged.ravel()[faces]
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    return verts[first], faces, colors[first]
+
+
+def test_simplify_keeps_a_closed_mesh_manifold():
+    verts, faces, colors = closed_sphere(2000)
+    assert np.all(edge_counts(faces) == 2)
+    new_verts, new_colors, new_faces = simplify(verts, faces, colors, 500)
+    assert len(new_faces) <= 500 + 1
+    # Every edge still joins exactly two faces, no face is degenerate and every vertex is used
+    assert np.all(edge_counts(new_faces) == 2)
+    assert np.all(new_faces[:, 0] != new_faces[:, 1]) and np.all(new_faces[:, 1] != new_faces[:, 2])
+    assert np.all(new_faces[:, 0] != new_faces[:, 2])
+    assert np.array_equal(np.unique(new_faces), np.arange(len(new_verts)))
+    assert len(new_colors) == len(new_verts)
+    # The surface stays close to the sphere
+    assert np.allclose(np.linalg.norm(new_verts, axis=1), 1, atol=0.1)
+
+
+def test_simplify_keeps_the_boundary_in_place():
+    verts, faces, colors = terrain(2000)
+    new_verts, _, new_faces = simplify(verts, faces, colors, 1000)
+    assert len(new_faces) < len(faces)
+    assert np.all(edge_counts(new_faces) <= 2)
+    low, high = verts[:, :2].min(axis=0), verts[:, :2].max(axis=0)
+    assert np.allclose(new_verts[:, :2].min(axis=0), low) and np.allclose(new_verts[:, :2].max(axis=0), high)
+
+
+def test_lod_chain_halves_the_faces():
+    verts, faces, colors = closed_sphere(2000)
+    levels = build_lod_chain(verts, faces, colors)
+    counts = [len(level[2]) for level in levels]
+    assert counts[0] == len(faces) and counts[-1] >= 64
+    assert all(0.4 * before <= after <= 0.6 * before for before, after in zip(counts, counts[1:]))
+    assert select_lod(counts, 10 ** 6) == 0
+    assert select_lod(counts, counts[2]) == 2
+    assert select_lod(counts, 1) == len(counts) - 1
@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pytest
+from rendering.mesh import Mesh
+from rendering.retained import RetainedRenderer
+from rendering.scene import load_scene
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def test_mesh_copies_its_arrays():
+    verts = np.zeros((3, 3), dtype=np.float32)
+    colors = np.zeros((3, 3), dtype=np.float32)
+    mesh = Mesh(verts, np.array([[0, 1, 2]], dtype=np.int32), colors)
+    mesh.update_verts([0], [1, 2, 3])
+    mesh.update_colors([1], [1, 1, 1])
+    assert mesh.verts is not verts
+    assert not np.any(verts) and not np.any(colors)
+
+
+def test_mesh_arrays_are_read_only():
+    mesh = Mesh(np.eye(3), np.array([[0, 1, 2]]))
+    normals = mesh.normals
+    for array in [mesh.verts, mesh.faces, mesh.colors, *mesh.arrays()]:
+        with pytest.raises(ValueError):
+            array[0] = 0
+    assert mesh.normals is normals
+    mesh.update_verts([0], [0, 0, 0])
+    assert np.array_equal(mesh.verts[0], [0, 0, 0])
+    assert mesh.normals is not normals
+
+
+def test_mesh_from_load_scene_can_be_updated():
+    data = load_scene(SCENE)
+    mesh = Mesh(data['verts'], data['face_indices'], data['vertex_colors'])
+    original = np.array(data['verts'][0])
+    mesh.update_verts([0], original + 1)
+    mesh.update_colors([0], [1, 0, 0])
+    assert np.allclose(mesh.verts[0], original + 1)
+    assert np.array_equal(data['verts'][0], original)
+
+
+def test_retained_update_verts_on_loaded_scene():
+    data = load_scene(SCENE)
+    camera = (70, data['cam_eye'], data['cam_lookat'], data['cam_up'], 64, 64, data['H'], data['W'], data['ka'],
+              data['kd'], data['ks'], data['n'], data['light_positions'], data['light_intensities'], data['Ia'])
+    mesh = Mesh(data['verts'], data['face_indices'], data['vertex_colors'])
+    renderer = RetainedRenderer(mesh, 'All', *camera)
+    vertices = mesh.faces[renderer.face_id[32, 32]]
+    renderer.update_verts(vertices, mesh.verts[vertices] * 1.2)
+    assert renderer.dirty
+
+    expected = RetainedRenderer(Mesh(mesh.verts, mesh.faces, mesh.colors), 'All', *camera)
+    assert np.allclose(renderer.img, expected.img)
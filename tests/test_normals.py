@@ -0,0 +1,58 @@
+import os
+import numpy as np
+from numpy import linalg as la
+from benchmarks.meshes import sphere
+from rendering.helpers import accumulate_normals, calculate_normals
+from rendering.scene import load_scene
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def loop_normals(vertices, face_indices, weighting=None):
+    # One triangle at a time, like calculate_normals did before it was vectorized
+    N_vectors = np.zeros(vertices.shape)
+    for face_index in face_indices:
+        triangle = vertices[face_index]
+        side_AB, side_AC = triangle[0] - triangle[1], triangle[0] - triangle[2]
+        if weighting == 'area':
+            N_vectors[face_index] += np.cross(side_AC, side_AB) / 2
+        elif weighting == 'angle':
+            normal = np.cross(side_AC, side_AB) / la.norm(np.cross(side_AC, side_AB))
+            for corner in range(3):
+                to_next = triangle[(corner + 1) % 3] - triangle[corner]
+                to_prev = triangle[corner - 1] - triangle[corner]
+                cosine = np.dot(to_next, to_prev) / la.norm(to_next) / la.norm(to_prev)
+                N_vectors[face_index[corner]] += np.arccos(np.clip(cosine, -1, 1)) * normal
+        else:
+            N_vectors[face_index] += np.cross(side_AC / la.norm(side_AC), side_AB / la.norm(side_AB))
+    return N_vectors / la.norm(N_vectors, axis=1, keepdims=True)
+
+
+def test_normals_match_the_loop_on_hw3():
+    data = load_scene(SCENE)
+    verts, faces = np.array(data['verts'], dtype=float), np.array(data['face_indices'])
+    for weighting in [None, 'area', 'angle']:
+        assert np.allclose(calculate_normals(verts, faces, weighting), loop_normals(verts, faces, weighting),
+                           rtol=0, atol=1e-12)
+
+
+def test_normals_are_radial_on_a_sphere():
+    verts, faces, _ = sphere(2000)
+    # The vertices on the poles only belong to degenerate triangles, which were dropped
+    used = np.unique(faces)
+    for weighting in [None, 'area', 'angle']:
+        normals = calculate_normals(verts, faces, weighting)
+        cosines = np.sum(normals[used] * verts[used], axis=1)
+        assert np.allclose(np.abs(cosines), 1, atol=0.01) and len(np.unique(np.sign(cosines))) == 1
+        assert not np.any(np.isnan(normals))
+
+
+def test_repeated_vertices_add_up():
+    # The same vertex appears in many faces of one call, every face must still be added
+    verts = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [-1, 0, 0], [0, -1, 0]], dtype=float)
+    faces = np.array([[0, 1, 2], [0, 2, 3], [0, 3, 4], [0, 4, 1]])
+    summed = accumulate_normals(np.zeros((5, 3)), verts, faces)
+    assert np.allclose(summed[0], [0, 0, -4])
+    halves = accumulate_normals(accumulate_normals(np.zeros((5, 3)), verts, faces[:2]), verts, faces[2:])
+    assert np.allclose(halves, summed)
+    assert np.allclose(calculate_normals(verts, faces), np.tile([0, 0, -1], (5, 1)))
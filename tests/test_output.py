@@ -0,0 +1,76 @@
+import struct
+import zlib
+import numpy as np
+import pytest
+from rendering.output import FrameWriter, encode_png, encode_ppm, to_uint8, write_image
+
+PIXELS = np.random.default_rng(0).integers(0, 256, (7, 5, 3), dtype=np.uint8)
+
+
+def decode_png(data):
+    # Reads back an unfiltered 8 bit RGB PNG, checking the signature and the CRC of every chunk
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks, position = {}, 8
+    while position < len(data):
+        length, = struct.unpack('>I', data[position:position + 4])
+        chunk = data[position + 4:position + 8 + length]
+        crc, = struct.unpack('>I', data[position + 8 + length:position + 12 + length])
+        assert crc == zlib.crc32(chunk) & 0xffffffff
+        chunks[chunk[:4]] = chunk[4:]
+        position += 12 + length
+    width, height, depth, color_type = struct.unpack('>IIBB', chunks[b'IHDR'][:10])
+    assert (depth, color_type) == (8, 2) and chunks[b'IEND'] == b''
+    rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(height, 1 + 3 * width)
+    assert not np.any(rows[:, 0])
+    return rows[:, 1:].reshape(height, width, 3)
+
+
+def decode_ppm(data):
+    magic, size, maximum, pixels = data.split(b'\n', 3)
+    width, height = map(int, size.split())
+    assert magic == b'P6' and maximum == b'255'
+    return np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3)
+
+
+def decode_raw(data):
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def test_encoded_images_decode_to_the_same_pixels():
+    for compression in [0, 6, 9]:
+        assert np.array_equal(decode_png(encode_png(PIXELS, compression)), PIXELS)
+    assert np.array_equal(decode_ppm(encode_ppm(PIXELS)), PIXELS)
+    assert np.array_equal(decode_ppm(encode_ppm(PIXELS[:, ::2])), PIXELS[:, ::2])
+
+
+def test_to_uint8():
+    img = np.array([[[-0.5, 0, 0.5], [1 / 255, 1, 2]]])
+    assert to_uint8(img).tolist() == [[[0, 0, 128], [1, 255, 255]]]
+    assert to_uint8(img, gamma=2.0).tolist() == [[[0, 0, 180], [16, 255, 255]]]
+    assert img[0, 0, 0] == -0.5
+
+
+def test_write_image(tmp_path):
+    img = PIXELS / 255
+    for name, decode in [('image.png', decode_png), ('image.ppm', decode_ppm), ('image.rgb', decode_raw)]:
+        path = str(tmp_path / name)
+        write_image(path, img)
+        with open(path, 'rb') as f:
+            assert np.array_equal(np.reshape(decode(f.read()), PIXELS.shape), PIXELS)
+
+
+def test_frame_writer(tmp_path):
+    img = np.zeros((7, 5, 3))
+    with FrameWriter(str(tmp_path / 'frame_{}.png')) as writer:
+        for value in range(6):
+            # The image is reused for the next frame as soon as it is handed over
+            img[:] = value / 255
+            assert writer.write(img) == str(tmp_path / 'frame_{}.png'.format(value))
+    for value in range(6):
+        with open(str(tmp_path / 'frame_{}.png'.format(value)), 'rb') as f:
+            assert np.all(decode_png(f.read()) == value)
+
+    writer = FrameWriter(str(tmp_path / 'missing' / 'frame_{}.ppm'))
+    writer.write(img)
+    with pytest.raises(OSError):
+        writer.close()
@@ -0,0 +1,50 @@
+import os
+import numpy as np
+from rendering.parallel import TilePool
+from rendering.render import render_object, render_sequence
+from rendering.scene import load_scene
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+# A part of the mesh keeps the tests short
+FACES = 2500
+
+
+def _scene():
+    data = load_scene(SCENE)
+    camera = dict(focal=70, eye=data['cam_eye'], lookat=data['cam_lookat'], up=data['cam_up'], bg_color=data['bg_color'],
+                  M=96, N=96, H=data['H'], W=data['W'], ka=data['ka'], kd=data['kd'], ks=data['ks'], n=data['n'],
+                  light_positions=data['light_positions'], light_intensities=data['light_intensities'], Ia=data['Ia'])
+    mesh = dict(verts=np.array(data['verts']), vert_colors=np.array(data['vertex_colors']),
+                face_indices=np.array(data['face_indices'])[:FACES])
+    return mesh, camera
+
+
+def test_tiles_match_a_single_process():
+    mesh, camera = _scene()
+    # Small tiles, so that most triangles cross a tile border
+    with TilePool(2) as pool:
+        for shader, options in [('Gouraud', {}), ('Phong', {}), ('Gouraud', dict(vertex_lighting=True)),
+                                ('Phong', dict(depth_test=True))]:
+            expected = render_object('All', shader, **mesh, **camera, **options)
+            img = render_object('All', shader, **mesh, **camera, **options, tile_size=16, pool=pool)
+            if options.get('depth_test'):
+                assert np.array_equal(img[1], expected[1])
+                img, expected = img[0], expected[0]
+            assert np.array_equal(img, expected)
+
+
+def test_render_sequence_reuses_the_pool():
+    data = load_scene(SCENE)
+    mesh = (np.array(data['verts']), np.array(data['face_indices'])[:FACES], np.array(data['vertex_colors']))
+    cameras = [(np.array(data['cam_eye']) * scale, np.array(data['cam_lookat']), np.array(data['cam_up']))
+               for scale in (1.0, 1.2)]
+    for shade_t in ['Flat', 'Gouraud']:
+        options = dict(img_h=64, img_w=64, cam_h=data['H'], cam_w=data['W'], f=70, shade_t=shade_t)
+        expected = list(render_sequence(mesh, cameras, **options))
+        with TilePool(2) as pool:
+            frames = list(render_sequence(mesh, cameras, **options, tile_size=16, pool=pool))
+            executor = pool._executor
+            frames.extend(render_sequence(mesh, cameras, **options, tile_size=16, pool=pool))
+            assert pool._executor is executor
+        for img, reference in zip(frames, expected + expected):
+            assert np.array_equal(img, reference)
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+from rendering.profiling import Profiler, count
+from rendering.render import render_object
+from rendering.scene import load_scene
+from rendering.shade import shade_triangle
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def test_pixels_written_are_the_pixels_drawn():
+    verts2d = np.array([[2, 1], [27, 9], [11, 30]])
+    vcolors = np.eye(3)
+    for window in [None, (0, 32, 0, 32), (5, 20, 8, 16), (0, 32, 20, 40)]:
+        for shade_t in ['Flat', 'Gouraud']:
+            profiler = Profiler()
+            img = np.full((32, 32, 3), -1.0)
+            with profiler.stage('shade'):
+                shade_triangle(img, verts2d, vcolors, shade_t, window)
+            drawn = np.count_nonzero(np.any(img != -1, axis=2))
+            assert drawn > 0
+            assert profiler.stages[0]['pixels_written'] == drawn
+
+
+def test_nested_stages_add_to_the_enclosing_stage():
+    profiler = Profiler()
+    with profiler.stage('frame'):
+        count('pixels_written', 3)
+        with profiler.stage('tile'):
+            count('pixels_written', 5)
+            count('lit_points', 2)
+    tile, frame = profiler.stages
+    assert (tile['level'], tile['pixels_written'], tile['lit_points']) == (1, 5, 2)
+    assert (frame['level'], frame['pixels_written'], frame['lit_points']) == (0, 8, 2)
+
+    report = profiler.report()
+    assert (report['pixels_written'], report['lit_points']) == (8, 2)
+    assert report['seconds'] == frame['seconds']
+    assert '\n  tile' in profiler.format()
+
+
+def test_render_object_profile():
+    data = load_scene(SCENE)
+    profiler = Profiler()
+    render_object('All', 'Gouraud', 70, data['cam_eye'], data['cam_lookat'], data['cam_up'], data['bg_color'], 64, 64,
+                  data['H'], data['W'], data['verts'], data['vertex_colors'], data['face_indices'], data['ka'],
+                  data['kd'], data['ks'], data['n'], data['light_positions'], data['light_intensities'], data['Ia'],
+                  cull=True, profile=profiler)
+    stages = {stage['name']: stage for stage in profiler.stages}
+    assert stages['cull']['triangles_out'] < stages['cull']['triangles_in'] == len(data['face_indices'])
+    shading = stages['shading']
+    assert shading['triangles_in'] == stages['cull']['triangles_out']
+    # Every culled triangle left is lit once, its 3 vertices at a time
+    assert shading['lighting_calls'] == shading['triangles_in']
+    assert shading['lit_points'] == 3 * shading['triangles_in']
+    assert shading['pixels_written'] >= shading['covered_pixels'] > 0
+    assert shading['overdraw'] >= 1
@@ -0,0 +1,39 @@
+import os
+import numpy as np
+from rendering.render import render_object_base
+from rendering.rasterizer import triangle_fragments
+from rendering.scene import load_scene
+from rendering.shade import shade_triangle
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw1.json')
+
+
+def _coverage(img):
+    return np.any(img != 1, axis=2)
+
+
+def _scene():
+    data = load_scene(SCENE)
+    return (np.array(data['verts2d']).astype(int), np.array(data['faces']), np.array(data['vcolors']),
+            np.array(data['depth']))
+
+
+def test_vectorized_spans_match_scanline_on_every_triangle():
+    verts2d, faces, _, _ = _scene()
+    for triangle in verts2d[faces]:
+        # Both rules only depend on the triangle relative to the image, a small image around it is enough
+        triangle = triangle - triangle.min(axis=0)
+        img = np.ones(tuple(triangle.max(axis=0) + 1) + (3,))
+        shade_triangle(img, triangle, np.zeros((3, 3)), 'Flat')
+        xs, ys, _ = triangle_fragments(triangle, img.shape)
+        covered = np.zeros(img.shape[0:2], dtype=bool)
+        covered[xs, ys] = True
+        assert np.array_equal(covered, _coverage(img)), triangle.tolist()
+
+
+def test_vectorized_backend_matches_scanline_on_hw1():
+    verts2d, faces, vcolors, depth = _scene()
+    for shade_t in ['Flat', 'Gouraud']:
+        scanline = render_object_base(verts2d, faces, vcolors, depth, shade_t, 'scanline')
+        vectorized = render_object_base(verts2d, faces, vcolors, depth, shade_t, 'vectorized')
+        assert np.array_equal(_coverage(scanline), _coverage(vectorized))
@@ -0,0 +1,78 @@
+import os
+import numpy as np
+from rendering.mesh import Mesh
+from rendering.render import render_object
+from rendering.retained import RetainedRenderer
+from rendering.scene import load_scene
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def scene():
+    data = load_scene(SCENE)
+    mesh = Mesh(data['verts'], data['face_indices'], data['vertex_colors'])
+    camera = dict(focal=70, eye=data['cam_eye'], lookat=data['cam_lookat'], up=data['cam_up'], M=64, N=64, H=data['H'],
+                  W=data['W'])
+    material = dict(ka=data['ka'], kd=data['kd'], ks=data['ks'], n=data['n'],
+                    light_positions=np.concatenate([data['light_positions'], [[20.0, -10.0, 40.0]]]),
+                    light_intensities=np.concatenate([data['light_intensities'], [[0.3, 0.2, 0.1]]]), Ia=data['Ia'])
+    return data, mesh, camera, material
+
+
+def fresh(mesh, lighting, camera, material):
+    # A new renderer of a copy of the mesh, that never saw an edit
+    return RetainedRenderer(Mesh(mesh.verts, mesh.faces, mesh.colors), lighting, **camera, **material,
+                            bg_color=(1, 1, 1))
+
+
+def check_edit(renderer, dirty, before, expected):
+    assert dirty == renderer.dirty
+    assert np.allclose(renderer.img, expected.img, rtol=0, atol=1e-15)
+    # Nothing changed outside the reported rectangles
+    outside = np.ones(before.shape[:2], dtype=bool)
+    for x_start, y_start, x_end, y_end in dirty:
+        outside[x_start:x_end, y_start:y_end] = False
+    assert np.array_equal(renderer.img[outside], before[outside])
+
+
+def test_first_frame_matches_deferred_render():
+    data, mesh, camera, material = scene()
+    for lighting in ['Ambient', 'Diffuse', 'Specular', 'All']:
+        renderer = RetainedRenderer(mesh, lighting, **camera, **material, bg_color=data['bg_color'])
+        expected = render_object(lighting, 'Phong', bg_color=data['bg_color'], verts=mesh, vert_colors=None,
+                                 face_indices=None, deferred=True, **camera, **material)
+        assert np.allclose(renderer.img, expected, rtol=0, atol=1e-15)
+
+
+def test_light_and_material_edits_match_a_fresh_render():
+    data, mesh, camera, material = scene()
+    renderer = fresh(mesh, 'All', camera, material)
+    for change in [dict(light_intensities=material['light_intensities'] * [[1.0, 1.0, 1.0], [2.0, 1.0, 0.5]]),
+                   dict(light_positions=material['light_positions'] + [[0.0, 0.0, 0.0], [5.0, 5.0, 5.0]]),
+                   dict(Ia=np.array([0.2, 0.1, 0.3]))]:
+        before = renderer.img.copy()
+        dirty = renderer.set_lights(**change)
+        material.update(change)
+        check_edit(renderer, dirty, before, fresh(mesh, 'All', camera, material))
+    for change in [dict(ka=0.3, kd=0.5), dict(ks=0.2), dict(n=4), dict(lighting='Diffuse'), dict(lighting='All')]:
+        before = renderer.img.copy()
+        dirty = renderer.set_material(**change)
+        lighting = change.pop('lighting', renderer.lighting)
+        material.update(change)
+        check_edit(renderer, dirty, before, fresh(mesh, lighting, camera, material))
+
+
+def test_mesh_edits_match_a_fresh_render():
+    data, mesh, camera, material = scene()
+    renderer = RetainedRenderer(mesh, 'All', **camera, **material, bg_color=(1, 1, 1))
+    vertices = np.unique(mesh.faces[renderer.face_id[20, 30]])
+
+    before = renderer.img.copy()
+    dirty = renderer.update_colors(vertices, [[1.0, 0.0, 0.0]] * len(vertices))
+    check_edit(renderer, dirty, before, fresh(mesh, 'All', camera, material))
+    assert 0 < len(dirty) < 4
+
+    before = renderer.img.copy()
+    dirty = renderer.update_verts(vertices, mesh.verts[vertices] * 1.05)
+    check_edit(renderer, dirty, before, fresh(mesh, 'All', camera, material))
+    assert 0 < len(dirty) < 16
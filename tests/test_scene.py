@@ -0,0 +1,47 @@
+import json
+import os
+import numpy as np
+import pytest
+from rendering.scene import load_scene, save_scene
+
+MATERIALS = os.path.join(os.path.dirname(__file__), '..', 'materials')
+
+
+def test_scene_round_trip(tmp_path):
+    path = str(tmp_path / 'scene.json')
+    data = dict(verts=np.arange(30, dtype=np.float32).reshape(10, 3), faces=np.arange(9).reshape(3, 3),
+                colors=np.linspace(0, 1, 30).reshape(10, 3), mask=np.array([True, False]),
+                empty=np.empty((0, 3)), ka=0.25, M=512, big_endian=np.arange(4, dtype='>i4'))
+    save_scene(path, data)
+    scene = load_scene(path)
+    assert sorted(scene) == sorted(data)
+    for name, value in data.items():
+        assert np.array_equal(scene[name], value), name
+        assert np.shape(scene[name]) == np.shape(value)
+    assert scene['verts'].dtype == np.float32 and scene['faces'].dtype == data['faces'].dtype
+    assert scene['ka'] == 0.25 and scene['M'] == 512 and isinstance(scene['M'], int)
+    with open(path) as f:
+        header = json.load(f)
+    assert all(entry['offset'] % 64 == 0 for entry in header['arrays'].values())
+
+
+def test_scene_modes(tmp_path):
+    path = str(tmp_path / 'scene.json')
+    save_scene(path, dict(verts=np.zeros((4, 3))))
+    with pytest.raises(ValueError):
+        load_scene(path)['verts'][0] = 1
+    load_scene(path, mode='c')['verts'][0] = 1
+    assert not np.any(load_scene(path)['verts'])
+    scene = load_scene(path, mode='r+')
+    scene['verts'][0] = 1
+    scene['verts'].flush()
+    assert np.array_equal(load_scene(path)['verts'][0], [1, 1, 1])
+
+
+def test_materials_match_the_pickled_dicts():
+    for name in ['hw1', 'hw2', 'hw3']:
+        expected = np.load(os.path.join(MATERIALS, name + '.npy'), allow_pickle=True).tolist()
+        scene = load_scene(os.path.join(MATERIALS, name + '.json'))
+        assert sorted(scene) == sorted(expected)
+        for key, value in expected.items():
+            assert np.array_equal(scene[key], value), (name, key)
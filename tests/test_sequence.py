@@ -0,0 +1,23 @@
+import os
+import numpy as np
+from rendering.render import render_sequence, render_object_camera
+from rendering.scene import load_scene
+from transformations.transform import affine_matrix
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw2.json')
+
+
+def test_render_sequence_matches_single_frames():
+    data = load_scene(SCENE)
+    # The vertices of hw2 are float32, projecting them in single precision moves some of them to another pixel
+    verts, vcolors, faces = np.array(data['verts3d']), np.array(data['vcolors']), np.array(data['faces'])
+    c_org, c_lookat, c_up = np.array(data['c_org']), np.array(data['c_lookat']), np.array(data['c_up'])
+    cameras = [(c_org, c_lookat, c_up), (c_org * 1.3 + 2, c_lookat, c_up), (c_org * 0.8 - 1, c_lookat + 1, c_up)]
+    transforms = [np.eye(4), affine_matrix(np.array(data['u']), 0, np.array(data['t_1'])),
+                  affine_matrix(np.array(data['u']), np.array(data['phi']))]
+
+    frames = render_sequence((verts, faces, vcolors), cameras, transforms, 256, 256, 15, 15, 70, batch_size=2)
+    for camera, transform, img in zip(cameras, transforms, frames):
+        moved = np.dot(verts.astype(float), transform[0:3, 0:3].T) + transform[0:3, 3]
+        expected = render_object_camera(moved, faces, vcolors, 256, 256, 15, 15, 70, *camera)
+        assert np.array_equal(img, expected)
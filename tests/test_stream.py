@@ -0,0 +1,38 @@
+import os
+import numpy as np
+from rendering.helpers import calculate_normals
+from rendering.render import render_object, render_stream
+from rendering.scene import load_scene, iter_chunks, stream_normals
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def _scene():
+    data = load_scene(SCENE)
+    camera = dict(focal=70, eye=data['cam_eye'], lookat=data['cam_lookat'], up=data['cam_up'], bg_color=data['bg_color'],
+                  M=128, N=128, H=data['H'], W=data['W'], ka=data['ka'], kd=data['kd'], ks=data['ks'], n=data['n'],
+                  light_positions=data['light_positions'], light_intensities=data['light_intensities'], Ia=data['Ia'])
+    return data, camera
+
+
+def test_stream_normals_match_calculate_normals():
+    data, _ = _scene()
+    expected = calculate_normals(np.array(data['verts']), np.array(data['face_indices']))
+    assert np.array_equal(stream_normals(data['verts'], data['face_indices'], chunk_size=1000), expected)
+
+
+def test_render_stream_matches_render_object_on_several_chunks():
+    data, camera = _scene()
+    chunks = list(iter_chunks(data['verts'], data['face_indices'], data['vertex_colors'], chunk_size=2000))
+    assert len(chunks) > 1
+
+    img, zbuf = render_stream(iter(chunks), 'All', 'Gouraud', **camera)
+    expected, expected_zbuf = render_object('All', 'Gouraud', verts=np.array(data['verts']),
+                                            vert_colors=np.array(data['vertex_colors']),
+                                            face_indices=np.array(data['face_indices']), depth_test=True, cull=True,
+                                            **camera)
+    assert np.array_equal(zbuf, expected_zbuf)
+    # Pixels on an edge shared by triangles of different chunks go to whichever is drawn first, both are correct. The
+    # scanline interpolates the colours of each triangle its own way, so they can differ a lot at these pixels
+    differing = np.any(img != expected, axis=2)
+    assert np.count_nonzero(differing) < 0.1 * np.count_nonzero(np.isfinite(zbuf))
@@ -0,0 +1,56 @@
+import os
+import numpy as np
+from rendering.helpers import rasterize
+from rendering.scene import load_scene
+from transformations.projection import camera_axes, project_cam_lookat, project_to_pixels
+from transformations.transform import system_transform
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw2.json')
+
+
+def loop_rasterize(verts_2d, img_h, img_w, cam_h, cam_w):
+    # One point at a time, like rasterize did before it was vectorized
+    verts_rast = np.zeros((len(verts_2d), 2))
+    for i in range(len(verts_2d)):
+        verts_rast[i, 0] = np.around((verts_2d[i, 0] + cam_h / 2) * img_h / cam_h - 0.5)
+        verts_rast[i, 1] = np.around((-verts_2d[i, 1] + cam_w / 2) * img_w / cam_w - 0.5)
+    return verts_rast
+
+
+def projected_scene():
+    data = load_scene(SCENE)
+    camera = (data['c_org'], data['c_lookat'], data['c_up'])
+    verts_2d, depth = project_cam_lookat(*camera, np.array(data['verts3d'], dtype=float), 70)
+    return data, camera, verts_2d, depth
+
+
+def test_rasterize_matches_the_loop():
+    _, _, verts_2d, _ = projected_scene()
+    expected = loop_rasterize(verts_2d, 512, 512, 15, 15)
+    assert np.array_equal(rasterize(verts_2d, 512, 512, 15, 15), expected)
+    out = np.full((len(verts_2d), 2), np.nan)
+    assert rasterize(verts_2d, 512, 512, 15, 15, out=out) is out
+    assert np.array_equal(out, expected)
+    subpixel = rasterize(verts_2d, 512, 512, 15, 15, subpixel=True)
+    assert np.array_equal(np.around(subpixel), expected)
+    assert np.any(subpixel != expected)
+
+
+def test_system_transform_matches_the_loop():
+    data = load_scene(SCENE)
+    points = np.array(data['verts3d'], dtype=float)
+    R = np.vstack(camera_axes(data['c_org'], data['c_lookat'], data['c_up'])).T
+    expected = np.dot(R.T, np.array([point - data['c_org'] for point in points]).T).T
+    assert np.allclose(system_transform(points, R, data['c_org']), expected, rtol=0, atol=1e-12)
+    assert np.allclose(system_transform(points[0], R, data['c_org']), expected[0], rtol=0, atol=1e-12)
+    out = np.empty_like(points)
+    assert system_transform(points, R, data['c_org'], out=out) is out
+    assert np.allclose(out, expected, rtol=0, atol=1e-12)
+
+
+def test_project_to_pixels_matches_project_and_rasterize():
+    data, camera, verts_2d, depth = projected_scene()
+    verts_rast, pixel_depth = project_to_pixels(*camera, np.array(data['verts3d'], dtype=float), 70, 512, 512, 15, 15)
+    assert np.allclose(pixel_depth, depth, rtol=1e-12)
+    # The fused matrix rounds differently in the last bits, which only matters for a point on a pixel midpoint
+    assert np.array_equal(verts_rast, rasterize(verts_2d, 512, 512, 15, 15))
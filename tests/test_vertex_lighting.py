@@ -0,0 +1,47 @@
+import os
+import numpy as np
+from rendering.helpers import calculate_normals, get_colors, rasterize
+from rendering.render import render_object, render_object_base
+from rendering.scene import load_scene
+from transformations.projection import project_cam_lookat
+
+SCENE = os.path.join(os.path.dirname(__file__), '..', 'materials', 'hw3.json')
+
+
+def scene():
+    data = load_scene(SCENE)
+    lighting = (data['ka'], data['kd'], data['ks'], data['n'], data['light_positions'], data['light_intensities'],
+                data['Ia'])
+    return data, lighting
+
+
+def render(data, lighting, model, **options):
+    return render_object(model, 'Gouraud', 70, data['cam_eye'], data['cam_lookat'], data['cam_up'], data['bg_color'],
+                         128, 128, data['H'], data['W'], data['verts'], data['vertex_colors'], data['face_indices'],
+                         *lighting, **options)
+
+
+def test_vertex_lighting_interpolates_the_lit_vertex_colours():
+    data, lighting = scene()
+    verts, faces = np.asarray(data['verts']), np.asarray(data['face_indices'])
+    verts2d, depth = project_cam_lookat(data['cam_eye'], data['cam_lookat'], data['cam_up'], verts, 70)
+    verts2d = rasterize(verts2d, 128, 128, data['H'], data['W']).astype(int)
+    for model in ['Diffuse', 'All']:
+        lit = get_colors(model, verts, calculate_normals(verts, faces), data['vertex_colors'], data['cam_eye'],
+                         *lighting)
+        expected = render_object_base(verts2d, faces, lit, depth, 'Gouraud', M=128, N=128, dtype=np.float64,
+                                      bg_color=data['bg_color'])
+        assert np.array_equal(render(data, lighting, model, vertex_lighting=True), expected)
+
+
+def test_vertex_lighting_matches_per_triangle_lighting():
+    data, lighting = scene()
+    # The ambient light is the same everywhere, up to the rounding of the float32 vertex colours it replaces
+    assert np.allclose(render(data, lighting, 'Ambient', vertex_lighting=True), render(data, lighting, 'Ambient'),
+                       rtol=0, atol=1e-9)
+    img = render(data, lighting, 'All', vertex_lighting=True)
+    expected = render(data, lighting, 'All')
+    # Per triangle, the 3 vertices are lit at the barycentre of the triangle instead of at their own position
+    covered = np.any(expected != data['bg_color'], axis=2)
+    assert np.array_equal(np.any(img != data['bg_color'], axis=2), covered)
+    assert np.mean(np.abs(img - expected)[covered]) < 0.01
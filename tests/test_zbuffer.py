@@ -0,0 +1,59 @@
+import numpy as np
+from benchmarks.meshes import terrain, camera_for
+from rendering.render import render_object, render_object_base
+from rendering.helpers import rasterize
+from transformations.projection import project_cam_lookat
+
+
+def _separated_triangles():
+    # The triangles of a terrain shrunk around their centres, so that no two of them share a pixel
+    verts, faces, vcolors = terrain(200, height=0.1)
+    corners = verts[faces]
+    centres = corners.mean(axis=1, keepdims=True)
+    verts = (centres + 0.6 * (corners - centres)).reshape(-1, 3)
+    return verts, np.arange(len(verts)).reshape(-1, 3), vcolors[faces].reshape(-1, 3)
+
+
+def test_depth_test_matches_painter_without_overlaps():
+    verts, faces, vcolors = _separated_triangles()
+    eye, lookat, up = camera_for(verts, 0.8)
+    arguments = dict(focal=70, eye=eye, lookat=lookat, up=up, bg_color=np.ones(3), M=128, N=128, H=15, W=15,
+                     verts=verts, vert_colors=vcolors, face_indices=faces, ka=0.2, kd=0.6, ks=0.3, n=10,
+                     light_positions=np.array([eye + [0, 10, 0]]), light_intensities=np.ones((1, 3)), Ia=np.ones(3))
+    for shader, options in [('Gouraud', {}), ('Gouraud', dict(vertex_lighting=True)), ('Phong', {})]:
+        expected = render_object('All', shader, **arguments, **options)
+        img, _ = render_object('All', shader, **arguments, **options, depth_test=True)
+        assert np.allclose(img, expected, rtol=0, atol=1e-12)
+
+
+def test_depth_test_matches_painter_in_render_object_base():
+    verts, faces, vcolors = _separated_triangles()
+    eye, lookat, up = camera_for(verts, 0.8)
+    verts2d, depth = project_cam_lookat(eye, lookat, up, verts, 70)
+    verts2d = rasterize(verts2d, 128, 128, 15, 15).astype(int)
+    expected = render_object_base(verts2d, faces, vcolors, depth, 'Gouraud', M=128, N=128, dtype=np.float64)
+    img, _ = render_object_base(verts2d, faces, vcolors, depth, 'Gouraud', depth_test=True, M=128, N=128,
+                                dtype=np.float64)
+    assert np.array_equal(img, expected)
+    img = render_object_base(verts2d, faces, vcolors, depth, 'Gouraud', 'vectorized', M=128, N=128, dtype=np.float64)
+    assert np.array_equal(img, expected)
+
+
+def test_depth_test_resolves_intersecting_triangles():
+    # The second triangle has the larger mean depth, so the painter draws it first, but its corner at (10, 10) pokes
+    # out in front of the first one, and the third one is hidden behind the first one everywhere
+    verts2d = np.array([[2, 2], [2, 28], [28, 2], [10, 10], [10, 30], [30, 10], [4, 4], [4, 12], [12, 4]])
+    depth = np.array([5, 5, 5, 1, 1, 20, 50, 50, 50], dtype=float)
+    faces = np.arange(9).reshape(3, 3)
+    vcolors = np.repeat(np.eye(3), 3, axis=0)
+    painter = render_object_base(verts2d, faces, vcolors, depth, M=32, N=32, dtype=np.float64)
+    img, zbuf = render_object_base(verts2d, faces, vcolors, depth, depth_test=True, M=32, N=32, dtype=np.float64)
+    assert np.array_equal(painter[11, 11], [1, 0, 0]) and np.array_equal(img[11, 11], [0, 1, 0])
+    assert 1 < zbuf[11, 11] < 5
+    assert np.array_equal(img[20, 8], [1, 0, 0]) and zbuf[20, 8] == 5
+    assert np.array_equal(img[25, 12], [0, 1, 0])
+    assert not np.any(np.all(img == [0, 0, 1], axis=2))
+    assert np.all(np.isinf(zbuf[31, :]))
+    # The depth test only changes the pixels where the painter drew the first triangle over the second one
+    differ = np.any(img != painter, axis=2)
+    assert np.all(np.all(img[differ] == [0, 1, 0], axis=1))
@@ -29,23 +29,97 @@ def project_cam(c_v, c_x, c_y, c_z, p, f=1):
     return verts2d.T, depth
 
 
-def project_cam_lookat(c_org, c_lookat, c_up, verts_3d, f=1):
+def camera_axes(c_org, c_lookat, c_up):
     """
-    Points a camera to a certain point and applies projection of point p to the camera lens
+    Calculates the unit vectors of the coordinate system of a camera pointed to a certain point
     Args:
         c_org: The position of the camera in a scene
         c_lookat: The point where the camera looks/focuses
         c_up: A vector indicating the standing side of the camera
-        verts_3d: The points of an object
-        f: The distance between the camera lens and the inside camera shutter
-    Returns:
 
+    Returns:
+        c_x, c_y, c_z: The coordinates of the camera x, y and z vectors expressed in the WCS
     """
     c_k = np.array(c_lookat) - np.array(c_org)
     c_z = c_k / la.norm(c_k)
     t = np.array(c_up - np.dot(c_up, c_z) * c_z)
     c_y = t / la.norm(t)
     c_x = np.cross(c_y, c_z)
+    return c_x, c_y, c_z
+
+
+def project_cam_lookat(c_org, c_lookat, c_up, verts_3d, f=1):
+    """
+    Points a camera to a certain point and applies projection of point p to the camera lens
+    Args:
+        c_org: The position of the camera in a scene
+        c_lookat: The point where the camera looks/focuses
+        c_up: A vector indicating the standing side of the camera
+        verts_3d: The points of an object
+        f: The distance between the camera lens and the inside camera shutter
+    Returns:
+
+    """
+    c_x, c_y, c_z = camera_axes(c_org, c_lookat, c_up)
     return project_cam(c_org, c_x, c_y, c_z, verts_3d, f)
 
 
+def world_to_pixel_matrix(c_org, c_lookat, c_up, f, img_h, img_w, cam_h, cam_w):
+    """
+    Builds the 4x4 homogeneous matrix that fuses project_cam_lookat, the perspective divide and rasterize. A point
+    [x, y, z, 1] is mapped to [u * d, v * d, d, d], where (u, v) are its (unrounded) pixel coordinates and d its depth
+    Args:
+        c_org: The position of the camera in a scene
+        c_lookat: The point where the camera looks/focuses
+        c_up: A vector indicating the standing side of the camera
+        f: The distance between the camera lens and the inside camera shutter
+        img_h: The height of the image, measured in pixels
+        img_w: The width of the image, measured in pixels
+        cam_h: The height of the camera, measured in world units
+        cam_w: The width of the camera, measured in world units
+
+    Returns:
+        The 4x4 world to pixel matrix
+    """
+    c_x, c_y, c_z = camera_axes(c_org, c_lookat, c_up)
+    R = np.vstack((c_x, c_y, c_z))
+    view = np.eye(4)
+    view[0:3, 0:3] = R
+    view[0:3, 3] = -np.dot(R, c_org)
+
+    height = img_h / cam_h
+    width = img_w / cam_w
+    projection = np.array([[0, -f * height, cam_h / 2 * height - 0.5, 0],
+                           [f * width, 0, cam_w / 2 * width - 0.5, 0],
+                           [0, 0, 1, 0],
+                           [0, 0, 1, 0]])
+    return np.dot(projection, view)
+
+
+def project_to_pixels(c_org, c_lookat, c_up, verts_3d, f, img_h, img_w, cam_h, cam_w, out=None):
+    """
+    Projects the points of an object straight to pixel coordinates with a single matrix multiplication. Equivalent to
+    project_cam_lookat followed by rasterize
+    Args:
+        c_org: The position of the camera in a scene
+        c_lookat: The point where the camera looks/focuses
+        c_up: A vector indicating the standing side of the camera
+        verts_3d: The points of an object
+        f: The distance between the camera lens and the inside camera shutter
+        img_h: The height of the image, measured in pixels
+        img_w: The width of the image, measured in pixels
+        cam_h: The height of the camera, measured in world units
+        cam_w: The width of the camera, measured in world units
+        out: an optional preallocated Nx2 float matrix the pixel coordinates are written to
+
+    Returns:
+        verts_rast: The pixel coordinates of every point
+        depth: Every depth of the projected points
+    """
+    T = world_to_pixel_matrix(c_org, c_lookat, c_up, f, img_h, img_w, cam_h, cam_w)
+    p = np.dot(verts_3d, T[:, 0:3].T) + T[:, 3]
+    depth = p[:, 3]
+    if out is None:
+        out = np.empty((len(verts_3d), 2))
+    np.divide(p[:, 0:2], depth[:, np.newaxis], out=out)
+    return np.around(out, out=out), depth
@@ -2,25 +2,18 @@ import numpy as np
 from numpy import linalg as la
 
 
-def affine_transform(c_p, u, theta=0, t=3 * [0]):
+def affine_matrix(u, theta=0, t=3 * [0]):
     """
-    Perform an affine transformation to a point expressed in a coordinate system. This function can apply displacement
-    and rotation
+    Builds the 4x4 homogeneous matrix of the affine transformation applied by affine_transform
     Args:
-        c_p: 3xN matrix containing the coordinates of N points expressed in a coordinate system
-        theta: angle of rotation
         u: 3x1 rotation axis vector
+        theta: angle of rotation
         t: 3x1 displacement vector
 
     Returns:
-        c_q: Nx3 matrix containing the transformed coordinates of N points expressed in a coordinate system
-        theta: angle of rotation
+        T_h: the 4x4 homogeneous transformation matrix
     """
     u = np.array(u) / la.norm(u)
-    if c_p.ndim > 1:
-        c_p = np.hstack((c_p, np.ones((c_p.shape[0], 1))))
-    else:
-        c_p = np.append(c_p, 1)
     T_h = np.eye(4)
     T_h[0:3, 3] = np.array(t)
     row_1 = np.array([(1 - np.cos(theta)) * u[0] ** 2 + np.cos(theta),
@@ -31,6 +24,28 @@ def affine_transform(c_p, u, theta=0, t=3 * [0]):
                       (1 - np.cos(theta)) * u[1] * u[2] - np.sin(theta) * u[0]])
     row_3 = np.array([row_1[2], row_2[2], (1 - np.cos(theta)) * u[2] ** 2 + np.cos(theta)])
     T_h[0:3, 0:3] = np.vstack((row_1, row_2, row_3))
+    return T_h
+
+
+def affine_transform(c_p, u, theta=0, t=3 * [0]):
+    """
+    Perform an affine transformation to a point expressed in a coordinate system. This function can apply displacement
+    and rotation
+    Args:
+        c_p: 3xN matrix containing the coordinates of N points expressed in a coordinate system
+        theta: angle of rotation
+        u: 3x1 rotation axis vector
+        t: 3x1 displacement vector
+
+    Returns:
+        c_q: Nx3 matrix containing the transformed coordinates of N points expressed in a coordinate system
+        theta: angle of rotation
+    """
+    if c_p.ndim > 1:
+        c_p = np.hstack((c_p, np.ones((c_p.shape[0], 1))))
+    else:
+        c_p = np.append(c_p, 1)
+    T_h = affine_matrix(u, theta, t)
 
     c_q = np.dot(T_h, c_p.T).T
     if c_q.ndim > 1:
@@ -40,7 +55,7 @@ def affine_transform(c_p, u, theta=0, t=3 * [0]):
     return c_q
 
 
-def system_transform(c_p, R, c_0):
+def system_transform(c_p, R, c_0, out=None):
     """
     Find the coordinates of c_p expressed in a different coordinate system. The relationship between the old and the
     new coordinate system is defined by a rotation angle, a rotation axis and an offset vector vp
@@ -48,13 +63,10 @@ def system_transform(c_p, R, c_0):
         c_p: 3xN matrix containing the coordinates of N points expressed in a coordinate system
         R:
         c_0: 3x1 coordinate system offset rotation axis vector
+        out: an optional preallocated Nx3 float matrix the result is written to
 
     Returns:
         d_p: a Nx3 matrix containing the coordinates of N points expressed in a different coordinate system
     """
 
-    if c_p.ndim == 1:
-        c_p = (c_p - c_0)
-    else:
-        c_p = np.array([c_p[i, :] - c_0 for i in range(c_p.shape[0])])
-    return np.dot(R.T, c_p.T).T
+    return np.matmul(np.subtract(c_p, c_0), R, out=out)